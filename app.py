@@ -3,9 +3,7 @@ import streamlit as st
 import sys
 import os
 from datetime import datetime
-import time
 import re
-import pandas as pd
 
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -22,7 +20,14 @@ try:
 except ImportError:
     pass
 
-from crewmind.crew import Crewmind
+# crewAI (via crewmind.jobs, .progress and .runner) and pandas (via
+# crewmind.schedule) take seconds to import, so they are imported where they
+# are first needed rather than before the first page is drawn
+from crewmind.export import FORMATS, export_bytes, next_monday
+from crewmind.logs import configure_logging
+from crewmind.plan import WEEK
+from crewmind.startup import prewarm
+from crewmind.structured import plan_document
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -33,6 +38,8 @@ st.set_page_config(
 )
 
 # --- Custom CSS ---
+# Sent in full once per browser session; later reruns send only its hash
+# (see minCachedMessageSize in .streamlit/config.toml)
 st.markdown(f"""
 <style>
     /* --- General --- */
@@ -284,6 +291,8 @@ def main():
     # Check for API key
     if not (os.getenv('GOOGLE_API_KEY') or os.getenv('GEMINI_API_KEY')):
         show_api_key_error()
+    # Runs of every session log through one queue (crewmind.logs); once per process
+    configure_logging()
 
     # --- Header ---
     st.markdown("""
@@ -301,7 +310,7 @@ def main():
         if st.session_state.get('crew_result'):
             st.markdown("---")
             st.success("✅ Plan Generated!")
-            if st.button("🔄 New Goal", use_container_width=True, key="sidebar_new"):
+            if st.button("🔄 New Goal", width="stretch", key="sidebar_new"):
                 clear_session_state()
                 st.rerun()
 
@@ -311,18 +320,74 @@ def main():
     else:
         show_about_page()
 
+    # The page is drawn; load the crew machinery while the user fills it in
+    prewarm()
+
 def clear_session_state():
     """Clears relevant keys from the session state."""
-    for key in ['crew_result', 'goal_inputs', 'show_results']:
+    for key in ['crew_result', 'goal_inputs', 'show_results', 'job_id', 'previous_run', 'skip_history', 'plan_doc']:
         if key in st.session_state:
             del st.session_state[key]
+    st.query_params.clear()
+
+def option_index(options, value, default=0):
+    """Position of a previous answer among a widget's options, ignoring case."""
+    value = str(value).lower()
+    return next((i for i, option in enumerate(options) if option.lower() == value), default)
+
+def forget_job():
+    """Drops the current job so the next submission starts a new one."""
+    if 'job_id' in st.session_state:
+        from crewmind.jobs import get_job_manager
+        get_job_manager().cancel(st.session_state.job_id)
+        del st.session_state['job_id']
+    st.query_params.clear()
+
+def restore_job_from_url():
+    """Reattaches a reconnecting browser to its job via the ?job= query param."""
+    job_id = st.query_params.get('job')
+    if not job_id or st.session_state.get('job_id') == job_id:
+        return
+    from crewmind.jobs import get_job_manager
+    job = get_job_manager().get(job_id)
+    if job is None:
+        # The job has expired, but its plan may still be in the artifact store
+        restore_run_from_store(job_id)
+        return
+    st.session_state.job_id = job_id
+    st.session_state.goal_inputs = job.inputs
+    st.session_state.show_results = True
+
+def restore_run_from_store(run_id):
+    """Shows a finished run's stored plan, or forgets the run if it isn't stored."""
+    from crewmind.artifacts import get_artifact_store
+    from crewmind.history import get_plan_history
+    store = get_artifact_store()
+    manifest = store.manifest(run_id) if store is not None else None
+    result = store.load_result(run_id) if manifest is not None else None
+    inputs = manifest['inputs'] if result is not None else None
+    if result is None:
+        history = get_plan_history()
+        stored = history.get(run_id) if history is not None else None
+        if stored is not None:
+            inputs, result = stored.inputs, stored.result()
+    if result is None:
+        st.query_params.clear()
+        return
+    st.session_state.job_id = run_id
+    st.session_state.goal_inputs = inputs
+    st.session_state.crew_result = result
+    st.session_state.show_results = True
 
 def show_goal_setting_page():
     """Displays the page for users to input their goals."""
-    
+    restore_job_from_url()
+
     # Show form only if no results yet
     if not st.session_state.get('show_results'):
         st.header("🎯 Set Your Goal")
+        # Editing a goal starts from the inputs of the plan being edited
+        previous = st.session_state.get('goal_inputs') or {}
         
         with st.container():
             st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -331,6 +396,7 @@ def show_goal_setting_page():
 
                 user_goal = st.text_area(
                     "**What is your primary goal?** *",
+                    value=previous.get('user_goal', ''),
                     placeholder="e.g., 'Become a proficient Python developer and land a job in tech'",
                     height=100,
                     help="Be specific! The more detail, the better the plan."
@@ -338,18 +404,24 @@ def show_goal_setting_page():
                 
                 col1, col2 = st.columns(2)
                 with col1:
+                    timelines = ["3 Months", "6 Months", "1 Year", "Custom"]
+                    previous_timeline = previous.get('timeline', timelines[0])
                     timeline = st.selectbox(
                         "**Timeline** *",
-                        ["3 Months", "6 Months", "1 Year", "Custom"],
+                        timelines,
+                        index=option_index(timelines, previous_timeline, default=len(timelines) - 1),
                         help="Select a realistic timeframe for your goal."
                     )
                     if timeline == "Custom":
-                        timeline = st.text_input("Enter custom timeline:", placeholder="e.g., '8 weeks'")
+                        timeline = st.text_input("Enter custom timeline:", placeholder="e.g., '8 weeks'",
+                                                 value=previous_timeline if previous_timeline not in timelines else '')
                 
                 with col2:
+                    categories = ["Professional Development", "Health & Fitness", "Personal Growth", "Education", "Creative", "Financial", "Other"]
                     goal_type = st.selectbox(
                         "**Goal Category**",
-                        ["Professional Development", "Health & Fitness", "Personal Growth", "Education", "Creative", "Financial", "Other"],
+                        categories,
+                        index=option_index(categories, previous.get('goal_type')),
                         help="Categorizing helps tailor the plan."
                     )
 
@@ -360,41 +432,47 @@ def show_goal_setting_page():
                     available_time = st.text_input(
                         "**How much time can you commit?** *",
                         placeholder="e.g., '10 hours per week'",
+                        value=previous.get('available_time', ''),
                         help="Be realistic about your weekly time commitment."
                     )
                 with col4:
+                    schedules = ["Early morning (6-9 AM)", "Morning (9-12 PM)", "Afternoon (12-5 PM)", "Evening (5-8 PM)", "Night (8-11 PM)", "Flexible"]
                     preferred_schedule = st.selectbox(
                         "**When are you most productive?**",
-                        ["Early morning (6-9 AM)", "Morning (9-12 PM)", "Afternoon (12-5 PM)", "Evening (5-8 PM)", "Night (8-11 PM)", "Flexible"],
+                        schedules,
+                        index=option_index(schedules, previous.get('preferred_schedule')),
                     )
 
                 with st.expander("🔧 Advanced Options"):
                     motivation_level = st.select_slider(
                         "**Current motivation level**",
                         options=["Low", "Medium", "High", "Very High"],
-                        value="High"
+                        value=previous.get('motivation_level', "High")
                     )
+                    difficulties = ["Gentle start", "Moderate challenge", "Ambitious push"]
                     difficulty_preference = st.selectbox(
                         "**Preferred challenge level**",
-                        ["Gentle start", "Moderate challenge", "Ambitious push"],
-                        index=1
+                        difficulties,
+                        index=option_index(difficulties, previous.get('difficulty_preference'), default=1)
                     )
+                    accountability_styles = ["Self-accountability", "Friend/family support", "Public commitment", "Regular check-ins", "No preference"]
                     accountability_preference = st.selectbox(
                         "**Accountability style**",
-                        ["Self-accountability", "Friend/family support", "Public commitment", "Regular check-ins", "No preference"],
-                        index=0,
+                        accountability_styles,
+                        index=option_index(accountability_styles, previous.get('accountability_preference')),
                         help="How do you prefer to stay accountable?"
                     )
                     current_commitments = st.text_area(
                         "**Any existing commitments?** (optional)",
                         placeholder="e.g., 'Full-time job (9-5), family time on weekends'",
+                        value='' if previous.get('current_commitments', 'None') == 'None' else previous['current_commitments'],
                         height=100
                     )
 
                 st.markdown("<br>", unsafe_allow_html=True)
                 submitted = st.form_submit_button(
                     "🚀 Generate My Plan",
-                    use_container_width=True,
+                    width="stretch",
                     type="primary"
                 )
 
@@ -424,38 +502,145 @@ def show_goal_setting_page():
         else:
             display_inline_results()
 
+# Sections shown while the crew runs, in task order
+TASK_SECTIONS = {
+    'goal_setting_task': "🎯 SMART Goal",
+    'weekly_schedule_task': "📅 Weekly Schedule",
+    'daily_planning_task': "📋 Final Action Plan",
+}
+JOB_POLL_SECONDS = 1.0
+
+def render_progress(progress):
+    """Draws each task section from the current run progress."""
+    from crewmind.progress import DONE, RUNNING
+    for name, title in TASK_SECTIONS.items():
+        status = progress.status[name]
+        icon = "✅" if status == DONE else "🤖" if status == RUNNING else "⏳"
+        st.markdown(f"#### {icon} {title}")
+        text = progress.visible_text(name)
+        if text:
+            st.markdown(text)
+        elif status == RUNNING:
+            st.caption("AI agents are working on this section...")
+
 def run_crew_and_display_results(inputs):
-    """Runs the CrewAI process and handles the display of results."""
+    """Submits the crew job if needed and shows its progress until it finishes."""
+    from crewmind.jobs import get_job_manager, FAILED, CANCELLED
+    from crewmind.runner import reusable_outputs
+
+    manager = get_job_manager()
+    job = manager.get(st.session_state.get('job_id', ''))
+    if job is None:
+        # After "Edit Goal", reuse the tasks the changed inputs don't affect
+        previous_inputs, previous_result = st.session_state.get('previous_run') or ({}, None)
+        if previous_result is None and offer_stored_plan(inputs):
+            return
+        outputs = reusable_outputs(previous_inputs, previous_result, inputs)
+        st.session_state.pop('skip_history', None)
+        st.session_state.job_id = manager.submit(inputs, outputs=outputs)
+        st.query_params['job'] = st.session_state.job_id
+        job = manager.get(st.session_state.job_id)
+
     st.header("🎉 Generating Your Plan")
 
-    with st.spinner("🤖 AI agents are creating your personalized plan... This may take a moment."):
-        try:
-            crew = Crewmind().crew()
-            result = crew.kickoff(inputs=inputs)
-            
-            st.session_state.crew_result = result
-            st.success("✅ Success! Your personalized goal plan is ready!")
-            time.sleep(0.5)
+    if job.status in (FAILED, CANCELLED):
+        st.error(f"❌ An error occurred: {job.error or 'the run was cancelled'}")
+        st.warning("Please check your API key and try again.")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✏️ Edit Inputs", width="stretch"):
+                forget_job()
+                st.session_state.show_results = False
+                st.rerun()
+        with col2:
+            if st.button("🔄 Try Again", width="stretch", type="primary"):
+                forget_job()
+                st.rerun()
+        return
+
+    if job.result is not None:
+        st.session_state.crew_result = job.result
+        st.success("✅ Success! Your personalized goal plan is ready!")
+        st.rerun()
+
+    display_job_progress(job.id)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def display_job_progress(job_id):
+    """
+    The running job's progress. Only this fragment is redrawn every
+    JOB_POLL_SECONDS; the page reruns once, when the job has ended.
+    """
+    from crewmind.jobs import get_job_manager, QUEUED
+    job = get_job_manager().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+
+    if job.status == QUEUED:
+        st.info("⏳ Your plan is queued and will start shortly...")
+    render_progress(job.progress)
+
+def offer_stored_plan(inputs):
+    """Offers the stored plan of a near-identical goal; True while the user decides."""
+    if st.session_state.get('skip_history'):
+        return False
+    from crewmind.history import get_plan_history
+    history = get_plan_history()
+    match = history.find_similar(inputs) if history is not None else None
+    if match is None:
+        return False
+
+    st.header("📚 We've Planned This Goal Before")
+    created = datetime.fromtimestamp(match.created).strftime('%B %d, %Y')
+    st.info(f"A plan for **{match.inputs['user_goal']}** ({match.inputs.get('goal_type')}, "
+            f"{match.inputs.get('timeline')}) was generated on {created}. You can use it right away, "
+            "start from it so only the parts your answers change are regenerated, or generate a new one.")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("📋 Use This Plan", width="stretch", type="primary"):
+            st.session_state.job_id = match.run_id
+            # Plans made elsewhere (CLI, batch) may not have every form answer;
+            # the user's own answers (and user_id) win over the stored ones
+            st.session_state.goal_inputs = {**match.inputs, **inputs}
+            st.session_state.crew_result = match.result()
+            st.query_params['job'] = match.run_id
             st.rerun()
-
-        except Exception as e:
-            st.error(f"❌ An error occurred: {str(e)}")
-            st.warning("Please check your API key and try again.")
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("✏️ Edit Inputs", use_container_width=True):
-                    st.session_state.show_results = False
-                    st.rerun()
-            with col2:
-                if st.button("🔄 Try Again", use_container_width=True, type="primary"):
-                    del st.session_state['crew_result']
-                    st.rerun()
+    with col2:
+        if st.button("🌱 Start From It", width="stretch"):
+            # The goals are the same in all but wording, so only other answers count as changes
+            st.session_state.previous_run = ({**match.inputs, 'user_goal': inputs['user_goal']}, match.result())
+            st.rerun()
+    with col3:
+        if st.button("🚀 Generate New", width="stretch"):
+            st.session_state.skip_history = True
+            st.rerun()
+    return True
+
+# Calendar export formats, as offered in the results page
+EXPORT_FORMATS = {
+    'ics': "Calendar (.ics)",
+    'csv': "Spreadsheet (.csv)",
+    'json': "JSON (.json)",
+}
+
+def results_document(result, inputs):
+    """The PlanDocument of the shown result, built once rather than on every rerun."""
+    cached = st.session_state.get('plan_doc')
+    if cached is None or cached[0] is not result or cached[1] is not inputs:
+        cached = (result, inputs, plan_document(result, inputs))
+        st.session_state.plan_doc = cached
+    return cached[2]
 
 def display_inline_results():
-    """Displays the generated goal plan inline on the same page."""
+    """
+    Displays the generated goal plan inline on the same page.
+
+    Each tab and the download area are fragments: their widgets rerun only
+    that fragment, not the page around it.
+    """
     inputs = st.session_state.goal_inputs
     result = st.session_state.crew_result
-    content = result.raw if hasattr(result, 'raw') else str(result)
+    doc = results_document(result, inputs)
 
     st.markdown('<div class="results-container">', unsafe_allow_html=True)
     
@@ -464,12 +649,14 @@ def display_inline_results():
     with col1:
         st.header("📊 Your Personalized Plan")
     with col2:
-        if st.button("✏️ Edit Goal", type="secondary", use_container_width=True, key="edit_goal_btn"):
+        if st.button("✏️ Edit Goal", type="secondary", width="stretch", key="edit_goal_btn"):
             st.session_state.show_results = False
-            del st.session_state['crew_result']
+            st.session_state.previous_run = (inputs, st.session_state.pop('crew_result'))
+            st.session_state.pop('plan_doc', None)
+            forget_job()
             st.rerun()
     with col3:
-        if st.button("🔄 New Goal", type="secondary", use_container_width=True, key="new_goal_btn"):
+        if st.button("🔄 New Goal", type="secondary", width="stretch", key="new_goal_btn"):
             clear_session_state()
             st.rerun()
     
@@ -493,152 +680,138 @@ def display_inline_results():
     tab1, tab2, tab3 = st.tabs(["📋 Action Plan", "📅 Weekly Schedule", "💡 Success Tips"])
 
     with tab1:
-        display_formatted_plan(content)
+        display_formatted_plan(doc)
 
     with tab2:
-        display_weekly_breakdown(content)
+        display_weekly_breakdown(doc)
         
     with tab3:
-        display_success_tips(content)
+        display_success_tips(doc)
 
-    # Download Button
     st.markdown("---")
-    download_content = format_download_content(inputs, result)
+    display_downloads(inputs, doc, st.session_state.get('job_id'))
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def display_downloads(inputs, doc, job_id):
+    """
+    Download buttons. The files are built on click, in a thread without
+    session state, so everything they need is captured here; clicking
+    doesn't rerun anything.
+    """
+    file_stem = f"CrewMind_Plan_{datetime.now().strftime('%Y%m%d')}"
     st.download_button(
         label="📄 Download Complete Plan",
-        data=download_content,
-        file_name=f"CrewMind_Plan_{datetime.now().strftime('%Y%m%d')}.md",
+        data=lambda: format_download_content(inputs, stored_plan(doc, job_id)),
+        file_name=f"{file_stem}.md",
         mime="text/markdown",
-        use_container_width=True,
+        on_click="ignore",
+        width="stretch",
         type="primary"
     )
-    
-    st.markdown('</div>', unsafe_allow_html=True)
 
-
-
-def display_formatted_plan(content):
-    """Parses and displays the AI-generated plan in a structured, concise format."""
+    with st.expander("📅 Export to Calendar", expanded=False):
+        col1, col2 = st.columns(2)
+        export_format = col1.selectbox("Format", list(EXPORT_FORMATS), format_func=EXPORT_FORMATS.get,
+                                       key="export_format")
+        start = col2.date_input("Plan starts on", value=next_monday(), key="export_start")
+        mime, extension = FORMATS[export_format]
+        st.download_button(
+            label=f"📥 Download {EXPORT_FORMATS[export_format]}",
+            data=lambda: export_bytes(doc, inputs, export_format, start),
+            file_name=f"{file_stem}.{extension}",
+            mime=mime,
+            on_click="ignore",
+            width="stretch",
+            key="export_download_btn"
+        )
+
+
+@st.fragment
+def display_formatted_plan(doc):
+    """Displays the plan's sections in a structured, concise format."""
     st.markdown("#### Plan Overview")
-    
-    # Clean up the content - remove excessive whitespace and newlines
-    content = re.sub(r'\n{3,}', '\n\n', content)
-    content = re.sub(r'\s{2,}', ' ', content)
-    
-    # Split by common section markers (headers, numbered sections, bold text)
-    # Look for patterns like: "##", "**", numbered lists, or ALL CAPS headings
-    sections = re.split(r'\n(?=\*\*[^*]+\*\*:|\n#+\s|\n[A-Z][A-Z\s]{4,}:|\n\d+\.\s+[A-Z])', content)
-    
-    if len(sections) == 1:
-        # If no clear sections found, try splitting by double newlines
-        sections = [s.strip() for s in content.split('\n\n') if s.strip()]
-    
-    for section in sections:
-        section = section.strip()
-        if len(section) < 10:  # Skip very short sections
-            continue
 
-        lines = [l.strip() for l in section.split('\n') if l.strip()]
-        if not lines:
+    for section in doc.sections:
+        # Weekly tables have their own tab
+        if section.kind == WEEK:
             continue
-            
-        # Extract title from first line
-        first_line = lines[0]
-        title = first_line
-        
-        # Clean up title - remove markdown, emojis, extra formatting
-        title = re.sub(r'^#+\s*', '', title)  # Remove markdown headers
-        title = re.sub(r'\*\*([^*]+)\*\*', r'\1', title)  # Remove bold, keep text
-        title = re.sub(r'^[-*•]\s*', '', title)  # Remove list markers
-        title = re.sub(r':\s*$', '', title)  # Remove trailing colon
-        title = title.strip()
-        
-        # Limit title length
+        body = section.body.strip()
+        if len(section.title) + len(body) < 10:  # Skip very short sections
+            continue
+
+        title = section.title
         if len(title) > 60:
             title = title[:57] + "..."
-        
-        # Get body (rest of the lines)
-        body_lines = lines[1:] if len(lines) > 1 else []
-        
-        # Clean and shorten body text
-        body = '\n'.join(body_lines)
-        
-        # Remove excessive markdown formatting
-        body = re.sub(r'\*\*([^*]+)\*\*', r'**\1**', body)  # Keep only essential bold
-        body = re.sub(r'_{2,}', '', body)  # Remove underlines
-        body = re.sub(r'#{3,}', '##', body)  # Limit header depth
-        
-        # Limit paragraph length - split long paragraphs
-        sentences = re.split(r'([.!?]\s+)', body)
-        if len(''.join(sentences)) > 500:
-            # Keep only first few sentences if too long
-            body = ''.join(sentences[:6]) + "..."
-        
+
+        # Keep long sections short, cutting at a line so tables and lists stay intact
+        if len(body) > 500:
+            kept, length = [], 0
+            for line in body.split('\n'):
+                if length + len(line) > 500 and kept:
+                    break
+                kept.append(line)
+                length += len(line) + 1
+            body = '\n'.join(kept) + "\n\n..."
+
         if title and body:
             with st.expander(f"**{title}**", expanded=False):
                 st.markdown(body, unsafe_allow_html=True)
         elif title:
             # If no body, just show title as a small note
             st.caption(f"• {title}")
+        else:
+            st.markdown(body)
 
-def display_weekly_breakdown(content):
-    """Extracts and displays all weekly schedule tables from the plan."""
-    st.markdown("#### 📅 Weekly Schedule")
+WEEKS_PER_PAGE = 4
 
-    # Find all occurrences of "Week X" sections
-    weekly_sections = re.findall(r'(\#\#\#\s*Week\s*\d+.*?)(?=\n\#\#\#\s*Week|\Z)', content, re.DOTALL | re.IGNORECASE)
+@st.fragment
+def display_weekly_breakdown(doc):
+    """Displays the weekly schedule a page of weeks at a time, with keyword search."""
+    from crewmind.schedule import schedule_frame, schedule_table, schedule_weeks
 
-    if weekly_sections:
-        for section in weekly_sections:
-            st.markdown(section)
-    else:
-        # A simpler regex to find tables if the above fails
-        tables = re.findall(r'(\|.*\|)', content)
-        if tables:
-            st.markdown("\n".join(tables))
-        else:
-            st.info("📅 No weekly schedule tables found in the output.")
-            st.text(content)
+    st.markdown("#### 📅 Weekly Schedule")
 
-def display_success_tips(content):
-    """Extracts and displays success tips from the plan in a concise format."""
+    if schedule_frame(doc).empty:
+        st.info("📅 No weekly schedule tables found in the output.")
+        st.text(doc.to_markdown())
+        return
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        keyword = st.text_input("🔍 Search activities", placeholder="e.g. 'review', 'Saturday'", key="week_search")
+    weeks = schedule_weeks(doc, keyword)
+    if not weeks:
+        st.info(f"No days mention '{keyword}'.")
+        return
+
+    # Only the weeks on the selected page are rendered
+    pages = [weeks[i:i + WEEKS_PER_PAGE] for i in range(0, len(weeks), WEEKS_PER_PAGE)]
+    with col2:
+        page = st.selectbox(
+            "Weeks",
+            range(len(pages)),
+            format_func=lambda i: f"Week {pages[i][0]}" if len(pages[i]) == 1 else f"Weeks {pages[i][0]}–{pages[i][-1]}",
+            key="week_page",
+        )
+
+    titles = {week.number: week.title for week in doc.weeks}
+    for week in pages[min(page, len(pages) - 1)]:
+        st.markdown(f"**{titles.get(week, f'Week {week}')}**")
+        st.dataframe(schedule_table(doc, week, keyword), width="stretch")
+
+@st.fragment
+def display_success_tips(doc):
+    """Displays success tips from the plan in a concise format."""
     st.markdown("#### Tips & Best Practices")
 
-    # Regex to find tips section - look for various patterns
-    tips_patterns = [
-        r'(Success\s+Tips?[^\n]*\n.*?)(?=\n\*\*[A-Z]|\n##|\Z)',
-        r'(Tips?\s+(?:for|to)[^\n]*\n.*?)(?=\n\*\*[A-Z]|\n##|\Z)',
-        r'(Staying\s+Motivated[^\n]*\n.*?)(?=\n\*\*[A-Z]|\n##|\Z)',
-        r'(Key\s+(?:to|Success)[^\n]*\n.*?)(?=\n\*\*[A-Z]|\n##|\Z)'
-    ]
-    
-    tips_section = None
-    for pattern in tips_patterns:
-        tips_match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        if tips_match:
-            tips_section = tips_match.group(1)
-            break
-    
-    if tips_section:
-        # Extract bullet points
-        items = re.findall(r'[-*•]\s+([^\n]+)', tips_section)
-        if not items:
-            items = re.findall(r'\d+[.)]\s+([^\n]+)', tips_section)
-        
-        if items:
-            for item in items[:8]:  # Limit to 8 tips
-                item_clean = re.sub(r'\*\*([^*]+)\*\*', r'**\1**', item.strip())  # Keep bold
-                item_clean = re.sub(r'\s+', ' ', item_clean)  # Normalize whitespace
-                if len(item_clean) > 120:  # Shorten long tips
-                    item_clean = item_clean[:117] + "..."
-                st.markdown(f"• {item_clean}")
-        else:
-            # Show text content, shortened
-            tips_text = re.sub(r'\n{2,}', '\n', tips_section)
-            tips_text = re.sub(r'\s+', ' ', tips_text[:400])
-            if len(tips_section) > 400:
-                tips_text += "..."
-            st.markdown(tips_text)
+    if doc.tips:
+        for item in doc.tips[:8]:  # Limit to 8 tips
+            item_clean = re.sub(r'\s+', ' ', item.strip())  # Normalize whitespace
+            if len(item_clean) > 120:  # Shorten long tips
+                item_clean = item_clean[:117] + "..."
+            st.markdown(f"• {item_clean}")
     else:
         # Show concise default tips
         st.markdown("""
@@ -648,10 +821,15 @@ def display_success_tips(content):
         • **Celebrate small wins** to maintain momentum
         """)
 
-def format_download_content(inputs, result):
+def stored_plan(doc, job_id):
+    """The run's plan from the artifact store, or rendered from doc if it isn't stored."""
+    from crewmind.artifacts import get_artifact_store
+    store = get_artifact_store()
+    content = store.read_text(job_id) if store is not None and job_id else None
+    return content if content is not None else doc.to_markdown()
+
+def format_download_content(inputs, content):
     """Formats the plan for a professional-looking markdown download."""
-    content = result.raw if hasattr(result, 'raw') else str(result)
-    
     download_template = f"""# 🎯 Personal Goal Achievement Plan
 
 > Generated by CrewMind AI - Your personalized roadmap to success.
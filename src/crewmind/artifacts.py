@@ -0,0 +1,225 @@
+"""
+Run-scoped store of plan artifacts.
+
+Every run_crew() saves what it produced under its run id, instead of the
+crew writing one shared daily_plan.md that concurrent runs overwrite:
+
+    <dir>/<run_id>/
+        manifest.json                   inputs, creation time, artifact names
+        <task>.md.gz                    each task's raw output
+        <task>.json.gz                  each task's structured output, if any
+        plan.md.gz                      the assembled plan document
+
+Artifacts are gzip-compressed and written atomically (temp file, then
+rename), and the manifest is written last, so a run is either complete or
+not listed. Each run has its own directory, so concurrent runs never touch
+the same file. Runs older than the TTL are deleted, and the oldest runs go
+first once the store is over its size budget. The web app's download and
+the `plan` command read from here.
+
+Configuration (environment variables):
+    CREWMIND_ARTIFACTS          set to 'off' to keep nothing on disk
+    CREWMIND_ARTIFACTS_DIR      store directory (default: ~/.cache/crewmind/runs)
+    CREWMIND_ARTIFACTS_TTL      seconds a run is kept (default: 30 days)
+    CREWMIND_ARTIFACTS_MAX_MB   size budget before the oldest runs go (default: 500)
+"""
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+DEFAULT_ARTIFACTS_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'crewmind', 'runs')
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MAX_MB = 500
+
+MANIFEST = 'manifest.json'
+PLAN = 'plan.md'
+
+# Retention is enforced at most this often, since it walks the whole store
+SWEEP_INTERVAL = 60
+
+_RUN_ID = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class ArtifactStore:
+    """
+    Compressed per-run artifacts with a TTL and a size-based retention policy.
+    """
+
+    def __init__(self, directory: str, ttl: float, max_bytes: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._swept = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def run_dir(self, run_id: str) -> str:
+        if not _RUN_ID.match(run_id or ''):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        return os.path.join(self.directory, run_id)
+
+    def path(self, run_id: str, name: str) -> str:
+        """Where an artifact of a run is (or would be) stored."""
+        return os.path.join(self.run_dir(run_id), f'{name}.gz')
+
+    def _write(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save_run(self, run_id: str, inputs: dict, result, plan: str | None = None) -> dict:
+        """
+        Store every task output of a CrewOutput and the assembled plan (plan,
+        or rendered from result), then the manifest. Returns the manifest.
+        """
+        if plan is None:
+            from crewmind.structured import plan_document
+            plan = plan_document(result, inputs).to_markdown()
+
+        directory = self.run_dir(run_id)
+        os.makedirs(directory, exist_ok=True)
+        artifacts = {}
+        for output in result.tasks_output:
+            self._write(self.path(run_id, f'{output.name}.md'), (output.raw or '').encode('utf-8'))
+            artifacts[f'{output.name}.md'] = output.name
+            if output.pydantic is not None:
+                self._write(self.path(run_id, f'{output.name}.json'),
+                            output.pydantic.model_dump_json().encode('utf-8'))
+                artifacts[f'{output.name}.json'] = output.name
+        self._write(self.path(run_id, PLAN), plan.encode('utf-8'))
+        artifacts[PLAN] = None
+
+        manifest = {
+            'run_id': run_id,
+            'created': time.time(),
+            'inputs': inputs,
+            'tasks': [output.name for output in result.tasks_output],
+            'artifacts': sorted(artifacts),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, os.path.join(directory, MANIFEST))
+
+        if time.time() - self._swept > SWEEP_INTERVAL:
+            self.evict()
+        return manifest
+
+    def manifest(self, run_id: str):
+        """A run's manifest, or None if the run isn't (completely) stored."""
+        try:
+            with open(os.path.join(self.run_dir(run_id), MANIFEST), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_bytes(self, run_id: str, name: str):
+        """The uncompressed artifact, or None if it doesn't exist."""
+        try:
+            with gzip.open(self.path(run_id, name), 'rb') as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+    def read_text(self, run_id: str, name: str = PLAN):
+        data = self.read_bytes(run_id, name)
+        return data.decode('utf-8') if data is not None else None
+
+    def runs(self) -> list:
+        """Manifests of the stored runs, newest first."""
+        manifests = []
+        for run_id in os.listdir(self.directory):
+            manifest = self.manifest(run_id) if _RUN_ID.match(run_id) else None
+            if manifest is not None:
+                manifests.append(manifest)
+        return sorted(manifests, key=lambda manifest: manifest['created'], reverse=True)
+
+    def load_result(self, run_id: str):
+        """Rebuild a run's CrewOutput from its artifacts, or None if it isn't stored."""
+        from crewai.crews.crew_output import CrewOutput
+        from crewai.tasks.task_output import TaskOutput
+        from crewai.types.usage_metrics import UsageMetrics
+
+        from crewmind.structured import TASK_OUTPUT_MODELS
+
+        manifest = self.manifest(run_id)
+        if manifest is None:
+            return None
+        outputs = []
+        for name in manifest['tasks']:
+            raw = self.read_text(run_id, f'{name}.md')
+            if raw is None:
+                return None
+            data = self.read_bytes(run_id, f'{name}.json')
+            model = TASK_OUTPUT_MODELS.get(name)
+            pydantic = model.model_validate_json(data) if model and data is not None else None
+            outputs.append(TaskOutput(name=name, description=name, agent='', raw=raw, pydantic=pydantic))
+        final = outputs[-1]
+        return CrewOutput(raw=final.raw, pydantic=final.pydantic, json_dict=final.json_dict,
+                          tasks_output=outputs, token_usage=UsageMetrics())
+
+    def evict(self):
+        """Delete runs past the TTL, then the oldest ones until under max_bytes."""
+        with self._lock:
+            self._swept = time.time()
+            now = time.time()
+            runs = []
+            total = 0
+            for run_id in os.listdir(self.directory):
+                directory = os.path.join(self.directory, run_id)
+                if not os.path.isdir(directory):
+                    continue
+                try:
+                    files = [os.stat(os.path.join(directory, name)) for name in os.listdir(directory)]
+                except OSError:
+                    continue
+                created = max((stat.st_mtime for stat in files), default=0.0)
+                size = sum(stat.st_size for stat in files)
+                # A run still being written has fresh files and no manifest yet; leave it
+                if now - created > self.ttl:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    continue
+                runs.append((created, size, directory))
+                total += size
+
+            if total <= self.max_bytes:
+                return
+            runs.sort()
+            for _created, size, directory in runs:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(directory, ignore_errors=True)
+                total -= size
+
+
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """
+    Return the process-wide ArtifactStore, or None if CREWMIND_ARTIFACTS is off.
+    """
+    global _artifact_store
+    if os.getenv('CREWMIND_ARTIFACTS', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore(
+                directory=os.path.expanduser(os.getenv('CREWMIND_ARTIFACTS_DIR') or DEFAULT_ARTIFACTS_DIR),
+                ttl=float(os.getenv('CREWMIND_ARTIFACTS_TTL', DEFAULT_TTL)),
+                max_bytes=int(float(os.getenv('CREWMIND_ARTIFACTS_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+            )
+    return _artifact_store
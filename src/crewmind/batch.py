@@ -0,0 +1,72 @@
+"""
+Batch planning: run many goals through the crew with bounded concurrency.
+
+The input is a JSONL file where every line is a goal input dict with the same
+keys app.py builds (user_goal, timeline, available_time, motivation_level,
+...). One result record is appended to the output JSONL as each run finishes,
+so partial results are usable while a large cohort is still in progress.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from crewmind.runner import run_crew
+from crewmind.structured import plan_document
+
+REQUIRED_KEYS = ('user_goal', 'timeline', 'available_time')
+
+
+def read_inputs(input_path: str) -> list:
+    """Read goal input dicts from a JSONL file, skipping blank lines."""
+    records = []
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{input_path}:{line_number}: invalid JSON ({e})") from None
+    return records
+
+
+def run_one(index: int, inputs: dict, submitted_at: float | None = None) -> dict:
+    """Run a single goal and return its result record."""
+    start = time.perf_counter()
+    record = {'index': index, 'inputs': inputs}
+    try:
+        missing = [key for key in REQUIRED_KEYS if not inputs.get(key)]
+        if missing:
+            raise ValueError(f"missing required input(s): {', '.join(missing)}")
+        result = run_crew(inputs, submitted_at=submitted_at)
+        record['status'] = 'ok'
+        record['plan'] = plan_document(result, inputs).to_markdown()
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+    record['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run_batch(input_path: str, output_path: str, concurrency: int = 4, on_result=None) -> dict:
+    """
+    Run every goal in input_path, at most `concurrency` at a time.
+
+    Records are written to output_path in completion order; each carries the
+    0-based `index` of its input line. Returns a summary of the batch.
+    """
+    records = read_inputs(input_path)
+    summary = {'total': len(records), 'ok': 0, 'error': 0}
+
+    with open(output_path, 'w', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(run_one, index, inputs, time.time()) for index, inputs in enumerate(records)]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            summary[record['status']] += 1
+            if on_result:
+                on_result(record)
+
+    return summary
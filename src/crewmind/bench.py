@@ -0,0 +1,293 @@
+"""
+Offline benchmark of everything around the LLM calls.
+
+Every agent is switched to the deterministic FakeLLM (crewmind.fake_llm), so
+the suite needs no API key, costs nothing and gives the same plans on every
+run. For 3-month, 6-month and 1-year plans it times:
+
+    construction.*   building a crew per request (blueprint and Crewmind())
+    run.*            orchestration overhead per task: wall time minus LLM time
+    parse.*          plan parsing, cold and memoized
+    render.*         the results-tab helpers in app.py and the schedule model
+    download.*       formatting the markdown download
+
+Results are written as JSON, one stats dict (milliseconds) per metric, so two
+commits can be compared with `bench --compare baseline.json`.
+
+Usage:
+    bench --output bench.json
+    bench --compare bench.json --threshold 0.2
+"""
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+TIMELINES = ('3 months', '6 months', '1 year')
+
+SAMPLE_INPUTS = {
+    'user_goal': 'Learn Python programming and build 3 projects',
+    'available_time': '10 hours per week',
+    'current_commitments': 'Full-time job',
+    'preferred_schedule': 'Evenings',
+    'goal_type': 'education',
+    'motivation_level': 'High',
+    'difficulty_preference': 'Moderate challenge',
+    'accountability_preference': 'Self-accountability',
+}
+
+APP_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'app.py')
+
+
+def offline_environment(latency: float = 0.0, words: int = 6):
+    """Point every agent at the FakeLLM and switch off caching, metrics files and telemetry."""
+    os.environ['CREWMIND_MODEL'] = 'fake/plan'
+    os.environ['CREWMIND_FAKE_LATENCY'] = str(latency)
+    os.environ['CREWMIND_FAKE_WORDS'] = str(words)
+    os.environ['CREWMIND_CACHE'] = 'off'
+    os.environ['CREWMIND_METRICS'] = 'off'
+    os.environ['CREWMIND_CHUNK_WEEKS'] = '0'
+    os.environ.setdefault('CREWAI_TESTING', 'true')
+    os.environ.setdefault('CREWAI_DISABLE_TELEMETRY', 'true')
+    os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+
+def stats(samples_ms) -> dict:
+    samples = sorted(samples_ms)
+    return {
+        'runs': len(samples),
+        'min_ms': round(samples[0], 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'max_ms': round(samples[-1], 4),
+    }
+
+
+def timed(fn, iterations: int, setup=None) -> dict:
+    """Time fn() `iterations` times after one warm-up call; setup() runs untimed before each."""
+    if setup:
+        setup()
+    fn()
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return stats(samples)
+
+
+def load_app():
+    """Import app.py as a module (Streamlit runs in bare mode), or None if it isn't here."""
+    path = os.path.abspath(APP_PATH)
+    if not os.path.exists(path):
+        return None
+    spec = importlib.util.spec_from_file_location('crewmind_app', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Every st.* call warns about the missing ScriptRunContext in bare mode
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    return module
+
+
+def bench_construction(inputs: dict, iterations: int) -> dict:
+    from crewmind.blueprint import build_crew
+    from crewmind.crew import Crewmind
+    from crewmind.inputs import DEFAULT_INPUTS
+
+    def crewmind_path():
+        crew = Crewmind().crew()
+        crew._interpolate_inputs({**DEFAULT_INPUTS, 'knowledge': '', **inputs})
+
+    return {
+        'construction.blueprint': timed(lambda: build_crew(inputs, verbose=False), iterations),
+        'construction.crewmind': timed(crewmind_path, max(1, iterations // 4)),
+    }
+
+
+def bench_run(inputs: dict, runs: int) -> tuple:
+    """
+    Kick off the crew `runs` times. Returns the per-task overhead stats and
+    the last result.
+    """
+    from crewmind.blueprint import build_crew
+    from crewmind.metrics import RunMetrics
+
+    overhead = {}
+    result = None
+    for run in range(runs + 1):
+        metrics = RunMetrics(inputs=inputs)
+        with metrics.attach():
+            result = build_crew(inputs, verbose=False).kickoff()
+        if run == 0:
+            continue  # warm-up
+        record = metrics.to_dict()
+        llm_total = 0.0
+        for name, task in record['tasks'].items():
+            overhead.setdefault(f'run.{name}.overhead', []).append((task['wall_s'] - task['llm_s']) * 1000)
+            llm_total += task['llm_s']
+        overhead.setdefault('run.total.overhead', []).append((record['wall_s'] - llm_total) * 1000)
+        overhead.setdefault('run.total.wall', []).append(record['wall_s'] * 1000)
+    return {name: stats(samples) for name, samples in overhead.items()}, result
+
+
+def bench_parsing(text: str, iterations: int) -> dict:
+    from crewmind.plan import _Parser, parse_plan
+
+    return {
+        'parse.cold': timed(lambda: _Parser().parse(text), iterations),
+        'parse.memoized': timed(lambda: parse_plan(text), iterations),
+    }
+
+
+def bench_rendering(doc, app, iterations: int) -> dict:
+    from crewmind import schedule
+
+    def first_page():
+        frame = schedule.filter_schedule(schedule.schedule_frame(doc), '')
+        for week in schedule.week_numbers(frame)[:4]:
+            schedule.week_table(frame, week)
+
+    results = {
+        'render.schedule_frame.cold': timed(lambda: schedule.schedule_frame(doc), iterations,
+                                            setup=schedule._cache.clear),
+        'render.week_page': timed(first_page, iterations),
+        'render.search': timed(lambda: schedule.filter_schedule(schedule.schedule_frame(doc), 'review'),
+                               iterations),
+    }
+    if app is not None:
+        # The tabs are st.fragment functions, which draw nothing outside a
+        # script run; time the functions they wrap
+        for name in ('formatted_plan', 'weekly_breakdown', 'success_tips'):
+            render = getattr(app, f'display_{name}')
+            render = getattr(render, '__wrapped__', render)
+            results[f'render.app.{name}'] = timed(lambda render=render: render(doc), iterations)
+    return results
+
+
+def bench_download(inputs: dict, doc, app, iterations: int) -> dict:
+    results = {'download.to_markdown': timed(doc.to_markdown, iterations)}
+    if app is not None:
+        results['download.app.format'] = timed(lambda: app.format_download_content(inputs, doc.to_markdown()), iterations)
+    return results
+
+
+def environment_info() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    try:
+        from importlib.metadata import version
+        crewai_version = version('crewai')
+    except Exception:
+        crewai_version = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'crewai': crewai_version,
+        'platform': platform.platform(),
+    }
+
+
+def run_benchmarks(iterations: int = 20, runs: int = 3, latency: float = 0.0, words: int = 6,
+                   timelines=TIMELINES) -> dict:
+    """
+    Run the whole suite offline and return the results as a JSON-able dict.
+    """
+    offline_environment(latency=latency, words=words)
+    from crewmind.structured import plan_document
+
+    app = load_app()
+    results = {}
+    for timeline in timelines:
+        inputs = {**SAMPLE_INPUTS, 'timeline': timeline}
+        metrics = bench_construction(inputs, iterations)
+        run_metrics, result = bench_run(inputs, runs)
+        metrics.update(run_metrics)
+        doc = plan_document(result, inputs)
+        metrics.update(bench_parsing(result.raw, iterations))
+        metrics.update(bench_rendering(doc, app, iterations))
+        metrics.update(bench_download(inputs, doc, app, iterations))
+        results[timeline] = {
+            'plan': {'chars': len(result.raw), 'weeks': len(doc.weeks), 'sections': len(doc.sections)},
+            'metrics': metrics,
+        }
+
+    return {
+        'environment': environment_info(),
+        'config': {'iterations': iterations, 'runs': runs, 'latency_s': latency, 'words_per_cell': words,
+                   'app_helpers': app is not None},
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    Median changes between two result files, as (timeline, metric, base ms,
+    current ms, relative change, regressed) rows.
+    """
+    rows = []
+    for timeline, result in current['results'].items():
+        base_metrics = baseline.get('results', {}).get(timeline, {}).get('metrics', {})
+        for name, values in result['metrics'].items():
+            if name not in base_metrics:
+                continue
+            base, now = base_metrics[name]['median_ms'], values['median_ms']
+            change = (now - base) / base if base else 0.0
+            rows.append((timeline, name, base, now, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark crew construction, orchestration, parsing and "
+                                                 "rendering offline with a fake LLM.")
+    parser.add_argument('--output', help="write the results JSON here (default: stdout)")
+    parser.add_argument('--compare', help="results JSON of a previous commit to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative median slowdown reported as a regression (default: 0.2)")
+    parser.add_argument('--iterations', type=int, default=20, help="timed iterations per micro-benchmark")
+    parser.add_argument('--runs', type=int, default=3, help="crew kickoffs per timeline")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument('--words', type=int, default=6, help="words per schedule cell in the fake plans")
+    parser.add_argument('--timeline', action='append', help="timeline(s) to run (default: 3/6/12 months)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(iterations=args.iterations, runs=args.runs, latency=args.latency,
+                             words=args.words, timelines=args.timeline or TIMELINES)
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+        print(f"📊 Results written to {args.output}")
+    elif not args.compare:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        for timeline, name, base, now, change, regressed in rows:
+            flag = ' ⚠️' if regressed else ''
+            print(f"{timeline:<10} {name:<36} {base:>10.3f} ms → {now:>10.3f} ms  {change:+7.1%}{flag}")
+        regressions = sum(1 for row in rows if row[-1])
+        print(f"{regressions} regression(s) over {args.threshold:.0%}")
+        if regressions:
+            sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
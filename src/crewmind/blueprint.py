@@ -0,0 +1,312 @@
+"""
+Process-wide compiled blueprint of the Goal Tracker Crew.
+
+Crewmind() re-reads both YAML files and re-runs the CrewBase decorator
+machinery every time it is instantiated. The blueprint parses
+config/agents.yaml and config/tasks.yaml once, compiles their `{{var}}`
+templates, and stamps out a fresh crew per request from that. It reloads
+itself when either YAML file (or the model routing file, see
+crewmind.routing) changes on disk.
+
+Usage:
+    crew = build_crew(inputs)
+    result = crew.kickoff()
+
+Run `python -m crewmind.blueprint` to compare per-request construction time
+against Crewmind().crew().
+"""
+import os
+import re
+import threading
+import time
+
+import yaml
+from crewai import Agent, Crew, Process, Task
+
+from crewmind.inputs import DEFAULT_INPUTS, canonical_inputs, timeline_weeks
+from crewmind.knowledge import knowledge_context
+from crewmind.llm import build_llm
+from crewmind.logs import verbose_enabled
+from crewmind.routing import RoutedLLM, Routing, routing_path
+from crewmind.structured import TASK_OUTPUT_MODELS, structured_enabled
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
+
+AGENT_TEMPLATE_FIELDS = ('role', 'goal', 'backstory')
+TASK_TEMPLATE_FIELDS = ('description', 'expected_output', 'structured_description', 'structured_expected_output',
+                        'chunk_scope')
+
+# tasks.yaml keys with this prefix replace their base field in structured mode
+STRUCTURED_PREFIX = 'structured_'
+
+# tasks.yaml key appended to a task's description and expected output when it
+# only covers a range of weeks (see crewmind.runner)
+CHUNK_SCOPE = 'chunk_scope'
+
+_TEMPLATE_VAR = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+
+
+class Template:
+    """
+    A `{{var}}` template pre-split into literal text and variable names.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = _TEMPLATE_VAR.split(source)
+        self.literals = parts[0::2]
+        self.variables = parts[1::2]
+
+    def render(self, inputs: dict) -> str:
+        out = [self.literals[0]]
+        for variable, literal in zip(self.variables, self.literals[1:]):
+            try:
+                out.append(str(inputs[variable]))
+            except KeyError:
+                raise KeyError(f"Template variable '{variable}' not found in inputs") from None
+            out.append(literal)
+        return ''.join(out)
+
+
+def _compile(config: dict, template_fields) -> tuple:
+    """Split a YAML entry into its static settings and compiled templates."""
+    static = {k: v for k, v in config.items() if k not in template_fields}
+    templates = {k: Template(v) for k, v in config.items() if k in template_fields}
+    return static, templates
+
+
+class CrewBlueprint:
+    """
+    Parsed and compiled crew configuration, shared by every request.
+    """
+
+    def __init__(self, config_dir: str = CONFIG_DIR):
+        self.agents_path = os.path.join(config_dir, 'agents.yaml')
+        self.tasks_path = os.path.join(config_dir, 'tasks.yaml')
+        self.routing_path = routing_path()
+        self.mtimes = self._read_mtimes()
+
+        with open(self.agents_path, 'r', encoding='utf-8') as f:
+            self.agents_config = yaml.safe_load(f)
+        with open(self.tasks_path, 'r', encoding='utf-8') as f:
+            self.tasks_config = yaml.safe_load(f)
+
+        self.agents = {name: _compile(config, AGENT_TEMPLATE_FIELDS)
+                       for name, config in self.agents_config.items()}
+        self.tasks = {name: _compile(config, TASK_TEMPLATE_FIELDS)
+                      for name, config in self.tasks_config.items()}
+        self.routing = Routing.load(self.routing_path) if self.routing_path else None
+
+        # Which inputs each task's prompts read, for incremental re-runs
+        self.task_inputs = {}
+        for name, (static, templates) in self.tasks.items():
+            variables = {v for template in templates.values() for v in template.variables}
+            variables.update(v for template in self.agents[static['agent']][1].values() for v in template.variables)
+            if 'knowledge' in variables:
+                # Looked up from the goal and the user's own knowledge files
+                variables.add('user_id')
+            self.task_inputs[name] = frozenset(variables)
+
+        # LLM clients hold no per-request state, so every crew shares them
+        self._llms = {}
+        self._llms_lock = threading.Lock()
+
+    def _read_mtimes(self) -> tuple:
+        paths = [self.agents_path, self.tasks_path] + ([self.routing_path] if self.routing_path else [])
+        return tuple(os.stat(path).st_mtime_ns for path in paths)
+
+    def is_stale(self) -> bool:
+        """Whether a YAML file or the routing settings changed since the blueprint was compiled."""
+        if routing_path() != self.routing_path:
+            return True
+        try:
+            return self._read_mtimes() != self.mtimes
+        except OSError:
+            return False
+
+    def invalidated_tasks(self, old_inputs: dict, new_inputs: dict) -> list:
+        """
+        Tasks whose output changes when old_inputs become new_inputs.
+
+        A task is invalidated when an input its own templates or its agent's
+        templates read has changed, or when a task it takes as context is
+        invalidated. The others can be reused from the previous run. Both
+        sets of inputs are compared in canonical form.
+        """
+        old_inputs = canonical_inputs(old_inputs)
+        new_inputs = canonical_inputs(new_inputs)
+        changed = {key for key in old_inputs.keys() | new_inputs.keys()
+                   if str(old_inputs.get(key)) != str(new_inputs.get(key))}
+        invalid = []
+        for name, (static, _) in self.tasks.items():
+            if self.task_inputs[name] & changed or any(dep in invalid for dep in static.get('context', [])):
+                invalid.append(name)
+        return invalid
+
+    def llm(self, agent_name: str, stream: bool = False, max_tokens: int | None = None, model: str | None = None):
+        """The shared LLM of an agent, or of an agent with another model when routed."""
+        with self._llms_lock:
+            key = (agent_name, stream, max_tokens, model)
+            if key not in self._llms:
+                config = self.agents_config[agent_name]
+                if model is not None:
+                    config = {**config, 'llm': model}
+                self._llms[key] = build_llm(config, stream=stream, max_tokens=max_tokens)
+            return self._llms[key]
+
+    def agent_llm(self, agent_name: str, stream: bool, max_tokens: int | None, task_weeks: dict,
+                  structured: bool = False):
+        """
+        The LLM for an agent in one crew: its own, or a RoutedLLM when the
+        routing file has routes for its tasks. Only primary models stream.
+        """
+        llm = self.llm(agent_name, stream, max_tokens)
+        tasks = [name for name, (static, _) in self.tasks.items() if static.get('agent') == agent_name]
+        if self.routing is None or not any(self.routing.tasks.get(name) for name in tasks):
+            return llm
+
+        def resolve(model, primary):
+            return self.llm(agent_name, stream and primary, max_tokens, model=model)
+
+        return RoutedLLM(llm, self.routing, resolve, task_weeks, structured, streamed=stream)
+
+    def crew(self, inputs: dict, verbose: bool | None = None, stream: bool = False, structured: bool | None = None,
+             only=None, outputs: dict | None = None, week_range: tuple | None = None,
+             max_tokens: int | None = None, **crew_kwargs) -> Crew:
+        """
+        Build a fresh crew with every template already rendered from inputs.
+
+        The crew should be started with kickoff() and no inputs, since there
+        is nothing left for crewAI to interpolate. With structured=True (or
+        CREWMIND_STRUCTURED_OUTPUT set) each task returns its Pydantic model
+        from crewmind.structured. Extra keyword arguments (task_callback,
+        step_callback, ...) are passed on to Crew.
+
+        To run part of the pipeline, pass the task names to run as `only` and
+        the TaskOutputs of the tasks they depend on as `outputs`; those tasks
+        are used as context but not run again. week_range=(start, end) limits
+        the tasks that have a chunk_scope to those weeks, and max_tokens caps
+        each LLM response. Unless inputs has `knowledge` (run_crew() looks it
+        up once per run), the chunks of the knowledge files most relevant to
+        the goal are looked up for it (see crewmind.knowledge). verbose defaults to CREWMIND_VERBOSE, off if
+        unset (see crewmind.logs).
+        """
+        if verbose is None:
+            verbose = verbose_enabled()
+        inputs = {**DEFAULT_INPUTS, **inputs}
+        if 'knowledge' not in inputs:
+            inputs['knowledge'] = knowledge_context(inputs)
+        if structured is None:
+            structured = structured_enabled()
+        outputs = outputs or {}
+        run = list(self.tasks) if only is None else [name for name in self.tasks if name in only]
+        if week_range is not None:
+            inputs['week_start'], inputs['week_end'] = week_range
+
+        # Weeks each task covers, for the routing rules' output size estimates
+        total = timeline_weeks(inputs.get('timeline', '')) or 0
+        task_weeks = {name: week_range[1] - week_range[0] + 1
+                      if week_range is not None and CHUNK_SCOPE in templates else total
+                      for name, (_, templates) in self.tasks.items()}
+
+        # Tasks to build: the ones to run plus everything they take as context
+        needed = set(run)
+        for name in reversed(list(self.tasks)):
+            if name in needed:
+                needed.update(self.tasks[name][0].get('context', []))
+        missing = needed.difference(run, outputs)
+        if missing:
+            raise ValueError(f"No output given for context task(s): {', '.join(sorted(missing))}")
+
+        agents = {}
+        tasks = {}
+        for name, (static, templates) in self.tasks.items():
+            if name not in needed:
+                continue
+            config = {**static, **{k: t.render(inputs) for k, t in templates.items() if k != CHUNK_SCOPE}}
+            for key in [k for k in config if k.startswith(STRUCTURED_PREFIX)]:
+                value = config.pop(key)
+                if structured:
+                    config[key[len(STRUCTURED_PREFIX):]] = value
+            if week_range is not None and CHUNK_SCOPE in templates:
+                scope = templates[CHUNK_SCOPE].render(inputs)
+                config['description'] += '\n\n' + scope
+                config['expected_output'] += '\n\n' + scope
+            if structured and name in TASK_OUTPUT_MODELS:
+                config['output_pydantic'] = TASK_OUTPUT_MODELS[name]
+            agent_name = config.pop('agent')
+            if agent_name not in agents:
+                agent_config = {**self.agents[agent_name][0],
+                                **{k: t.render(inputs) for k, t in self.agents[agent_name][1].items()}}
+                agents[agent_name] = Agent(config=agent_config, verbose=verbose,
+                                           llm=self.agent_llm(agent_name, stream, max_tokens, task_weeks,
+                                                              structured))
+            kwargs = {}
+            if 'context' in config:
+                kwargs['context'] = [tasks[dep] for dep in config.pop('context')]
+            tasks[name] = Task(config=config, name=name, agent=agents[agent_name], **kwargs)
+            if name in outputs and name not in run:
+                tasks[name].output = outputs[name]
+
+        crew_agents = list({id(tasks[name].agent): tasks[name].agent for name in run}.values())
+        crew_kwargs.setdefault('process', Process.sequential)
+        return Crew(agents=crew_agents, tasks=[tasks[name] for name in run], verbose=verbose, **crew_kwargs)
+
+
+_blueprint = None
+_blueprint_lock = threading.Lock()
+
+
+def get_blueprint() -> CrewBlueprint:
+    """
+    Return the process-wide blueprint, recompiling it if the YAML changed.
+    """
+    global _blueprint
+    with _blueprint_lock:
+        if _blueprint is None or _blueprint.is_stale():
+            _blueprint = CrewBlueprint()
+        return _blueprint
+
+
+def build_crew(inputs: dict, **crew_kwargs) -> Crew:
+    """
+    Build a ready-to-run crew for one request.
+    """
+    return get_blueprint().crew(inputs, **crew_kwargs)
+
+
+def measure_construction(inputs: dict, iterations: int = 20) -> dict:
+    """
+    Time per-request crew construction, old path vs blueprint, in milliseconds.
+
+    The Crewmind() figure includes the interpolation crewAI would otherwise
+    do at kickoff, since the blueprint does that work up front.
+    """
+    from crewmind.crew import Crewmind
+
+    def timed(build):
+        build()  # warm up imports and the blueprint
+        start = time.perf_counter()
+        for _ in range(iterations):
+            build()
+        return (time.perf_counter() - start) * 1000 / iterations
+
+    def old_path():
+        crew = Crewmind().crew()
+        crew._interpolate_inputs({**DEFAULT_INPUTS, 'knowledge': '', **inputs})
+
+    return {
+        'crewmind_ms': timed(old_path),
+        'blueprint_ms': timed(lambda: build_crew(inputs)),
+    }
+
+
+if __name__ == "__main__":
+    sample_inputs = {
+        'user_goal': 'Learn Python programming and build 3 projects',
+        'timeline': '6 months',
+        'available_time': '10 hours per week',
+    }
+    timings = measure_construction(sample_inputs)
+    print(f"Crewmind().crew(): {timings['crewmind_ms']:.1f} ms per request")
+    print(f"build_crew():      {timings['blueprint_ms']:.1f} ms per request")
@@ -0,0 +1,183 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Resubmitting the same goal (after "Edit Goal" or "Try Again") renders exactly
+the same prompts, so the responses can be served from disk instead of paying
+for another 30-90 second round trip to Gemini.
+
+Configuration (environment variables):
+    CREWMIND_CACHE          set to 'off' to disable the cache
+    CREWMIND_CACHE_DIR      cache directory (default: ~/.cache/crewmind/responses)
+    CREWMIND_CACHE_TTL      entry lifetime in seconds (default: 7 days)
+    CREWMIND_CACHE_MAX_MB   size budget before LRU eviction kicks in (default: 200)
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'crewmind', 'responses')
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_MB = 200
+
+# Expired entries are swept at most this often, since a sweep walks the
+# whole cache; the size budget is checked against a running total instead
+SWEEP_INTERVAL = 60
+# Eviction frees down to this share of max_bytes, so that a full cache
+# isn't swept again on the very next write
+LOW_WATER = 0.9
+
+
+class ResponseCache:
+    """
+    On-disk key/value store with a TTL and a size-based LRU eviction policy.
+
+    Entries are JSON files named after the SHA-256 of their key. A hit bumps
+    the file's mtime, so the oldest mtimes are the least recently used entries
+    and are evicted first once the directory grows past max_bytes.
+
+    The cache's size is counted at each sweep and kept up to date on every
+    write, so a write only walks the directory when the budget is exceeded
+    or the last sweep is over SWEEP_INTERVAL old. Writes by other processes
+    sharing the directory are counted at the next sweep.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._size = None
+        self._swept = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(**parts) -> str:
+        """Hash the given parts into a stable cache key."""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, key: str):
+        """Return the cached response for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('created', 0) > self.ttl:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('response')
+
+    def set(self, key: str, response: str):
+        """Store a response and evict old entries if over budget."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+
+        # Write to a temp file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'created': time.time(), 'response': response}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            written = os.path.getsize(path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._size is not None:
+                self._size += written - replaced
+            due = (self._size is None or self._size > self.max_bytes
+                   or time.time() - self._swept > SWEEP_INTERVAL)
+        if due:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop expired entries, then, if over max_bytes, least recently used
+        ones until under LOW_WATER of it.
+        """
+        with self._lock:
+            now = time.time()
+            self._swept = now
+            entries = []
+            total = 0
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith('.json'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    # mtime is refreshed on every hit, so an entry untouched for
+                    # longer than the TTL is certainly expired
+                    if now - stat.st_mtime > self.ttl:
+                        self._remove(path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            if total > self.max_bytes:
+                entries.sort()
+                for _mtime, size, path in entries:
+                    if total <= self.max_bytes * LOW_WATER:
+                        break
+                    self._remove(path)
+                    total -= size
+            self._size = total
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    self._remove(os.path.join(root, name))
+            self._size = 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide ResponseCache, or None if caching is disabled.
+    """
+    global _response_cache
+    if os.getenv('CREWMIND_CACHE', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                directory=os.getenv('CREWMIND_CACHE_DIR') or DEFAULT_CACHE_DIR,
+                max_bytes=int(float(os.getenv('CREWMIND_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+                ttl=float(os.getenv('CREWMIND_CACHE_TTL', DEFAULT_TTL)),
+            )
+    return _response_cache
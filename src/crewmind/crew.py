@@ -2,6 +2,8 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
+from crewmind.llm import build_llm
+from crewmind.logs import verbose_enabled
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -18,14 +20,16 @@ class Crewmind():
     def goal_tracker_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['goal_tracker_agent'], # type: ignore[index]
-            verbose=True
+            llm=build_llm(self.agents_config['goal_tracker_agent']), # type: ignore[index]
+            verbose=verbose_enabled()
         )
 
     @agent
     def planner_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['planner_agent'], # type: ignore[index]
-            verbose=True
+            llm=build_llm(self.agents_config['planner_agent']), # type: ignore[index]
+            verbose=verbose_enabled()
         )
 
     # To learn more about structured task outputs,
@@ -47,7 +51,6 @@ class Crewmind():
     def daily_planning_task(self) -> Task:
         return Task(
             config=self.tasks_config['daily_planning_task'], # type: ignore[index]
-            output_file='daily_plan.md'
         )
 
     @crew
@@ -61,6 +64,6 @@ class Crewmind():
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
-            verbose=True,
+            verbose=verbose_enabled(),
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
@@ -0,0 +1,232 @@
+"""
+Plan export as calendar events: ICS, CSV or JSON.
+
+plan_events() expands a PlanDocument's weekly schedule into one dated event
+per day and time slot across the whole timeline. A week the schedule doesn't
+list repeats the last week before it that it does, so a plan whose schedule
+covers "Weeks 1-4" still fills a one-year calendar. Events are generated
+lazily, and the writers yield the file in small pieces, so a one-year plan
+exports in constant memory. Nothing is built until a download is asked for.
+
+Usage:
+    for chunk in export_plan(doc, inputs, 'ics', start=date(2026, 1, 5)):
+        f.write(chunk)
+
+Slot times: Morning 08:00, Afternoon 13:00, Evening 18:00 and Night 20:00.
+Other slots ("Key Tasks") become all-day events. Each timed event lasts the
+weekly time budget (see crewmind.inputs) divided over that week's timed
+events, between 15 minutes and 3 hours (1 hour if the budget is unknown).
+"""
+import csv
+import io
+import json
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from crewmind.inputs import timeline_weeks, weekly_hours
+
+FORMATS = {
+    'ics': ('text/calendar', 'ics'),
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+}
+
+SLOT_TIMES = {'morning': 8, 'afternoon': 13, 'evening': 18, 'night': 20}
+DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+MIN_MINUTES = 15
+MAX_MINUTES = 180
+DEFAULT_MINUTES = 60
+
+CSV_COLUMNS = ('date', 'start', 'end', 'all_day', 'week', 'day', 'slot', 'activity')
+
+_DAY_NUMBER = re.compile(r'^day\s*(\d+)', re.IGNORECASE)
+
+
+class Event:
+    """One scheduled activity on one date."""
+
+    __slots__ = ('week', 'day', 'slot', 'activity', 'start', 'minutes')
+
+    def __init__(self, week: int, day: str, slot: str, activity: str, start, minutes: int | None):
+        self.week = week
+        self.day = day
+        self.slot = slot
+        self.activity = activity
+        self.start = start          # a datetime, or a date for an all-day event
+        self.minutes = minutes      # None for an all-day event
+
+    @property
+    def all_day(self) -> bool:
+        return self.minutes is None
+
+    @property
+    def end(self):
+        return self.start + (timedelta(days=1) if self.all_day else timedelta(minutes=self.minutes))
+
+    def to_dict(self) -> dict:
+        return {
+            'date': (self.start if self.all_day else self.start.date()).isoformat(),
+            'start': None if self.all_day else self.start.strftime('%H:%M'),
+            'end': None if self.all_day else self.end.strftime('%H:%M'),
+            'all_day': self.all_day,
+            'week': self.week,
+            'day': self.day,
+            'slot': self.slot,
+            'activity': self.activity,
+        }
+
+
+def day_offset(day: str):
+    """Days after Monday of a schedule row's day ('Tuesday', 'Tue', 'Day 3'), or None."""
+    text = day.strip().lower()
+    for offset, name in enumerate(DAY_NAMES):
+        if len(text) >= 3 and name.startswith(text[:3]):
+            return offset
+    match = _DAY_NUMBER.match(text)
+    if match and 1 <= int(match.group(1)) <= 7:
+        return int(match.group(1)) - 1
+    return None
+
+
+def next_monday(today: date | None = None) -> date:
+    """The day a plan starts by default: today if it's a Monday, else next Monday."""
+    today = today or date.today()
+    return today + timedelta(days=-today.weekday() % 7)
+
+
+def plan_events(doc, inputs: dict, start: date | None = None):
+    """
+    Yield the plan's events in date order, from the Monday of `start`'s week
+    (default: next_monday()) to the end of the timeline.
+    """
+    if not doc.weeks:
+        return
+    start = start or next_monday()
+    monday = start - timedelta(days=start.weekday())
+    listed = {week.number: week for week in doc.weeks}
+    total = timeline_weeks(inputs.get('timeline', '')) or max(listed)
+    hours = weekly_hours(inputs.get('available_time', ''))
+
+    pattern = doc.weeks[0]
+    for number in range(1, total + 1):
+        pattern = listed.get(number, pattern)
+        cells = []
+        for row in pattern.rows:
+            offset = day_offset(row[0]) if row else None
+            if offset is None:
+                continue
+            for slot, activity in zip(pattern.columns[1:], row[1:]):
+                activity = activity.strip()
+                if activity and activity not in ('-', '—'):
+                    cells.append((offset, row[0].strip(), slot, activity))
+
+        timed = sum(1 for _, _, slot, _ in cells if slot.strip().lower() in SLOT_TIMES)
+        minutes = DEFAULT_MINUTES
+        if hours and timed:
+            minutes = int(min(MAX_MINUTES, max(MIN_MINUTES, round(hours * 60 / timed / 15) * 15)))
+
+        week_start = monday + timedelta(weeks=number - 1)
+        for offset, day, slot, activity in sorted(cells, key=lambda cell: cell[0]):
+            day_date = week_start + timedelta(days=offset)
+            hour = SLOT_TIMES.get(slot.strip().lower())
+            if hour is None:
+                yield Event(number, day, slot, activity, day_date, None)
+            else:
+                yield Event(number, day, slot, activity, datetime.combine(day_date, datetime.min.time())
+                            .replace(hour=hour), minutes)
+
+
+# --- ICS ---
+
+def _ics_text(text: str) -> str:
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ics_line(line: str) -> str:
+    """Fold a content line at 75 octets, as RFC 5545 requires."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def iter_ics(events, title: str, uid_prefix: str = 'crewmind'):
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield _ics_line('BEGIN:VCALENDAR')
+    yield _ics_line('VERSION:2.0')
+    yield _ics_line('PRODID:-//CrewMind//Goal Plan//EN')
+    yield _ics_line('CALSCALE:GREGORIAN')
+    yield _ics_line(f'X-WR-CALNAME:{_ics_text(title)}')
+    for index, event in enumerate(events):
+        if event.all_day:
+            start = f'DTSTART;VALUE=DATE:{event.start:%Y%m%d}'
+            end = f'DTEND;VALUE=DATE:{event.end:%Y%m%d}'
+        else:
+            start = f'DTSTART:{event.start:%Y%m%dT%H%M%S}'
+            end = f'DTEND:{event.end:%Y%m%dT%H%M%S}'
+        yield ''.join(_ics_line(line) for line in (
+            'BEGIN:VEVENT',
+            f'UID:{uid_prefix}-{index}@crewmind',
+            f'DTSTAMP:{stamp}',
+            start,
+            end,
+            f'SUMMARY:{_ics_text(event.activity)}',
+            f'DESCRIPTION:{_ics_text(f"{title} (week {event.week}, {event.slot})")}',
+            'END:VEVENT',
+        ))
+    yield _ics_line('END:VCALENDAR')
+
+
+# --- CSV and JSON ---
+
+def iter_csv(events):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for event in events:
+        writer.writerow(event.to_dict())
+        # Hand over what's written so far instead of letting the buffer grow
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_json(events, title: str, inputs: dict):
+    yield '{"title": ' + json.dumps(title, ensure_ascii=False)
+    yield ', "inputs": ' + json.dumps(inputs, ensure_ascii=False, default=str)
+    yield ', "events": ['
+    for index, event in enumerate(events):
+        yield (',\n  ' if index else '\n  ') + json.dumps(event.to_dict(), ensure_ascii=False)
+    yield '\n]}\n'
+
+
+def export_plan(doc, inputs: dict, fmt: str, start: date | None = None):
+    """
+    Yield the plan in fmt ('ics', 'csv' or 'json') as UTF-8 byte chunks.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; use one of {', '.join(FORMATS)}")
+    events = plan_events(doc, inputs, start)
+    title = doc.title or f"Goal plan: {inputs.get('user_goal', '')}"
+    if fmt == 'ics':
+        chunks = iter_ics(events, title, uid_prefix=(doc.digest or 'plan')[:16])
+    elif fmt == 'csv':
+        chunks = iter_csv(events)
+    else:
+        chunks = iter_json(events, title, inputs)
+    for chunk in chunks:
+        yield chunk.encode('utf-8')
+
+
+def export_bytes(doc, inputs: dict, fmt: str, start: date | None = None) -> bytes:
+    """The whole export at once, for callers that need bytes (st.download_button)."""
+    return b''.join(export_plan(doc, inputs, fmt, start))
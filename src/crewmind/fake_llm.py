@@ -0,0 +1,195 @@
+"""
+Deterministic stand-in for Gemini, for benchmarks and load tests.
+
+FakeLLM answers each task with realistic plan content (a SMART goal, one
+schedule table per week of the timeline, the combined plan document) without
+touching the network. The same prompt always gets the same answer, and the
+size of the answer and the time it takes are configurable, so runs are
+comparable between commits and cost nothing.
+
+Select it with a `fake/...` model: set CREWMIND_MODEL=fake/plan to use it
+for every agent, or put it in agents.yaml or config/routing.yaml. A
+`fake/<name>@<seconds>` model waits that long before answering, overriding
+CREWMIND_FAKE_LATENCY, so routes can be given slow and fast fake tiers.
+
+Configuration (environment variables):
+    CREWMIND_FAKE_LATENCY      seconds before the first token (default: 0)
+    CREWMIND_FAKE_TOKENS_PER_S generation speed; 0 is instant (default: 0)
+    CREWMIND_FAKE_WORDS        words per schedule cell (default: 6)
+"""
+import hashlib
+import os
+import random
+import re
+import time
+
+from crewai.llms.base_llm import BaseLLM
+
+from crewmind.metrics import estimate_tokens
+from crewmind.inputs import timeline_weeks
+from crewmind.structured import FinalPlan, SmartGoal, WeeklySchedule
+
+FAKE_PREFIX = 'fake/'
+
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+SLOTS = ('Morning', 'Afternoon', 'Evening', 'Key Tasks')
+WORDS = (
+    'review', 'practice', 'notes', 'outline', 'draft', 'exercise', 'project', 'reading', 'session', 'plan',
+    'core', 'concepts', 'build', 'test', 'reflect', 'measure', 'progress', 'module', 'chapter', 'drill',
+    'feedback', 'revise', 'summary', 'warm-up', 'deep', 'work', 'checklist', 'milestone', 'goal', 'habit',
+)
+
+_CHUNK = re.compile(r'Only cover weeks (\d+) to (\d+)')
+_TIMELINE = (
+    re.compile(r'timeline "([^"]+)"'),
+    re.compile(r'within ([^.]+)\.'),
+    re.compile(r'\*\*Timeline\*\*: (.+)'),
+)
+_GOAL = re.compile(r'"([^"]+)"')
+
+
+class FakeLLM(BaseLLM):
+    """
+    Offline LLM returning generated plan content for the three tasks.
+    """
+
+    def __init__(self, model: str = 'fake/plan', latency: float = 0.0, tokens_per_second: float = 0.0,
+                 words_per_cell: int = 6, max_tokens: int | None = None, **kwargs):
+        super().__init__(model=model, temperature=kwargs.get('temperature'))
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.words_per_cell = words_per_cell
+        self.max_tokens = max_tokens
+        self.stream = kwargs.get('stream', False)
+
+    @classmethod
+    def from_env(cls, model: str, **kwargs) -> 'FakeLLM':
+        latency = model.split('@', 1)[1] if '@' in model else os.getenv('CREWMIND_FAKE_LATENCY', 0)
+        return cls(
+            model=model,
+            latency=float(latency),
+            tokens_per_second=float(os.getenv('CREWMIND_FAKE_TOKENS_PER_S', 0)),
+            words_per_cell=int(os.getenv('CREWMIND_FAKE_WORDS', 6)),
+            **kwargs,
+        )
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        prompt = messages if isinstance(messages, str) else '\n'.join(str(m.get('content', '')) for m in messages)
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16], 16)
+        name = getattr(from_task, 'name', None) or ''
+        description = '\n'.join(filter(None, [getattr(from_task, 'description', ''),
+                                              getattr(from_task, 'expected_output', '')])) or prompt
+        model = getattr(from_task, 'output_pydantic', None)
+        answer = generate(name, description, random.Random(seed), self.words_per_cell, model)
+
+        if self.max_tokens:
+            answer = answer[:self.max_tokens * 4]
+        delay = self.latency
+        if self.tokens_per_second:
+            delay += estimate_tokens(answer) / self.tokens_per_second
+        if delay:
+            time.sleep(delay)
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
+
+
+def plan_weeks(description: str) -> range:
+    """The weeks a task is asked to cover: its chunk, or the whole timeline."""
+    chunk = _CHUNK.search(description)
+    if chunk:
+        return range(int(chunk.group(1)), int(chunk.group(2)) + 1)
+    for pattern in _TIMELINE:
+        match = pattern.search(description)
+        if match and timeline_weeks(match.group(1)):
+            return range(1, timeline_weeks(match.group(1)) + 1)
+    return range(1, 5)
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _smart_goal(goal: str, weeks: range, rng: random.Random) -> SmartGoal:
+    step = max(1, len(weeks) // 4)
+    targets = sorted({min(weeks[-1], week) for week in range(step, weeks[-1] + step, step)})[:4]
+    return SmartGoal(
+        statement=f"Achieve '{goal}' within {len(weeks)} weeks by following a steady weekly routine.",
+        success_criteria=[_phrase(rng, 6) for _ in range(3)],
+        milestones=[{'title': _phrase(rng, 2), 'target_week': week, 'description': _phrase(rng, 8),
+                     'actions': [_phrase(rng, 4) for _ in range(2)]} for week in targets],
+        obstacles=[_phrase(rng, 7) for _ in range(3)],
+        motivation=_phrase(rng, 10),
+    )
+
+
+def _schedule(weeks: range, rng: random.Random, words: int) -> WeeklySchedule:
+    return WeeklySchedule(entries=[
+        {'week': week, 'day': day, 'slot': slot, 'activity': _phrase(rng, words)}
+        for week in weeks for day in DAYS for slot in SLOTS
+    ])
+
+
+def _final(rng: random.Random) -> FinalPlan:
+    return FinalPlan(
+        summary=_phrase(rng, 30),
+        daily_steps=[_phrase(rng, 10) for _ in range(7)],
+        success_strategies=[_phrase(rng, 10) for _ in range(5)],
+        accountability=[_phrase(rng, 8) for _ in range(2)],
+    )
+
+
+def _schedule_markdown(schedule: WeeklySchedule) -> str:
+    return '\n\n'.join(week.to_markdown() for week in schedule.to_weeks())
+
+
+def generate(task_name: str, description: str, rng: random.Random, words: int = 6, model=None) -> str:
+    """
+    The answer for one task: JSON for a structured task, markdown otherwise.
+    """
+    match = _GOAL.search(description)
+    goal = match.group(1) if match else 'the goal'
+    weeks = plan_weeks(description)
+
+    if task_name == 'goal_setting_task':
+        smart = _smart_goal(goal, weeks, rng)
+        return smart.model_dump_json() if model else smart.to_markdown()
+    if task_name == 'weekly_schedule_task':
+        schedule = _schedule(weeks, rng, words)
+        return schedule.model_dump_json() if model else _schedule_markdown(schedule)
+
+    final = _final(rng)
+    if model:
+        return final.model_dump_json()
+    smart = _smart_goal(goal, weeks, rng)
+    overview = {'Goal': goal, 'Timeline': f"{len(weeks)} weeks"}
+    return '\n\n'.join([
+        f"# Goal Achievement Plan for {goal}",
+        final.summary,
+        "## 📋 Goal Overview\n" + '\n'.join(f"- **{key}**: {value}" for key, value in overview.items()),
+        "## 🎯 SMART Goal Definition\n" + smart.statement + "\n\n**Success Criteria:**\n"
+        + '\n'.join(f"- {item}" for item in smart.success_criteria),
+        "## 🗺️ Milestone Roadmap\n" + '\n'.join(
+            f"{i}. **{m.title}** (by week {m.target_week}): {m.description}"
+            for i, m in enumerate(smart.milestones, start=1)),
+        "## 📅 Weekly Schedule\n\n" + _schedule_markdown(_schedule(weeks, rng, words)),
+        "## ✅ Daily Action Steps\n" + '\n'.join(f"- {step}" for step in final.daily_steps),
+        "## 💡 Success Strategies\n" + '\n'.join(f"- {tip}" for tip in final.success_strategies + final.accountability),
+    ])
+
+
+def fake_response(task_name: str, description: str, seed: int = 0, words: int = 6) -> str:
+    """A plan answer outside a crew run, e.g. to benchmark parsing directly."""
+    return generate(task_name, description, random.Random(seed), words)
+
+
+def is_fake(model: str) -> bool:
+    return (model or '').startswith(FAKE_PREFIX)
@@ -0,0 +1,267 @@
+"""
+SQLite history of every generated plan, with full-text search and
+near-duplicate lookup.
+
+run_crew() adds each finished run: its inputs, the task outputs (compressed)
+and the plan's markdown. An FTS5 index covers the goals and the plan text.
+Before a new goal is generated, the web app asks for a stored plan for the
+same inputs (by fingerprint, see crewmind.inputs), or else one whose goal
+closely matches it and that has the same category, timeline and user. The
+user can then take that plan at once, or start from it, so that only the
+tasks their other answers change are generated again.
+
+Near-duplicates are found in two steps. First the FTS5 index is searched
+for the newest goals that share words with the new goal, restricted to the
+same category, timeline and user through an indexed scope token. Then those
+candidates are scored by the overlap of their goal words (Jaccard
+similarity). Every step is served from an index, so a lookup stays at a few
+milliseconds with hundreds of thousands of plans.
+
+Configuration (environment variables):
+    CREWMIND_HISTORY            set to 'off' to keep no history
+    CREWMIND_HISTORY_DB         database file (default: ~/.cache/crewmind/history.db)
+    CREWMIND_HISTORY_MATCH      goal word overlap that counts as the same goal (default: 0.6)
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from crewmind.inputs import canonical_inputs, fingerprint, timeline_weeks
+
+DEFAULT_HISTORY_DB = os.path.join(os.path.expanduser('~'), '.cache', 'crewmind', 'history.db')
+DEFAULT_MATCH = 0.6
+
+# Newest plans scored for similarity per lookup: those sharing any goal
+# word, and those having every goal word
+CANDIDATES = 200
+ALL_WORDS_CANDIDATES = 20
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'the', 'to', 'of', 'in', 'on', 'for', 'my', 'i', 'me', 'be', 'by', 'with', 'at',
+    'want', 'would', 'like', 'get', 'become', 'able', 'how', 'into', 'from', 'per', 'is', 'it', 'so',
+))
+
+_WORD = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT UNIQUE NOT NULL,
+    created REAL NOT NULL,
+    fingerprint TEXT,
+    scope TEXT NOT NULL,
+    goal_key TEXT NOT NULL,
+    user_goal TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    outputs BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plans_goal ON plans (scope, goal_key, created);
+CREATE INDEX IF NOT EXISTS plans_fingerprint ON plans (fingerprint, created);
+CREATE VIRTUAL TABLE IF NOT EXISTS plans_fts USING fts5 (scope, user_goal, plan, content='');
+"""
+
+
+def goal_words(text: str) -> list:
+    """The words of a goal that identify it, lower-cased, in order."""
+    return [word for word in _WORD.findall((text or '').lower()) if word not in STOPWORDS]
+
+
+def goal_key(text: str) -> str:
+    """Goals with the same key are treated as the same goal."""
+    return ' '.join(sorted(set(goal_words(text))))
+
+
+def goal_scope(inputs: dict) -> str:
+    """
+    An FTS token for the category, timeline and user plans are matched
+    within. Plans for a user_id draw on that user's knowledge files, so they
+    are only matched for the same user.
+    """
+    inputs = canonical_inputs(inputs)
+    timeline = timeline_weeks(inputs.get('timeline'), whole=True) or inputs.get('timeline', '').lower()
+    key = f"{str(inputs['goal_type']).lower()}\x1f{timeline}"
+    if inputs.get('user_id'):
+        key += f"\x1fuser:{inputs['user_id']}"
+    return 's' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard overlap of the goal words of two goals."""
+    a, b = set(goal_words(a)), set(goal_words(b))
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class StoredPlan:
+    """A plan from the history."""
+
+    def __init__(self, run_id: str, created: float, inputs: dict, outputs: list, score: float = 1.0):
+        self.run_id = run_id
+        self.created = created
+        self.inputs = inputs
+        self.outputs = outputs
+        self.score = score
+
+    def result(self):
+        """The stored run as a CrewOutput."""
+        from crewai.crews.crew_output import CrewOutput
+        from crewai.tasks.task_output import TaskOutput
+        from crewai.types.usage_metrics import UsageMetrics
+
+        from crewmind.structured import TASK_OUTPUT_MODELS
+
+        tasks_output = []
+        for entry in self.outputs:
+            model = TASK_OUTPUT_MODELS.get(entry['name'])
+            pydantic = model.model_validate(entry['pydantic']) if model and entry.get('pydantic') else None
+            tasks_output.append(TaskOutput(name=entry['name'], description=entry['name'], agent='',
+                                           raw=entry['raw'], pydantic=pydantic))
+        final = tasks_output[-1]
+        return CrewOutput(raw=final.raw, pydantic=final.pydantic, json_dict=final.json_dict,
+                          tasks_output=tasks_output, token_usage=UsageMetrics())
+
+
+class PlanHistory:
+    """
+    The plan database. Connections are per thread; the file is in WAL mode,
+    so readers never wait for a writer.
+    """
+
+    def __init__(self, path: str, match: float = DEFAULT_MATCH):
+        self.path = path
+        self.match = match
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = self._connect()
+        columns = {row[1] for row in connection.execute("PRAGMA table_info('plans')")}
+        if columns and 'fingerprint' not in columns:
+            connection.execute('ALTER TABLE plans ADD COLUMN fingerprint TEXT')
+        connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def add(self, run_id: str, inputs: dict, result, plan: str | None = None):
+        """
+        Store a finished run. plan is the markdown indexed for search
+        (default: rendered from result).
+        """
+        if plan is None:
+            from crewmind.structured import plan_document
+            plan = plan_document(result, inputs).to_markdown()
+        outputs = [{'name': output.name, 'raw': output.raw,
+                    'pydantic': output.pydantic.model_dump(mode='json') if output.pydantic is not None else None}
+                   for output in result.tasks_output]
+        user_goal = str(inputs.get('user_goal', ''))
+        scope = goal_scope(inputs)
+        connection = self._connect()
+        with connection:
+            connection.execute('BEGIN')
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO plans (run_id, created, fingerprint, scope, goal_key, user_goal, inputs, '
+                'outputs) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (run_id, time.time(), fingerprint(inputs), scope, goal_key(user_goal), user_goal,
+                 json.dumps(inputs, ensure_ascii=False, default=str),
+                 zlib.compress(json.dumps(outputs, ensure_ascii=False).encode('utf-8'))))
+            if cursor.rowcount:
+                connection.execute('INSERT INTO plans_fts (rowid, scope, user_goal, plan) VALUES (?, ?, ?, ?)',
+                                   (cursor.lastrowid, scope, user_goal, plan))
+
+    @staticmethod
+    def _stored(row, score: float = 1.0) -> StoredPlan:
+        run_id, created, inputs, outputs = row
+        return StoredPlan(run_id, created, json.loads(inputs), json.loads(zlib.decompress(outputs)), score)
+
+    def get(self, run_id: str):
+        row = self._connect().execute('SELECT run_id, created, inputs, outputs FROM plans WHERE run_id = ?',
+                                      (run_id,)).fetchone()
+        return self._stored(row) if row else None
+
+    def find_similar(self, inputs: dict):
+        """
+        The newest stored plan for the same inputs (by fingerprint), or else
+        for the same category, timeline and user whose goal matches inputs'
+        goal at least `match`, or None.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT run_id, created, inputs, outputs FROM plans WHERE fingerprint = ? '
+            'ORDER BY created DESC LIMIT 1', (fingerprint(inputs),)).fetchone()
+        if row:
+            return self._stored(row)
+
+        user_goal = str(inputs.get('user_goal', ''))
+        words = goal_words(user_goal)
+        if not words:
+            return None
+        scope = goal_scope(inputs)
+        row = connection.execute(
+            'SELECT run_id, created, inputs, outputs FROM plans WHERE scope = ? AND goal_key = ? '
+            'ORDER BY created DESC LIMIT 1', (scope, goal_key(user_goal))).fetchone()
+        if row:
+            return self._stored(row)
+
+        # Newest first rather than by rank: ranking scores every match, while
+        # rowid order stops after the limit
+        quoted = [f'"{word}"' for word in dict.fromkeys(words)]
+        candidates = {}
+        for terms, limit in ((' AND '.join(quoted), ALL_WORDS_CANDIDATES), (' OR '.join(quoted), CANDIDATES)):
+            candidates.update(connection.execute(
+                'SELECT id, user_goal FROM plans WHERE id IN '
+                '(SELECT rowid FROM plans_fts WHERE plans_fts MATCH ? ORDER BY rowid DESC LIMIT ?)',
+                (f'scope:{scope} AND user_goal:({terms})', limit)).fetchall())
+        best = max(((similarity(user_goal, goal), plan_id) for plan_id, goal in candidates.items()), default=None)
+        if best is None or best[0] < self.match:
+            return None
+        row = connection.execute('SELECT run_id, created, inputs, outputs FROM plans WHERE id = ?',
+                                 (best[1],)).fetchone()
+        return self._stored(row, best[0])
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Full-text search over goals and plans: (run_id, created, user_goal)
+        of the newest plans that have every word of query.
+        """
+        terms = ' '.join(f'"{word}"' for word in _WORD.findall(query.lower()))
+        if not terms:
+            return []
+        return self._connect().execute(
+            'SELECT run_id, created, user_goal FROM plans WHERE id IN '
+            '(SELECT rowid FROM plans_fts WHERE plans_fts MATCH ? ORDER BY rowid DESC LIMIT ?) '
+            'ORDER BY id DESC',
+            (f'{{user_goal plan}}: ({terms})', limit)).fetchall()
+
+    def count(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM plans').fetchone()[0]
+
+
+_plan_history = None
+_plan_history_lock = threading.Lock()
+
+
+def get_plan_history():
+    """
+    Return the process-wide PlanHistory, or None if CREWMIND_HISTORY is off.
+    """
+    global _plan_history
+    if os.getenv('CREWMIND_HISTORY', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+
+    with _plan_history_lock:
+        if _plan_history is None:
+            _plan_history = PlanHistory(
+                path=os.path.expanduser(os.getenv('CREWMIND_HISTORY_DB') or DEFAULT_HISTORY_DB),
+                match=float(os.getenv('CREWMIND_HISTORY_MATCH', DEFAULT_MATCH)),
+            )
+    return _plan_history
@@ -0,0 +1,83 @@
+"""
+One pooled, keep-alive HTTP client for every LLM call in the process.
+
+Left alone, litellm opens a new HTTP client for each streamed Gemini call,
+and keeps separate clients for other call types. Every agent of every run
+then pays for its own TCP and TLS handshakes. get_http_client() returns a
+single httpx.Client that build_llm() hands to each LLM. It is also installed
+as litellm.client_session, the client litellm uses for OpenAI-compatible
+endpoints. Connections to the provider are therefore reused across agents,
+tasks and sessions.
+
+CREWMIND_LLM_BASE_URL points every agent at another endpoint, for example a
+local mock server for load and rate-limit tests:
+
+    CREWMIND_MODEL=openai/mock CREWMIND_LLM_BASE_URL=http://127.0.0.1:8808/v1 crewmind
+
+Configuration (environment variables):
+    CREWMIND_HTTP_MAX_CONNECTIONS  connections open at once (default: 32)
+    CREWMIND_HTTP_KEEPALIVE        idle connections kept open (default: 16)
+    CREWMIND_HTTP_TIMEOUT          seconds to wait for a response (default: 600)
+    CREWMIND_LLM_BASE_URL          API base URL for every agent (default: the provider's)
+"""
+import os
+import threading
+
+import httpx
+
+# litellm providers that take the client as an HTTPHandler `client` argument
+HANDLER_PROVIDERS = ('gemini/', 'vertex_ai/', 'vertex_ai_beta/')
+
+_client = None
+_handler = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the process-wide pooled client, creating it (and installing it
+    in litellm) on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=int(os.getenv('CREWMIND_HTTP_MAX_CONNECTIONS', 32)),
+                    max_keepalive_connections=int(os.getenv('CREWMIND_HTTP_KEEPALIVE', 16)),
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(float(os.getenv('CREWMIND_HTTP_TIMEOUT', 600)), connect=5.0),
+            )
+            import litellm
+            litellm.client_session = _client
+        return _client
+
+
+def llm_client_kwargs(model: str) -> dict:
+    """
+    Keyword arguments for crewai.LLM that route a model's calls through the
+    pooled client.
+    """
+    global _handler
+    kwargs = {}
+    base_url = os.getenv('CREWMIND_LLM_BASE_URL')
+    if base_url:
+        kwargs['base_url'] = base_url
+    client = get_http_client()
+    if model.startswith(HANDLER_PROVIDERS):
+        from litellm.llms.custom_httpx.http_handler import HTTPHandler
+        with _client_lock:
+            if _handler is None or _handler.client is not client:
+                _handler = HTTPHandler(client=client)
+            kwargs['client'] = _handler
+    return kwargs
+
+
+def close_http_client():
+    """Close the pooled client; the next call opens a new one."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
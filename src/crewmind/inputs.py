@@ -0,0 +1,180 @@
+"""
+Canonical goal inputs and their fingerprint.
+
+The web form, the CLI prompts, batch files and API clients describe the same
+request in slightly different ways: "3 Months" or "3 months", "learn  Python"
+or "learn Python", 'None' or '' for no commitments, 'education' or
+'Education', with or without current_year. canonical_inputs() maps all of
+these to one form before a run. Equivalent requests then render identical
+prompts, so the response cache serves them, and are stored with identical
+inputs. The goal keeps the user's casing (acronyms and names stay as they
+were written); only its whitespace is collapsed.
+
+fingerprint() hashes the inputs that shape a plan case-insensitively, with
+durations and time budgets as numbers. "Learn Python." and "learn python",
+"12 months" and "1 year", or "2 hours per day" and "14 hours per week",
+have the same fingerprint. It is the key for deduplication and history
+lookups. Timelines are compared in whole weeks, with a month as 52/12 weeks
+as everywhere else (see timeline_weeks()), so a fingerprint matches the
+length of the schedule that gets generated.
+"""
+import hashlib
+import json
+import re
+
+# Inputs referenced by the templates that not every entry point asks for
+DEFAULT_INPUTS = {
+    'current_commitments': 'None',
+    'preferred_schedule': 'Flexible',
+    'goal_type': 'other',
+    'motivation_level': 'High',
+    'difficulty_preference': 'Moderate challenge',
+    'accountability_preference': 'Self-accountability',
+}
+
+# The inputs a plan depends on; the fingerprint covers exactly these
+PLAN_KEYS = ('user_goal', 'timeline', 'available_time', 'current_commitments', 'preferred_schedule', 'goal_type',
+             'motivation_level', 'difficulty_preference', 'accountability_preference', 'user_id', 'knowledge')
+
+# Inputs that are prepared rather than typed (the knowledge context looked up
+# for a run, see crewmind.knowledge); kept exactly as given
+VERBATIM_KEYS = frozenset(('knowledge',))
+
+# Inputs that are free text in some entry points and a fixed choice in others
+CHOICES = {
+    'goal_type': ("Professional Development", "Health & Fitness", "Personal Growth", "Education", "Creative",
+                  "Financial", "Other"),
+    'motivation_level': ("Low", "Medium", "High", "Very High"),
+    'difficulty_preference': ("Gentle start", "Moderate challenge", "Ambitious push"),
+}
+
+# Ways of saying "no commitments"
+NO_COMMITMENTS = frozenset(('', 'none', 'no', 'n/a', 'na', 'nothing', '-'))
+
+WEEKS_PER_UNIT = {'day': 1 / 7, 'week': 1, 'month': 52 / 12, 'year': 52}
+
+_NUMBER_WORDS = {'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+                 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'half a': 0.5, 'half an': 0.5}
+_AMOUNT = r'(\d+(?:\.\d+)?|half an?|an?|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)'
+_DURATION = re.compile(_AMOUNT + r'?\s*-?\s*(day|week|month|year)s?\b', re.IGNORECASE)
+_TIME_BUDGET = re.compile(_AMOUNT + r'\s*(hours?|hrs?|h|minutes?|mins?|m)\b\s*(?:(?:per|a|an|each|every|/)\s*)?'
+                          r'(day|week|daily|weekly|d|wk|w)\b', re.IGNORECASE)
+
+
+def _amount(text) -> float:
+    if text is None:
+        return 1.0
+    text = ' '.join(text.lower().split())
+    return _NUMBER_WORDS[text] if text in _NUMBER_WORDS else float(text)
+
+
+def _number(value: float) -> str:
+    return f'{value:g}'
+
+
+def _match(pattern, text: str, whole: bool):
+    text = (text or '').strip()
+    return pattern.fullmatch(text) if whole else pattern.search(text)
+
+
+def parse_duration(text: str, whole: bool = False):
+    """
+    (amount, unit) of a duration like '3 Months', 'a year' or 'six weeks'
+    in text, or None. With whole=True, text must be nothing but the duration.
+    """
+    match = _match(_DURATION, text, whole)
+    if not match:
+        return None
+    return _amount(match.group(1)), match.group(2).lower()
+
+
+def timeline_weeks(timeline: str, whole: bool = False):
+    """Length of a timeline like '3 Months' or '1 Year' in whole weeks, or None."""
+    duration = parse_duration(timeline, whole)
+    if duration is None:
+        return None
+    amount, unit = duration
+    return max(1, round(amount * WEEKS_PER_UNIT[unit]))
+
+
+def parse_time_budget(text: str, whole: bool = False):
+    """
+    (hours, 'day' or 'week') of a budget like '10 hours per week' or
+    '30 min daily' in text, or None. With whole=True, text must be nothing
+    but the budget.
+    """
+    match = _match(_TIME_BUDGET, text, whole)
+    if not match:
+        return None
+    amount = _amount(match.group(1))
+    if match.group(2).lower().startswith('m'):
+        amount /= 60
+    period = 'day' if match.group(3).lower() in ('day', 'daily', 'd') else 'week'
+    return amount, period
+
+
+def weekly_hours(available_time: str, whole: bool = False):
+    """Hours per week of a time budget, or None if it can't be parsed."""
+    budget = parse_time_budget(available_time, whole)
+    if budget is None:
+        return None
+    hours, period = budget
+    return hours * 7 if period == 'day' else hours
+
+
+def _text(value) -> str:
+    return ' '.join(str(value).split())
+
+
+def canonical_inputs(inputs: dict) -> dict:
+    """
+    inputs with whitespace and wording normalized, choices in their listed
+    casing (the goal keeps the user's), the optional
+    inputs defaulted and current_year dropped (no prompt reads it).
+    Idempotent; unknown keys are kept as they are.
+    """
+    canonical = {**DEFAULT_INPUTS}
+    for key, value in inputs.items():
+        if key == 'current_year' or value is None:
+            continue
+        canonical[key] = _text(value) if isinstance(value, str) and key not in VERBATIM_KEYS else value
+
+    # Only a timeline or budget that is nothing but a number and unit is
+    # rewritten, so details like "5-10 hours, mostly weekends" are kept
+    duration = parse_duration(canonical.get('timeline'), whole=True)
+    if duration is not None:
+        amount, unit = duration
+        canonical['timeline'] = f"{_number(amount)} {unit}{'' if amount == 1 else 's'}"
+    budget = parse_time_budget(canonical.get('available_time'), whole=True)
+    if budget is not None:
+        hours, period = budget
+        canonical['available_time'] = f"{_number(round(hours, 2))} hour{'' if hours == 1 else 's'} per {period}"
+    if _text(canonical['current_commitments']).lower() in NO_COMMITMENTS:
+        canonical['current_commitments'] = 'None'
+    if not canonical['preferred_schedule']:
+        canonical['preferred_schedule'] = DEFAULT_INPUTS['preferred_schedule']
+    for key, choices in CHOICES.items():
+        value = _text(canonical.get(key, '')).lower()
+        canonical[key] = next((choice for choice in choices if choice.lower() == value), canonical.get(key))
+    return canonical
+
+
+def fingerprint(inputs: dict) -> str:
+    """
+    Stable hash of the inputs a plan depends on, case-folded, with the goal's
+    trailing punctuation dropped, the timeline in weeks and the time budget
+    in hours per week.
+    """
+    canonical = canonical_inputs(inputs)
+    key = {name: canonical[name].casefold() if isinstance(canonical[name], str) else canonical[name]
+           for name in PLAN_KEYS if name in canonical}
+    if isinstance(key.get('user_goal'), str):
+        key['user_goal'] = key['user_goal'].rstrip('.!')
+    weeks = timeline_weeks(canonical.get('timeline'), whole=True)
+    if weeks is not None:
+        key['timeline'] = weeks
+    hours = weekly_hours(canonical.get('available_time'), whole=True)
+    if hours is not None:
+        key['available_time'] = round(hours, 2)
+    payload = json.dumps(key, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
@@ -0,0 +1,283 @@
+"""
+Background execution of crew runs on a shared worker pool.
+
+The Streamlit script thread only submits a job and polls it, so reruns
+(tab clicks, widget changes) never interrupt or repeat a run, and a server
+thread is no longer tied up for the whole LLM chain. Finished jobs are kept
+in memory for a while so their results survive reruns and reconnects.
+
+With a queue limit, submit() raises QueueFull once that many jobs are
+waiting for a worker, so callers can push back (the HTTP service answers
+429) instead of queueing work they can't finish in time.
+
+Identical submissions share one run (single flight). A goal submitted while
+a run for the same inputs (by fingerprint, see crewmind.inputs) is queued or
+in progress gets its own job, attached to that run rather than starting
+another. It shows the same progress and receives the same result or error.
+It takes no worker or queue slot. Cancelling a job detaches it. The run
+itself is only cancelled when no other job waits for it and it hasn't
+started. A failed run isn't reused: the next submission starts a new one.
+
+Configuration (environment variables):
+    CREWMIND_JOB_WORKERS     crew runs executing at once (default: 4)
+    CREWMIND_JOB_QUEUE       jobs that may wait for a worker (default: 0, no limit)
+    CREWMIND_JOB_RETENTION   seconds a finished job is kept (default: 1 hour)
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from crewmind.blueprint import get_blueprint
+from crewmind.inputs import canonical_inputs, fingerprint
+from crewmind.progress import RunProgress
+from crewmind.runner import run_crew
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit() when every worker is busy and the queue is full."""
+
+
+class _Flight:
+    """
+    One crew run and the jobs waiting for it. The run is recorded under the
+    id of the job that started it.
+    """
+
+    def __init__(self, run_id: str, key, inputs: dict, outputs: dict):
+        self.run_id = run_id
+        self.key = key
+        self.inputs = inputs
+        self.outputs = outputs
+        self.jobs = []
+        self.started = False
+        self.future = None
+        self.submitted_at = time.time()
+        self.progress = RunProgress(get_blueprint().tasks, on_update=self.changed)
+
+    def changed(self, *_args):
+        for job in list(self.jobs):
+            job.changed()
+
+
+class Job:
+    """
+    One submission: its inputs, the live progress of its run and, once
+    finished, the result.
+    """
+
+    def __init__(self, inputs: dict, outputs: dict | None = None, flight: _Flight | None = None):
+        self.id = uuid.uuid4().hex
+        self.inputs = inputs
+        self.outputs = outputs or {}
+        self.flight = flight or _Flight(self.id, None, inputs, self.outputs)
+        self.status = RUNNING if self.flight.started else QUEUED
+        self.progress = self.flight.progress
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = time.time() if self.flight.started else None
+        self.finished_at = None
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def shared(self) -> bool:
+        """Whether this job is attached to a run another job started."""
+        return self.flight.run_id != self.id
+
+    def changed(self, *_args):
+        """Wake whoever waits for this job; called on status and progress updates."""
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        """
+        Block until the job changes after `version` or timeout passes, and
+        return the current version.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class JobManager:
+    """
+    Runs crew jobs on a bounded thread pool and keeps track of them by id.
+    """
+
+    def __init__(self, max_workers: int = 4, retention: float = 3600, max_queue: int = 0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self.coalesced = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crewmind-job')
+        self._jobs = {}
+        self._flights = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, inputs: dict, outputs: dict | None = None) -> str:
+        """
+        Queue a crew run and return its job id. If a run for the same inputs
+        is queued or in progress, the job is attached to it instead. Tasks
+        whose TaskOutput is given in `outputs` are reused rather than run
+        again; such jobs always get a run of their own. Raises QueueFull if
+        max_queue jobs are already waiting.
+        """
+        self._prune()
+        key = None if outputs else fingerprint(inputs)
+        with self._lock:
+            flight = self._flights.get(key) if key else None
+            if flight is not None:
+                job = Job(inputs, outputs, flight)
+                self.coalesced += 1
+            else:
+                if self.max_queue and self._active >= self.max_workers + self.max_queue:
+                    raise QueueFull(f"{self._active} jobs are running or queued")
+                job = Job(inputs, outputs)
+                job.flight.key = key
+                self._active += 1
+                if key:
+                    self._flights[key] = job.flight
+            job.flight.jobs.append(job)
+            self._jobs[job.id] = job
+        if not job.shared:
+            job.flight.future = self._pool.submit(self._run, job.flight)
+        return job.id
+
+    def get(self, job_id: str):
+        """Return the job with this id, or None if unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job: detach it from its run, and cancel the run if no other
+        job waits for it and it hasn't started yet.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished or job not in job.flight.jobs:
+                return False
+            flight = job.flight
+            if len(flight.jobs) == 1:
+                if flight.future is None or not flight.future.cancel():
+                    return False
+                self._active -= 1
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+            flight.jobs.remove(job)
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        job.changed()
+        return True
+
+    def stats(self) -> dict:
+        """Jobs running and waiting, against the pool's capacity."""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'running': min(self._active, self.max_workers),
+                'queued': max(0, self._active - self.max_workers),
+                'max_queue': self.max_queue,
+                'jobs': len(self._jobs),
+                'coalesced': self.coalesced,
+            }
+
+    def _run(self, flight: _Flight):
+        with self._lock:
+            flight.started = True
+            started_at = time.time()
+            for job in flight.jobs:
+                job.status = RUNNING
+                job.started_at = started_at
+        flight.changed()
+
+        result = error = None
+        try:
+            with flight.progress.attach():
+                result = run_crew(flight.inputs, outputs=flight.outputs, run_id=flight.run_id,
+                                  submitted_at=flight.submitted_at, stream=True,
+                                  **flight.progress.crew_callbacks())
+        except Exception as e:
+            error = str(e)
+        finally:
+            with self._lock:
+                self._active -= 1
+                # Jobs submitted from now on start a new run
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+                jobs = list(flight.jobs)
+                finished_at = time.time()
+                for job in jobs:
+                    job.result = result
+                    job.error = error if result is None else None
+                    job.status = DONE if result is not None else FAILED
+                    job.finished_at = finished_at
+            flight.changed()
+        if result is not None and len(jobs) > 1:
+            self._store_shared(flight, [job.id for job in jobs if job.shared], result)
+
+    @staticmethod
+    def _store_shared(flight: _Flight, job_ids: list, result):
+        """
+        Store the run's artifacts under each attached job's id too, so that
+        their ids still find the plan after the jobs expire.
+        """
+        from crewmind.artifacts import PLAN, get_artifact_store
+        store = get_artifact_store()
+        if store is None:
+            return
+        inputs = canonical_inputs(flight.inputs)
+        plan = store.read_text(flight.run_id, PLAN)
+        for job_id in job_ids:
+            try:
+                store.save_run(job_id, inputs, result, plan)
+            except OSError as e:
+                logger.warning("Could not store the plan of job %s: %s", job_id, e)
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period."""
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Return the process-wide JobManager shared by every session.
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(
+                max_workers=int(os.getenv('CREWMIND_JOB_WORKERS', 4)),
+                retention=float(os.getenv('CREWMIND_JOB_RETENTION', 3600)),
+                max_queue=int(os.getenv('CREWMIND_JOB_QUEUE', 0)),
+            )
+        return _job_manager
@@ -0,0 +1,436 @@
+"""
+Local vector index over the knowledge/ directory.
+
+Text files in knowledge/ are split into chunks, embedded on the CPU and kept
+in a NumPy index on disk. When a crew is built, the chunks most relevant to
+the goal are rendered into the agents' backstories as `{{knowledge}}`.
+Files directly in knowledge/ are shared by every run. Files under
+knowledge/users/<user_id>/ are only used for inputs with that `user_id`.
+
+Each of these scopes has its own index directory:
+
+    <index dir>/<scope>/
+        index.json          embedder, files (content hash, rows) and chunks
+        vectors-<id>.npy    float32 unit vectors, one row per chunk
+
+The vectors are opened memory-mapped. Workers share the OS page cache
+instead of each holding a copy, and a user's index is only paged in when
+that user's crew is built. Only files whose content hash changed are
+re-embedded; the rows of the others are copied over. A rebuild writes a new
+vectors file before replacing index.json, so readers never see a half-written
+index.
+
+Embedders:
+    minilm  all-MiniLM-L6-v2 on onnxruntime, downloaded once to ~/.cache/chroma
+    hash    hashed word and word-pair features; needs no model, for offline use
+
+Run `knowledge` to download the model, build the indexes and try queries.
+Plans never download it: until it is there, they are made without knowledge.
+A lookup that fails is logged and not tried again for RETRY_INTERVAL
+seconds, so an outage doesn't hold up every plan (or every chunk of one)
+with the same timeout.
+
+Configuration (environment variables):
+    CREWMIND_KNOWLEDGE          set to 'off' to leave knowledge out of the prompts
+    CREWMIND_KNOWLEDGE_DIR      directory of knowledge files (default: knowledge/)
+    CREWMIND_KNOWLEDGE_INDEX    index directory (default: ~/.cache/crewmind/knowledge)
+    CREWMIND_KNOWLEDGE_TOP_K    chunks given to the agents (default: 4)
+    CREWMIND_EMBEDDER           'minilm' or 'hash' (default: minilm)
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_KNOWLEDGE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'knowledge')
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'crewmind', 'knowledge')
+DEFAULT_TOP_K = 4
+
+SHARED = '_shared'
+USERS_DIR = 'users'
+TEXT_EXTENSIONS = ('.txt', '.md')
+
+# Characters per chunk; chunks break at line ends where they can
+CHUNK_CHARS = 600
+
+# Files are checked for changes at most this often per scope
+CHECK_INTERVAL = 5.0
+
+# Scopes kept open; the others are reopened (memory-mapped) when needed
+MAX_OPEN_SCOPES = 256
+
+# Seconds a failed lookup is skipped before it is tried again
+RETRY_INTERVAL = 300.0
+
+_USER_ID = re.compile(r'^[A-Za-z0-9_.@-]+$')
+_WORD = re.compile(r'\w+')
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS) -> list:
+    """Split text into chunks of about `size` characters at line ends."""
+    chunks = []
+    current = ''
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        while len(line) > size:
+            cut = line.rfind(' ', 0, size)
+            cut = cut if cut > 0 else size
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(line[:cut])
+            line = line[cut:].strip()
+        if current and len(current) + len(line) + 1 > size:
+            chunks.append(current)
+            current = ''
+        current = f'{current}\n{line}' if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class HashEmbedder:
+    """
+    Signed feature hashing of lower-cased words and word pairs.
+    """
+
+    name = 'hash-384'
+    dim = 384
+
+    def embed(self, texts) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for feature in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return _normalize(vectors)
+
+
+class MiniLMEmbedder:
+    """
+    all-MiniLM-L6-v2 sentence embeddings, run by onnxruntime on the CPU.
+    """
+
+    name = 'all-MiniLM-L6-v2'
+    dim = 384
+
+    # Files that make the downloaded model, in the model's download directory
+    MODEL_FILES = ('model.onnx', 'tokenizer.json')
+
+    def __init__(self, download: bool = True):
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+        model_dir = os.path.join(ONNXMiniLM_L6_V2.DOWNLOAD_PATH, ONNXMiniLM_L6_V2.EXTRACTED_FOLDER_NAME)
+        if not download and not all(os.path.exists(os.path.join(model_dir, name)) for name in self.MODEL_FILES):
+            raise FileNotFoundError(f"{self.name} isn't downloaded to {model_dir}; run `knowledge` to download it, "
+                                    f"or set CREWMIND_EMBEDDER=hash")
+        self._model = ONNXMiniLM_L6_V2(preferred_providers=['CPUExecutionProvider'])
+
+    def embed(self, texts) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return _normalize(np.asarray(self._model(list(texts)), dtype=np.float32))
+
+
+EMBEDDERS = {'minilm': MiniLMEmbedder, 'hash': HashEmbedder}
+
+
+class KnowledgeIndex:
+    """
+    The index of one scope: the text files of a directory (not recursive).
+    """
+
+    def __init__(self, source_dir: str, index_dir: str, embedder):
+        self.source_dir = source_dir
+        self.index_dir = index_dir
+        self.embedder = embedder
+        self.meta = None
+        self.vectors = None
+        self._meta_mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.index_dir, 'index.json')
+
+    def _sources(self) -> dict:
+        """{file name: (size, mtime_ns)} of the scope's text files."""
+        try:
+            names = os.listdir(self.source_dir)
+        except OSError:
+            return {}
+        sources = {}
+        for name in names:
+            path = os.path.join(self.source_dir, name)
+            if name.lower().endswith(TEXT_EXTENSIONS) and os.path.isfile(path):
+                stat = os.stat(path)
+                sources[name] = (stat.st_size, stat.st_mtime_ns)
+        return sources
+
+    def _open(self):
+        """(Re)open index.json and map its vectors if another writer replaced them."""
+        try:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+        except OSError:
+            self.meta, self.vectors, self._meta_mtime = None, None, None
+            return
+        if mtime == self._meta_mtime:
+            return
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        vectors_path = os.path.join(self.index_dir, meta['vectors'])
+        self.vectors = np.load(vectors_path, mmap_mode='r') if meta['chunks'] else None
+        self.meta, self._meta_mtime = meta, mtime
+
+    def _is_current(self, sources: dict) -> bool:
+        if self.meta is None or self.meta['embedder'] != self.embedder.name:
+            return False
+        files = self.meta['files']
+        return files.keys() == sources.keys() and \
+            all(files[name]['stat'] == list(stat) for name, stat in sources.items())
+
+    def refresh(self, force: bool = False) -> dict:
+        """
+        Re-embed the files that changed since the index was built.
+
+        Returns {'embedded': chunks embedded, 'reused': chunks copied over}.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked < CHECK_INTERVAL:
+                return {'embedded': 0, 'reused': 0}
+            self._checked = now
+            self._open()
+            sources = self._sources()
+            if self._is_current(sources):
+                return {'embedded': 0, 'reused': 0}
+            return self._build(sources)
+
+    def _build(self, sources: dict) -> dict:
+        old = self.meta if self.meta is not None and self.meta['embedder'] == self.embedder.name else None
+        old_files = old['files'] if old else {}
+
+        files, chunks, parts = {}, [], []
+        embedded = reused = 0
+        for name in sorted(sources):
+            with open(os.path.join(self.source_dir, name), 'rb') as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()
+            start = len(chunks)
+            previous = old_files.get(name)
+            if previous is not None and previous['sha256'] == digest:
+                rows = slice(previous['start'], previous['end'])
+                chunks.extend(old['chunks'][rows])
+                parts.append(np.asarray(self.vectors[rows]))
+                reused += previous['end'] - previous['start']
+            else:
+                texts = chunk_text(content.decode('utf-8', errors='replace'))
+                chunks.extend({'source': name, 'text': text} for text in texts)
+                parts.append(self.embedder.embed(texts))
+                embedded += len(texts)
+            files[name] = {'sha256': digest, 'stat': list(sources[name]), 'start': start, 'end': len(chunks)}
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        vectors = np.concatenate(parts) if parts else np.zeros((0, self.embedder.dim), dtype=np.float32)
+        vectors_name = f'vectors-{uuid.uuid4().hex[:12]}.npy'
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, vectors.astype(np.float32))
+        os.replace(tmp_path, os.path.join(self.index_dir, vectors_name))
+
+        meta = {'embedder': self.embedder.name, 'dim': self.embedder.dim, 'vectors': vectors_name,
+                'files': files, 'chunks': chunks}
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+        # Open maps keep a removed file readable, so old vectors can go now
+        for name in os.listdir(self.index_dir):
+            if name.startswith('vectors-') and name != vectors_name:
+                try:
+                    os.remove(os.path.join(self.index_dir, name))
+                except OSError:
+                    pass
+        self._meta_mtime = None
+        self._open()
+        return {'embedded': embedded, 'reused': reused}
+
+    def search(self, query_vector: np.ndarray, k: int) -> list:
+        """The k best (score, chunk) pairs for a unit query vector."""
+        self.refresh()
+        if self.vectors is None or k <= 0:
+            return []
+        scores = self.vectors @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(float(scores[i]), self.meta['chunks'][i]) for i in top]
+
+
+class Knowledge:
+    """
+    The shared scope plus per-user scopes, opened on demand.
+    """
+
+    def __init__(self, knowledge_dir: str, index_dir: str, embedder, top_k: int = DEFAULT_TOP_K):
+        self.knowledge_dir = knowledge_dir
+        self.index_dir = index_dir
+        self.embedder = embedder
+        self.top_k = top_k
+        self._scopes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scope(self, user_id: str | None = None) -> KnowledgeIndex:
+        """The index of the shared files, or of one user's files."""
+        if user_id is None:
+            key, source_dir = SHARED, self.knowledge_dir
+        elif _USER_ID.match(user_id):
+            key, source_dir = f'user-{user_id}', os.path.join(self.knowledge_dir, USERS_DIR, user_id)
+        else:
+            raise ValueError(f"Invalid user id: {user_id!r}")
+        with self._lock:
+            if key in self._scopes:
+                self._scopes.move_to_end(key)
+            else:
+                self._scopes[key] = KnowledgeIndex(source_dir, os.path.join(self.index_dir, key), self.embedder)
+                if len(self._scopes) > MAX_OPEN_SCOPES:
+                    self._scopes.popitem(last=False)
+            return self._scopes[key]
+
+    def user_ids(self) -> list:
+        try:
+            return sorted(os.listdir(os.path.join(self.knowledge_dir, USERS_DIR)))
+        except OSError:
+            return []
+
+    def search(self, query: str, user_id: str | None = None, k: int | None = None) -> list:
+        """The k chunks most similar to query, from the shared and the user's files, best first."""
+        k = self.top_k if k is None else k
+        vector = self.embedder.embed([query])[0]
+        results = self.scope().search(vector, k)
+        if user_id:
+            results += self.scope(user_id).search(vector, k)
+        return sorted(results, key=lambda result: result[0], reverse=True)[:k]
+
+
+def knowledge_query(inputs: dict) -> str:
+    """The text the knowledge is searched with for a set of inputs."""
+    return ' '.join(str(inputs[key]) for key in ('user_goal', 'goal_type') if inputs.get(key))
+
+
+def knowledge_context(inputs: dict) -> str:
+    """
+    The `{{knowledge}}` text for a crew: the most relevant chunks about the
+    user, or '' if there are none, knowledge is off or the lookup fails.
+    """
+    global _failed_at
+    if _failed_at is not None and time.monotonic() - _failed_at < RETRY_INTERVAL:
+        return ''
+    user_id = inputs.get('user_id')
+    if user_id and not _USER_ID.match(user_id):
+        logger.warning("Invalid user id %r; using the shared knowledge only", user_id)
+        user_id = None
+    try:
+        knowledge = get_knowledge()
+        if knowledge is None:
+            return ''
+        results = knowledge.search(knowledge_query(inputs), user_id=user_id)
+    except Exception as e:
+        # Missing knowledge shouldn't fail the plan, nor hold up the next ones
+        _failed_at = time.monotonic()
+        logger.warning("Knowledge lookup failed, skipping it for %.0f s: %s", RETRY_INTERVAL, e)
+        return ''
+    _failed_at = None
+    if not results:
+        return ''
+    facts = '\n'.join(f"- {' '.join(chunk['text'].split())}" for _score, chunk in results)
+    return f"\n\nWhat you know about the user:\n{facts}"
+
+
+_knowledge = None
+_knowledge_lock = threading.Lock()
+_failed_at = None
+
+
+def get_knowledge(download: bool = False):
+    """
+    Return the process-wide Knowledge, or None if CREWMIND_KNOWLEDGE is off.
+
+    Unless download is set, the minilm embedder raises FileNotFoundError
+    instead of downloading its model.
+    """
+    global _knowledge
+    if os.getenv('CREWMIND_KNOWLEDGE', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+
+    with _knowledge_lock:
+        if _knowledge is None:
+            embedder = os.getenv('CREWMIND_EMBEDDER', 'minilm').lower()
+            if embedder not in EMBEDDERS:
+                raise ValueError(f"Unknown CREWMIND_EMBEDDER '{embedder}'; use one of {', '.join(EMBEDDERS)}")
+            _knowledge = Knowledge(
+                knowledge_dir=os.path.abspath(os.getenv('CREWMIND_KNOWLEDGE_DIR') or DEFAULT_KNOWLEDGE_DIR),
+                index_dir=os.path.expanduser(os.getenv('CREWMIND_KNOWLEDGE_INDEX') or DEFAULT_INDEX_DIR),
+                embedder=MiniLMEmbedder(download) if embedder == 'minilm' else EMBEDDERS[embedder](),
+                top_k=int(os.getenv('CREWMIND_KNOWLEDGE_TOP_K', DEFAULT_TOP_K)),
+            )
+    return _knowledge
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the knowledge indexes and search them.")
+    parser.add_argument('query', nargs='?', help="text to search the knowledge for")
+    parser.add_argument('--user', help="also search this user's knowledge files")
+    parser.add_argument('-k', type=int, default=None, help="chunks to return")
+    parser.add_argument('--rebuild', action='store_true', help="re-embed every file")
+    args = parser.parse_args(argv)
+
+    knowledge = get_knowledge(download=True)
+    if knowledge is None:
+        print("❌ Knowledge is off (CREWMIND_KNOWLEDGE).")
+        return None
+
+    if args.query is None:
+        for user_id in [None] + knowledge.user_ids():
+            index = knowledge.scope(user_id)
+            if args.rebuild:
+                index.meta = None
+            start = time.perf_counter()
+            stats = index.refresh(force=True)
+            label = f"user {user_id}" if user_id else "shared"
+            print(f"📚 {label}: {stats['embedded']} chunks embedded, {stats['reused']} reused "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return None
+
+    knowledge.search(args.query, user_id=args.user, k=args.k)  # build and map the indexes first
+    start = time.perf_counter()
+    results = knowledge.search(args.query, user_id=args.user, k=args.k)
+    elapsed = (time.perf_counter() - start) * 1000
+    for score, chunk in results:
+        print(f"{score:.3f}  [{chunk['source']}] {' '.join(chunk['text'].split())}")
+    print(f"🔎 {len(results)} chunks in {elapsed:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    main()
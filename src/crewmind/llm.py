@@ -0,0 +1,239 @@
+"""
+LLM construction for the Goal Tracker Crew.
+
+Agents get their LLM from build_llm() instead of letting crewAI create one from
+the `llm:` string in agents.yaml. That gives us a single place to layer extra
+behaviour (like the response cache) on top of the real Gemini client.
+"""
+import os
+import time
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+
+from crewmind.cache import ResponseCache, get_response_cache
+from crewmind.httpclient import llm_client_kwargs
+from crewmind.logs import log_step
+from crewmind.metrics import current_run, estimate_tokens
+from crewmind.ratelimit import RateLimiter, get_rate_limiter, is_rate_limit_error
+from crewmind.transcript import REPLAYING, active_transcript
+
+
+class LLMWrapper(BaseLLM):
+    """
+    Base class for LLMs that add behaviour around another LLM.
+
+    Everything crewAI reads or sets on an LLM (stop words, context window,
+    function calling support, ...) is passed through to the wrapped instance.
+    """
+
+    def __init__(self, llm: BaseLLM):
+        self.llm = llm
+        super().__init__(model=llm.model, temperature=llm.temperature, stop=llm.stop)
+
+    @property
+    def stop(self):
+        return self.llm.stop
+
+    @stop.setter
+    def stop(self, value):
+        self.llm.stop = value
+
+    def __getattr__(self, name):
+        if name == 'llm':
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        return self.llm.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+
+class MeteredLLM(LLMWrapper):
+    """
+    Records every call's latency, tokens and failures on the current run
+    (see crewmind.metrics) and logs it as a step (see crewmind.logs).
+    Outside a run it only passes calls through.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        run = current_run()
+        if run is None:
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        # crewAI counts the provider-reported usage on the agent's TokenProcess,
+        # passed in through a callback; the difference is this call's share
+        processes = [c.token_cost_process for c in callbacks or [] if getattr(c, 'token_cost_process', None)]
+        before = [(p.prompt_tokens, p.completion_tokens) for p in processes]
+        start = time.perf_counter()
+        task_name = getattr(from_task, 'name', None)
+        try:
+            response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            run.llm_call(task_name, self.model, seconds, failed=True)
+            log_step('llm_error', f'llm call failed: {e}', task_name, failed=True, model=self.model,
+                     seconds=round(seconds, 4))
+            raise
+        seconds = time.perf_counter() - start
+
+        prompt_tokens = sum(p.prompt_tokens - b[0] for p, b in zip(processes, before))
+        completion_tokens = sum(p.completion_tokens - b[1] for p, b in zip(processes, before))
+        if not prompt_tokens and not completion_tokens:
+            prompt_tokens = estimate_tokens(messages)
+            completion_tokens = estimate_tokens(response if isinstance(response, str) else str(response))
+        run.llm_call(task_name, self.model, seconds, prompt_tokens, completion_tokens)
+        log_step('llm_call', 'llm call', task_name, model=self.model, seconds=round(seconds, 4),
+                 prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return response
+
+
+class RateLimitedLLM(LLMWrapper):
+    """
+    Takes a slot from the shared RateLimiter before each call (see
+    crewmind.ratelimit), with the run as the session. When the provider
+    answers 429 anyway, the limiter is paused and the call retried through
+    it, so retries queue behind everyone else instead of hammering the API.
+    """
+
+    # Completion tokens reserved for a call whose max_tokens isn't set
+    EXPECTED_COMPLETION_TOKENS = 2048
+
+    def __init__(self, llm: BaseLLM, limiter: RateLimiter, retries: int = 2):
+        super().__init__(llm)
+        self.limiter = limiter
+        self.retries = retries
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        run = current_run()
+        task_name = getattr(from_task, 'name', None)
+        prompt_tokens = estimate_tokens(messages)
+        reserve = prompt_tokens + (getattr(self.llm, 'max_tokens', None) or self.EXPECTED_COMPLETION_TOKENS)
+        for attempt in range(self.retries + 1):
+            ticket = self.limiter.acquire(reserve, session=run.run_id if run is not None else None)
+            if run is not None and ticket.waited_s:
+                run.throttled(task_name, ticket.waited_s)
+            try:
+                response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+            except Exception as e:
+                self.limiter.settle(ticket, prompt_tokens)
+                if not is_rate_limit_error(e):
+                    raise
+                self.limiter.pause()
+                if attempt == self.retries:
+                    raise
+                continue
+            self.limiter.settle(ticket, prompt_tokens + estimate_tokens(str(response)))
+            return response
+
+
+class CachedLLM(LLMWrapper):
+    """
+    Serves repeated prompts from the on-disk ResponseCache.
+
+    The cache key covers the fully rendered messages, the model and its
+    sampling parameters, and the agent's config entry, so editing agents.yaml
+    or switching models never returns a stale answer. Calls that offer tools
+    are always sent to the model.
+    """
+
+    def __init__(self, llm: BaseLLM, cache: ResponseCache, agent_config: dict | None = None):
+        super().__init__(llm)
+        self.cache = cache
+        self.agent_config = agent_config or {}
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        if tools:
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        key = self.cache.key(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=getattr(self.llm, 'max_tokens', None),
+            stop=sorted(self.stop or []),
+            agent=self.agent_config,
+            messages=messages,
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(response, str) and response:
+            self.cache.set(key, response)
+        return response
+
+
+class TranscriptLLM(LLMWrapper):
+    """
+    Records calls into, or answers them from, the active transcript (see
+    crewmind.transcript). While replaying, the wrapped LLM is never called.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        transcript = active_transcript()
+        if transcript is None:
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        task_name = getattr(from_task, 'name', None)
+        if transcript.mode == REPLAYING:
+            return transcript.respond(task_name, messages)
+
+        start = time.perf_counter()
+        response = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(response, str):
+            transcript.record_call(task_name, self.model, messages, response, time.perf_counter() - start)
+        return response
+
+
+def build_llm(agent_config: dict, stream: bool = False, max_tokens: int | None = None) -> BaseLLM:
+    """
+    Build the LLM for an agent from its agents.yaml entry.
+
+    With stream=True tokens are emitted as LLMStreamChunkEvents while the
+    response is generated (see crewmind.progress). max_tokens caps the
+    length of each response. CREWMIND_MODEL overrides the configured model
+    for every agent; `fake/...` models are served offline by crewmind.fake_llm.
+    Real models share the pooled HTTP client from crewmind.httpclient, and
+    all calls go through the rate limiter when one is configured.
+    """
+    model = os.getenv('CREWMIND_MODEL') or agent_config['llm']
+    limiter = get_rate_limiter()
+    if model.startswith('fake/'):
+        from crewmind.fake_llm import FakeLLM
+        llm = FakeLLM.from_env(model, stream=stream, max_tokens=max_tokens)
+    else:
+        llm_kwargs = llm_client_kwargs(model)
+        if limiter is not None:
+            # 429s are retried by RateLimitedLLM, through the limiter
+            llm_kwargs['max_retries'] = 0
+        llm = LLM(model=model, stream=stream, max_tokens=max_tokens, **llm_kwargs)
+    llm = MeteredLLM(llm)
+    if limiter is not None:
+        llm = RateLimitedLLM(llm, limiter)
+
+    cache = get_response_cache()
+    if cache is not None:
+        llm = CachedLLM(llm, cache, agent_config=agent_config)
+
+    return TranscriptLLM(llm)
@@ -0,0 +1,188 @@
+"""
+Load test of the planning service (crewmind.server) with the fake LLM.
+
+Without --url, a service is started in this process with every agent on
+FakeLLM (CREWMIND_MODEL=fake/plan, or fake/plan@<seconds> for a per-call
+latency), so the numbers measure the service and the crew, not a provider.
+Clients submit distinct goals at a fixed rate, follow each job until it ends
+and honour 429 Retry-After. The report gives accepted and rejected
+submissions, completed plans per minute and the submit-to-done latency.
+With --distinct N only N different goals are sent, as in a burst of
+identical onboarding goals, which the service coalesces into shared runs.
+
+Usage:
+    loadtest --rate 300 --duration 60 --workers 16 --queue 64
+    loadtest --url http://127.0.0.1:8000 --rate 120 --duration 30 --json
+    loadtest --rate 600 --duration 30 --distinct 3
+"""
+import http.client
+import json
+import os
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+GOALS = ('Run a half marathon', 'Learn Spanish', 'Write a novel', 'Learn Python programming',
+         'Save for a house deposit', 'Learn to play guitar', 'Get a cloud certification', 'Paint 20 landscapes')
+TIMELINES = ('1 month', '3 months', '6 months')
+
+POLL_SECONDS = 0.25
+
+
+def goal_inputs(index: int) -> dict:
+    """Distinct inputs per request, so the response cache doesn't serve them all."""
+    return {
+        'user_goal': f"{GOALS[index % len(GOALS)]} ({index})",
+        'timeline': TIMELINES[index % len(TIMELINES)],
+        'available_time': f"{4 + index % 8} hours per week",
+        'goal_type': 'Other',
+    }
+
+
+class _Client:
+    """A keep-alive connection to the service."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connection = None
+
+    def request(self, method: str, path: str, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=600)
+            try:
+                self.connection.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+                response = self.connection.getresponse()
+                data = response.read()
+                return response.status, dict(response.getheaders()), json.loads(data or b'{}')
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+
+def _run_request(url: str, index: int, deadline: float, results: list, lock: threading.Lock):
+    client = _Client(url)
+    record = {'index': index, 'submitted': time.perf_counter(), 'rejected': 0}
+    while True:
+        status, headers, payload = client.request('POST', '/v1/plans', goal_inputs(index))
+        if status != 429:
+            break
+        record['rejected'] += 1
+        if time.perf_counter() + float(headers.get('Retry-After', 1)) > deadline:
+            record['status'] = 'rejected'
+            with lock:
+                results.append(record)
+            return
+        time.sleep(float(headers.get('Retry-After', 1)))
+    record['accepted'] = time.perf_counter()
+
+    if status != 202:
+        record['status'] = f'http {status}'
+    else:
+        path = payload['links']['self']
+        while payload.get('status') not in ('done', 'failed', 'cancelled'):
+            time.sleep(POLL_SECONDS)
+            status, _, payload = client.request('GET', path)
+        record['status'] = payload['status']
+        record['finished'] = time.perf_counter()
+    with lock:
+        results.append(record)
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_load(url: str, rate: float, duration: float, distinct: int = 0, drain: float = 300) -> dict:
+    """
+    Submit `rate` goals per minute for `duration` seconds, wait for them to
+    finish (at most `drain` seconds more) and return the summary. With
+    `distinct`, only that many different goals are sent.
+    """
+    results, lock, threads = [], threading.Lock(), []
+    started = time.perf_counter()
+    deadline = started + duration + drain
+    interval = 60.0 / rate
+    index = 0
+    while time.perf_counter() - started < duration:
+        goal = index % distinct if distinct else index
+        thread = threading.Thread(target=_run_request, args=(url, goal, deadline, results, lock), daemon=True)
+        thread.start()
+        threads.append(thread)
+        index += 1
+        time.sleep(max(0.0, started + index * interval - time.perf_counter()))
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.perf_counter()))
+    elapsed = time.perf_counter() - started
+
+    done = [record for record in results if record['status'] == 'done']
+    latencies = [record['finished'] - record['submitted'] for record in done]
+    return {
+        'submitted': index,
+        'done': len(done),
+        'failed': sum(1 for record in results if record['status'] not in ('done', 'rejected')),
+        'gave_up': sum(1 for record in results if record['status'] == 'rejected'),
+        'unfinished': index - len(results),
+        'responses_429': sum(record['rejected'] for record in results),
+        'elapsed_s': round(elapsed, 2),
+        'plans_per_minute': round(len(done) / elapsed * 60, 1),
+        'latency_p50_s': round(percentile(latencies, 0.5), 3),
+        'latency_p95_s': round(percentile(latencies, 0.95), 3),
+        'latency_mean_s': round(statistics.mean(latencies), 3) if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test the planning service with the fake LLM.")
+    parser.add_argument('--url', help="service to test (default: start one in-process on the fake LLM)")
+    parser.add_argument('--rate', type=float, default=300, help="goals submitted per minute (default: 300)")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to keep submitting (default: 60)")
+    parser.add_argument('--distinct', type=int, default=0, help="different goals sent (default: all different)")
+    parser.add_argument('--workers', type=int, default=16, help="in-process service: crew runs at once")
+    parser.add_argument('--queue', type=int, default=64, help="in-process service: jobs that may wait")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    url = args.url
+    server = None
+    if url is None:
+        os.environ.setdefault('CREWMIND_MODEL', 'fake/plan')
+        from crewmind.jobs import JobManager
+        from crewmind.logs import configure_logging
+        from crewmind.server import PlanningServer
+        configure_logging()
+        server = PlanningServer(JobManager(max_workers=args.workers, retention=args.duration + 600,
+                                           max_queue=args.queue), port=0)
+        server.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        print(f"🧪 Service on {url} with {os.environ['CREWMIND_MODEL']} "
+              f"({args.workers} workers, queue of {args.queue})")
+
+    print(f"🚀 {args.rate:g} goals/min for {args.duration:g}s...")
+    summary = run_load(url, args.rate, args.duration, args.distinct)
+    if server is not None:
+        summary['server'] = {**server.manager.stats(), 'rejected': server.rejected}
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"✅ {summary['done']}/{summary['submitted']} plans in {summary['elapsed_s']}s: "
+              f"{summary['plans_per_minute']} plans/min")
+        print(f"   latency p50 {summary['latency_p50_s']}s, p95 {summary['latency_p95_s']}s; "
+              f"{summary['responses_429']} × 429, {summary['gave_up']} gave up, {summary['failed']} failed")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
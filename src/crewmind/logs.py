@@ -0,0 +1,242 @@
+"""
+Structured, leveled logging of crew runs, in place of crewAI's verbose output.
+
+With verbose=True, crewAI prints every agent step of every run to stdout as
+it happens, on the thread doing the run. In the web app and the HTTP service
+the runs of all sessions interleave on that one stream, and the printing
+sits on the LLM hot path: a run on the fake LLM takes about 7x as long with
+it as without. So verbose is off unless CREWMIND_VERBOSE is set, except in
+the interactive `run` command.
+
+configure_logging() sends the records of the crewmind loggers through a
+queue to a background thread that writes them, so logging never waits for
+stderr or the disk. Each record carries the id of the run it was logged in
+(see crewmind.metrics), and the task and step type where it has one:
+
+    crewmind.run     a run started and finished, with its wall time and cost (INFO)
+    crewmind.tasks   a task started, completed (INFO) or failed (ERROR)
+    crewmind.steps   every LLM call and tool use (DEBUG), failed ones (WARNING)
+    crewmind.*       the other modules (jobs, knowledge, ...)
+
+Step records are the bulk. They are only written at DEBUG, and then for
+CREWMIND_LOG_STEP_SAMPLE of the runs, picked by run id, so a sampled run is
+logged completely. Failed steps are always logged.
+
+Usage:
+    CREWMIND_LOG=json CREWMIND_LOG_LEVELS=crewmind.steps=DEBUG serve
+    {"ts": "2026-10-17T09:12:03.120Z", "level": "DEBUG", "component": "crewmind.steps",
+     "msg": "llm call", "run_id": "9f1c...", "task": "goal_setting_task", "step_type": "llm_call", ...}
+
+Configuration (environment variables):
+    CREWMIND_LOG               'json', 'text' or 'off' (default: text)
+    CREWMIND_LOG_LEVEL         level of the crewmind loggers (default: INFO)
+    CREWMIND_LOG_LEVELS        per-component levels, e.g. 'crewmind.steps=DEBUG,LiteLLM=WARNING'
+    CREWMIND_LOG_FILE          append to this file instead of writing to stderr
+    CREWMIND_LOG_STEP_SAMPLE   share of runs whose steps are logged (default: 1)
+    CREWMIND_VERBOSE           set to 'on' for crewAI's console output of every step
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+RUN = 'crewmind.run'
+TASKS = 'crewmind.tasks'
+STEPS = 'crewmind.steps'
+
+CONTEXT_FIELDS = ('run_id', 'task', 'step_type')
+
+OFF_VALUES = ('0', 'off', 'false', 'no')
+
+task_logger = logging.getLogger(TASKS)
+step_logger = logging.getLogger(STEPS)
+
+_step_sample = 1.0
+_listener = None
+_listener_lock = threading.Lock()
+_events_registered = False
+
+
+def verbose_enabled(default: bool = False) -> bool:
+    """Whether crews print their steps to the console: CREWMIND_VERBOSE, else default."""
+    value = os.getenv('CREWMIND_VERBOSE', '').lower()
+    if not value:
+        return default
+    return value not in OFF_VALUES
+
+
+def step_sampled(run_id: str | None) -> bool:
+    """Whether the steps of this run are logged; the same answer for the whole run."""
+    if _step_sample >= 1:
+        return True
+    if not run_id or _step_sample <= 0:
+        return False
+    return zlib.crc32(run_id.encode('utf-8')) / 2 ** 32 < _step_sample
+
+
+def _current_run_id():
+    # crewmind.metrics imports crewAI; if it isn't loaded yet, no run is either
+    metrics = sys.modules.get('crewmind.metrics')
+    run = metrics.current_run() if metrics is not None else None
+    return run.run_id if run is not None else None
+
+
+class RunContextFilter(logging.Filter):
+    """Adds the run id (unless given) and empty task and step type fields to every record."""
+
+    def filter(self, record):
+        if getattr(record, 'run_id', None) is None:
+            record.run_id = _current_run_id()
+        for name in ('task', 'step_type', 'data'):
+            if not hasattr(record, name):
+                setattr(record, name, None)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, component, msg, the run context and any data."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+                  .replace('+00:00', 'Z'),
+            'level': record.levelname,
+            'component': record.name,
+            'msg': record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        entry.update(getattr(record, 'data', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """A readable line: time, level, component, run id and task, message, data as key=value."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s %(message)s')
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        context = ' '.join(f'{name}={getattr(record, name)}' for name in CONTEXT_FIELDS
+                           if getattr(record, name, None) is not None)
+        data = ' '.join(f'{key}={value}' for key, value in (getattr(record, 'data', None) or {}).items())
+        return ' '.join(part for part in (line, context, data) if part)
+
+
+def component_levels(spec: str) -> dict:
+    """{logger name: level} from 'crewmind.steps=DEBUG,LiteLLM=WARNING'."""
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging():
+    """
+    Send the crewmind loggers' records through a queue to a writer thread,
+    as set by CREWMIND_LOG*. Safe to call more than once. Returns the
+    QueueListener, or None if CREWMIND_LOG is off.
+    """
+    global _listener, _step_sample
+    mode = os.getenv('CREWMIND_LOG', 'text').lower()
+    if mode in OFF_VALUES:
+        return None
+
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+        path = os.getenv('CREWMIND_LOG_FILE')
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = WatchedFileHandler(path, encoding='utf-8')
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter() if mode == 'json' else TextFormatter())
+
+        records = queue.SimpleQueue()
+        queue_handler = QueueHandler(records)
+        # Filters run in the thread that logs, where the run's context is
+        queue_handler.addFilter(RunContextFilter())
+        root = logging.getLogger('crewmind')
+        root.addHandler(queue_handler)
+        root.setLevel(os.getenv('CREWMIND_LOG_LEVEL', 'INFO').upper())
+        root.propagate = False
+        for name, level in component_levels(os.getenv('CREWMIND_LOG_LEVELS', '')).items():
+            logging.getLogger(name).setLevel(level)
+        _step_sample = float(os.getenv('CREWMIND_LOG_STEP_SAMPLE', 1))
+
+        _listener = QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
+
+
+def log_step(step_type: str, message: str, task: str | None = None, failed: bool = False, **data):
+    """
+    Log one step of the current run on crewmind.steps: at DEBUG if the run
+    is sampled, or at WARNING if the step failed.
+    """
+    level = logging.WARNING if failed else logging.DEBUG
+    if not step_logger.isEnabledFor(level):
+        return
+    run_id = _current_run_id()
+    if failed or step_sampled(run_id):
+        step_logger.log(level, message, extra={'run_id': run_id, 'task': task, 'step_type': step_type,
+                                               'data': data})
+
+
+# --- crewAI events ---
+
+def _on_task_started(source, event):
+    task_logger.info('task started', extra={'task': event.task.name})
+
+
+def _on_task_completed(source, event):
+    task_logger.info('task completed', extra={'task': event.task.name,
+                                              'data': {'output_chars': len(event.output.raw or '')}})
+
+
+def _on_task_failed(source, event):
+    task_logger.error('task failed: %s', event.error, extra={'task': event.task.name})
+
+
+def _on_tool_finished(source, event):
+    log_step('tool_call', 'tool call', event.task_name, tool=event.tool_name, agent=event.agent_role,
+             from_cache=event.from_cache, seconds=round((event.finished_at - event.started_at).total_seconds(), 4))
+
+
+def _on_tool_error(source, event):
+    log_step('tool_error', f'tool call failed: {event.error}', event.task_name, failed=True,
+             tool=event.tool_name, agent=event.agent_role)
+
+
+def register_listener():
+    """
+    Subscribe to task and tool events once per process. LLM calls are
+    logged by crewmind.llm.MeteredLLM, which sees them with any provider.
+    """
+    global _events_registered
+    with _listener_lock:
+        if _events_registered:
+            return
+        from crewai.events import (TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent, ToolUsageErrorEvent,
+                                   ToolUsageFinishedEvent, crewai_event_bus)
+        crewai_event_bus.on(TaskStartedEvent)(_on_task_started)
+        crewai_event_bus.on(TaskCompletedEvent)(_on_task_completed)
+        crewai_event_bus.on(TaskFailedEvent)(_on_task_failed)
+        crewai_event_bus.on(ToolUsageFinishedEvent)(_on_tool_finished)
+        crewai_event_bus.on(ToolUsageErrorEvent)(_on_tool_error)
+        _events_registered = True
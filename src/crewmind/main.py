@@ -9,10 +9,11 @@ except ImportError:
 
 import sys
 import os
+import uuid
 import warnings
 from datetime import datetime
 from dotenv import load_dotenv
-from crewmind.crew import Crewmind
+from crewmind.startup import prewarm
 
 # Load environment variables from .env file
 # Try to load from multiple possible locations
@@ -90,11 +91,10 @@ def get_user_input():
     }
 
 
-def run():
+def check_api_key():
     """
-    Run the Goal Tracker Crew with user input.
+    Check that a Gemini API key is configured, printing setup help if not.
     """
-    # Check if API key is set
     api_key = os.getenv('GOOGLE_API_KEY') or os.getenv('GEMINI_API_KEY')
     if not api_key or api_key == 'YOUR_GEMINI_API_KEY_HERE':
         print("❌ ERROR: Gemini API key not found!")
@@ -103,8 +103,21 @@ def run():
         print("2. Create a new API key")
         print("3. Edit the .env file and replace YOUR_GEMINI_API_KEY_HERE with your actual key")
         print("4. Save the file and run again")
+        return False
+    return True
+
+
+def run():
+    """
+    Run the Goal Tracker Crew with user input.
+    """
+    # Check if API key is set
+    if not check_api_key():
         return None
-    
+
+    # Import crewAI in the background while the questions are answered
+    prewarm()
+
     try:
         # Get user input
         inputs = get_user_input()
@@ -133,13 +146,23 @@ def run():
         print("-" * 50)
         
         # Run the crew
-        result = Crewmind().crew().kickoff(inputs=inputs)
+        from crewmind.artifacts import PLAN, get_artifact_store
+        from crewmind.logs import verbose_enabled
+        from crewmind.runner import run_crew
+        from crewmind.structured import plan_document
+        run_id = uuid.uuid4().hex
+        # The one place whose console is the user's: show the agents at work
+        result = run_crew(inputs, run_id=run_id, verbose=verbose_enabled(default=True))
         
         print("\n" + "="*60)
         print("🎉 GOAL TRACKER CREW COMPLETED!")
         print("="*60)
         print("Your personalized goal plan has been created!")
-        print("Check the generated daily_plan.md file for your detailed plan.")
+        store = get_artifact_store()
+        if store is not None:
+            print(f"Run `plan {run_id}` to read your detailed plan (stored at {store.path(run_id, PLAN)}).")
+        else:
+            print(plan_document(result, inputs).to_markdown())
         print("="*60)
         
         return result
@@ -152,6 +175,298 @@ def run():
         return None
 
 
+def batch():
+    """
+    Run a JSONL file of goal inputs through the crew with bounded concurrency.
+
+    Usage: batch <inputs.jsonl> <results.jsonl> [--concurrency N]
+    """
+    import argparse
+    from crewmind.batch import run_batch
+    from crewmind.logs import configure_logging
+
+    parser = argparse.ArgumentParser(description="Generate goal plans for a JSONL file of inputs.")
+    parser.add_argument('input', help="JSONL file with one goal input dict per line")
+    parser.add_argument('output', help="JSONL file to write one result record per line to")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('CREWMIND_BATCH_CONCURRENCY', 4)),
+                        help="maximum number of crews running at once (default: 4)")
+    args = parser.parse_args()
+
+    if not check_api_key():
+        return None
+    configure_logging()
+
+    def report(record):
+        status = "✅" if record['status'] == 'ok' else f"❌ {record['error']}"
+        print(f"[{record['index']}] {record['elapsed_s']:.1f}s {status}")
+
+    print(f"🤖 Running {args.input} with concurrency {args.concurrency}...")
+    summary = run_batch(args.input, args.output, concurrency=args.concurrency, on_result=report)
+    print(f"🎉 Done: {summary['ok']}/{summary['total']} plans written to {args.output}")
+    return summary
+
+
+# Inputs for training and testing the crew outside the interactive prompt
+SAMPLE_INPUTS = {
+    'user_goal': 'Learn Python programming and build 3 projects',
+    'timeline': '3 months',
+    'available_time': '10 hours per week',
+    'current_commitments': 'Full-time job',
+    'preferred_schedule': 'Evenings',
+    'goal_type': 'education',
+    'current_year': str(datetime.now().year),
+}
+
+
+def plan():
+    """
+    Print or save the plan of a stored run.
+
+    Usage: plan [run_id] [--list] [--output plan.md]
+
+    Without a run id, the latest stored run is used.
+    """
+    import argparse
+    from crewmind.artifacts import PLAN, get_artifact_store
+
+    parser = argparse.ArgumentParser(description="Read plans from the run artifact store.")
+    parser.add_argument('run_id', nargs='?', help="run to read (default: the latest)")
+    parser.add_argument('--list', action='store_true', help="list the stored runs instead")
+    parser.add_argument('--output', help="write the plan to this file")
+    args = parser.parse_args()
+
+    store = get_artifact_store()
+    if store is None:
+        print("❌ The artifact store is off (CREWMIND_ARTIFACTS).")
+        return None
+    runs = store.runs()
+    if args.list:
+        for manifest in runs:
+            created = datetime.fromtimestamp(manifest['created']).strftime('%Y-%m-%d %H:%M')
+            print(f"{manifest['run_id']}  {created}  {manifest['inputs'].get('user_goal', '')}")
+        return runs
+
+    run_id = args.run_id or (runs[0]['run_id'] if runs else None)
+    content = store.read_text(run_id, PLAN) if run_id else None
+    if content is None:
+        print(f"❌ No stored plan for run {run_id or '(none yet)'}.")
+        return None
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"📄 Plan of run {run_id} written to {args.output}")
+    else:
+        print(content)
+    return content
+
+
+def export():
+    """
+    Export a stored run's schedule as calendar events.
+
+    Usage: export [run_id] [--format ics|csv|json] [--start YYYY-MM-DD] [--output file]
+
+    Without a run id, the latest stored run is used. The file is written as it
+    is generated, so even a multi-year plan is exported in constant memory.
+    """
+    import argparse
+    import sys
+    from datetime import date
+    from crewmind.artifacts import get_artifact_store
+    from crewmind.export import FORMATS, export_plan
+    from crewmind.structured import plan_document
+
+    parser = argparse.ArgumentParser(description="Export a stored plan as ICS, CSV or JSON events.")
+    parser.add_argument('run_id', nargs='?', help="run to export (default: the latest)")
+    parser.add_argument('--format', choices=list(FORMATS), default='ics', help="file format (default: ics)")
+    parser.add_argument('--start', type=date.fromisoformat, help="first day of the plan (default: next Monday)")
+    parser.add_argument('--output', help="file to write (default: stdout)")
+    args = parser.parse_args()
+
+    store = get_artifact_store()
+    if store is None:
+        print("❌ The artifact store is off (CREWMIND_ARTIFACTS).")
+        return None
+    runs = store.runs()
+    run_id = args.run_id or (runs[0]['run_id'] if runs else None)
+    manifest = store.manifest(run_id) if run_id else None
+    result = store.load_result(run_id) if manifest else None
+    if result is None:
+        print(f"❌ No stored plan for run {run_id or '(none yet)'}.")
+        return None
+
+    inputs = manifest['inputs']
+    chunks = export_plan(plan_document(result, inputs), inputs, args.format, args.start)
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.writelines(chunks)
+        print(f"📅 Run {run_id} exported to {args.output}")
+    else:
+        sys.stdout.buffer.writelines(chunks)
+    return args.output
+
+
+def history():
+    """
+    Search the plan history.
+
+    Usage: history <query> [--limit N]
+    """
+    import argparse
+    from crewmind.history import get_plan_history
+
+    parser = argparse.ArgumentParser(description="Full-text search over stored goals and plans.")
+    parser.add_argument('query', help="words every matching goal or plan has")
+    parser.add_argument('--limit', type=int, default=10, help="plans to list, newest first (default: 10)")
+    args = parser.parse_args()
+
+    plan_history = get_plan_history()
+    if plan_history is None:
+        print("❌ The plan history is off (CREWMIND_HISTORY).")
+        return None
+    matches = plan_history.search(args.query, limit=args.limit)
+    for run_id, created, user_goal in matches:
+        print(f"{run_id}  {datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M')}  {user_goal}")
+    print(f"📚 {len(matches)} of {plan_history.count()} stored plans match")
+    return matches
+
+
+def train():
+    """
+    Train the crew for a given number of iterations.
+
+    Usage: train <n_iterations> <filename>
+    """
+    from crewmind.blueprint import build_crew
+
+    try:
+        build_crew(SAMPLE_INPUTS).train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=SAMPLE_INPUTS)
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
+
+def replay():
+    """
+    Re-run a recorded transcript with every LLM call answered from it.
+
+    Usage: replay <transcript.jsonl.gz> [--from-task NAME] [--realtime] [--output plan.md]
+
+    Record transcripts by setting CREWMIND_RECORD_DIR before a run.
+    """
+    import argparse
+    import time
+    from crewmind.blueprint import get_blueprint
+    from crewmind.structured import plan_document
+    from crewmind.transcript import Transcript, replay_transcript
+
+    parser = argparse.ArgumentParser(description="Replay a recorded crew run without any network calls.")
+    parser.add_argument('transcript', help="transcript file written under CREWMIND_RECORD_DIR")
+    parser.add_argument('--from-task', choices=list(get_blueprint().tasks),
+                        help="reuse the recorded outputs of the tasks before this one and start here")
+    parser.add_argument('--realtime', action='store_true', help="wait as long as each recorded LLM call took")
+    parser.add_argument('--output', help="write the replayed plan to this file")
+    args = parser.parse_args()
+
+    # A replay must not reach the network, telemetry included
+    os.environ.setdefault('CREWAI_DISABLE_TELEMETRY', 'true')
+    os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+    try:
+        transcript = Transcript.load(args.transcript)
+        start = time.perf_counter()
+        result = replay_transcript(transcript, start_task=args.from_task, realtime=args.realtime)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        raise Exception(f"An error occurred while replaying the crew: {e}")
+
+    plan = plan_document(result, transcript.inputs).to_markdown()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(plan)
+        print(f"🔁 Replayed in {elapsed:.2f}s; plan written to {args.output}")
+    else:
+        print(plan)
+        print(f"\n🔁 Replayed in {elapsed:.2f}s")
+    return result
+
+
+def test():
+    """
+    Test the crew for a number of iterations, scored by an evaluation LLM.
+
+    Usage: test <n_iterations> <eval_llm>
+    """
+    from crewmind.blueprint import build_crew
+
+    try:
+        build_crew(SAMPLE_INPUTS).test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=SAMPLE_INPUTS)
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
+
+def metrics():
+    """
+    Summarize recorded crew runs: p50/p95/p99 wall time per task.
+
+    Usage: metrics [--file runs.jsonl] [--last N] [--prometheus]
+    """
+    import argparse
+    from crewmind.metrics import (MetricsRegistry, metrics_path, read_records, summarize, summarize_repeats,
+                                  summarize_routes)
+
+    parser = argparse.ArgumentParser(description="Summarize per-task latency, tokens and cost of recorded runs.")
+    parser.add_argument('--file', default=metrics_path(), help="run records JSONL (default: CREWMIND_METRICS_FILE)")
+    parser.add_argument('--last', type=int, default=0, help="only the last N runs")
+    parser.add_argument('--prometheus', action='store_true', help="print a Prometheus text snapshot instead")
+    parser.add_argument('--routes', action='store_true', help="summarize model routing per task route instead")
+    args = parser.parse_args()
+
+    records = read_records(args.file)
+    if args.last:
+        records = records[-args.last:]
+    if not records:
+        print(f"No runs recorded in {args.file}")
+        return None
+
+    if args.prometheus:
+        registry = MetricsRegistry()
+        for record in records:
+            registry.observe(record)
+        print(registry.prometheus_text(), end='')
+        return None
+
+    if args.routes:
+        routes = summarize_routes(records)
+        if not routes:
+            print("No routed calls recorded (see config/routing.yaml)")
+            return None
+        print(f"🔀 Routed calls in {len(records)} runs from {args.file}\n")
+        header = f"{'task':<24}{'route':>6}{'n':>6}{'p50 s':>9}{'p95 s':>9}{'fired':>8}{'failed':>8}  won by"
+        print(header)
+        print('-' * len(header))
+        for (task, route), row in routes.items():
+            won = ', '.join(f"{model} {count}" for model, count in row['won'].items())
+            print(f"{task:<24}{route:>6}{row['count']:>6}{row['p50_s']:>9.2f}{row['p95_s']:>9.2f}"
+                  f"{row['fired_rate']:>8.0%}{row['failed_rate']:>8.0%}  {won}")
+        return routes
+
+    summary = summarize(records)
+    print(f"📊 {len(records)} runs from {args.file}\n")
+    header = f"{'task':<24}{'n':>5}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'queue p95':>11}" \
+             f"{'calls':>7}{'retries':>9}{'prompt tok':>12}{'compl tok':>11}{'cost $':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, row in summary.items():
+        print(f"{name:<24}{row['count']:>5}{row['p50_s']:>9.2f}{row['p95_s']:>9.2f}{row['p99_s']:>9.2f}"
+              f"{row['queue_p95_s']:>11.2f}{row['llm_calls']:>7.1f}{row['retries']:>9.2f}"
+              f"{row['prompt_tokens']:>12.0f}{row['completion_tokens']:>11.0f}{row['cost_usd']:>10.4f}")
+    repeats = summarize_repeats(records)
+    if repeats['runs']:
+        print(f"\n🔁 {repeats['repeats']} of {repeats['runs']} runs ({repeats['repeats'] / repeats['runs']:.0%}) "
+              f"repeated the canonical inputs of an earlier run")
+    return summary
+
+
 if __name__ == "__main__":
     run()
 
@@ -0,0 +1,547 @@
+"""
+Per-run and per-task instrumentation of crew runs.
+
+run_crew() wraps every run in a RunMetrics, which is also the run's context:
+current_run() returns it from anywhere in the run, including chunk threads.
+For each task it records queue time (from the task becoming ready to it
+starting), wall time, LLM calls and the time spent in them, retries (failed
+LLM calls), prompt and completion tokens and an estimated cost. Finished runs
+are appended to a rotating JSON-lines file and added to a process-wide
+registry that renders a Prometheus text snapshot.
+
+Token counts are the ones the provider reports; when it reports none (for
+instance with a custom LLM) they are estimated at four characters a token.
+
+Run `metrics` to print p50/p95/p99 per task from the JSONL files.
+
+Configuration (environment variables):
+    CREWMIND_METRICS           set to 'off' to stop writing run records
+    CREWMIND_METRICS_FILE      JSONL file (default: ~/.cache/crewmind/metrics/runs.jsonl)
+    CREWMIND_METRICS_MAX_MB    size of the file before it is rotated (default: 10)
+    CREWMIND_METRICS_BACKUPS   rotated files kept (default: 5)
+    CREWMIND_METRICS_PORT      serve the Prometheus snapshot on this port at /metrics
+    CREWMIND_PRICES            JSON of {model: [USD per 1M input tokens, USD per 1M output tokens]}
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+
+from crewai.events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent, crewai_event_bus
+
+from crewmind.inputs import fingerprint
+from crewmind.logs import RUN, register_listener as register_log_listener
+
+DEFAULT_METRICS_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'crewmind', 'metrics', 'runs.jsonl')
+DEFAULT_MAX_MB = 10
+DEFAULT_BACKUPS = 5
+
+# USD per million input and output tokens
+MODEL_PRICES = {
+    'gemini-2.5-pro': (1.25, 10.00),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.0-flash': (0.10, 0.40),
+    'gemini-1.5-pro': (1.25, 5.00),
+    'gemini-1.5-flash': (0.075, 0.30),
+}
+
+CHARS_PER_TOKEN = 4
+
+OK = 'ok'
+ERROR = 'error'
+
+# Fields of the run record logged when a run finishes (see crewmind.logs)
+RUN_LOG_FIELDS = ('queue_s', 'wall_s', 'llm_calls', 'retries', 'prompt_tokens', 'completion_tokens', 'cost_usd')
+
+logger = logging.getLogger(RUN)
+
+_current_run = ContextVar('crewmind_current_run', default=None)
+_listener_lock = threading.Lock()
+_listener_registered = False
+
+
+def current_run():
+    """The RunMetrics of the run executing in this context, or None."""
+    return _current_run.get()
+
+
+@lru_cache(maxsize=4)
+def model_prices(raw: str) -> dict:
+    """
+    MODEL_PRICES updated from a CREWMIND_PRICES value, parsed once per
+    value. A malformed one is reported once and ignored.
+    """
+    prices = dict(MODEL_PRICES)
+    if raw:
+        try:
+            prices.update(json.loads(raw))
+        except (ValueError, TypeError) as e:
+            logger.warning("Ignoring CREWMIND_PRICES, which isn't a JSON object of prices: %s", e)
+    return prices
+
+
+def model_price(model: str) -> tuple:
+    """(input, output) USD per million tokens for a model, or (0, 0) if unknown."""
+    prices = model_prices(os.getenv('CREWMIND_PRICES', ''))
+    name = (model or '').split('/')[-1]
+    return tuple(prices.get(model) or prices.get(name) or (0.0, 0.0))
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = model_price(model)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def estimate_tokens(content) -> int:
+    """Rough token count of a string or a list of chat messages."""
+    if isinstance(content, list):
+        content = ''.join(str(message.get('content', '')) for message in content)
+    return math.ceil(len(content or '') / CHARS_PER_TOKEN)
+
+
+class TaskMetrics:
+    """
+    What one task of a run cost. A task that runs more than once in a run
+    (the weekly schedule chunks) is measured from its first start to its
+    last finish, with the counts summed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = None
+        self.executions = 0
+        self.started_at = None
+        self.finished_at = None
+        self.queue_s = 0.0
+        self.llm_calls = 0
+        self.llm_s = 0.0
+        self.retries = 0
+        self.throttled_s = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+
+    @property
+    def wall_s(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> dict:
+        return {
+            'status': self.status,
+            'executions': self.executions,
+            'queue_s': round(self.queue_s, 4),
+            'wall_s': round(self.wall_s, 4),
+            'llm_calls': self.llm_calls,
+            'llm_s': round(self.llm_s, 4),
+            'retries': self.retries,
+            'throttled_s': round(self.throttled_s, 4),
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cost_usd': round(self.cost_usd, 6),
+        }
+
+
+class RunMetrics:
+    """
+    Thread-safe measurements of one crew run, and the context of that run.
+
+    Usage:
+        with RunMetrics(run_id=job.id, submitted_at=job.submitted_at).attach():
+            result = build_crew(inputs).kickoff()
+    """
+
+    def __init__(self, run_id: str | None = None, submitted_at: float | None = None, inputs: dict | None = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.inputs = inputs or {}
+        self.submitted_at = submitted_at
+        self.started_at = None
+        self.finished_at = None
+        self.status = None
+        self.error = None
+        self.tasks = {}
+        self.routes = []
+        self._lock = threading.Lock()
+
+    def _task(self, name: str) -> TaskMetrics:
+        if name not in self.tasks:
+            self.tasks[name] = TaskMetrics(name)
+        return self.tasks[name]
+
+    def task_started(self, name: str):
+        now = time.time()
+        with self._lock:
+            task = self._task(name)
+            task.executions += 1
+            if task.started_at is None:
+                # A task is ready once the task before it has finished
+                previous = [t.finished_at for t in self.tasks.values() if t is not task and t.finished_at]
+                ready_at = max(previous, default=self.started_at or now)
+                task.started_at = now
+                task.queue_s = max(0.0, now - ready_at)
+
+    def task_finished(self, name: str, failed: bool = False):
+        now = time.time()
+        with self._lock:
+            task = self._task(name)
+            task.finished_at = now
+            task.status = ERROR if failed or task.status == ERROR else OK
+
+    def llm_call(self, task_name: str | None, model: str, seconds: float, prompt_tokens: int = 0,
+                 completion_tokens: int = 0, failed: bool = False):
+        with self._lock:
+            task = self._task(task_name or 'unknown')
+            task.llm_calls += 1
+            task.llm_s += seconds
+            task.retries += int(failed)
+            task.prompt_tokens += prompt_tokens
+            task.completion_tokens += completion_tokens
+            task.cost_usd += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def throttled(self, task_name: str | None, seconds: float):
+        """Time a task's LLM call waited for a rate limit slot."""
+        with self._lock:
+            self._task(task_name or 'unknown').throttled_s += seconds
+
+    def route_call(self, task_name: str | None, route: int, model: str, tier: int | None, fired: int,
+                   seconds: float, outcome: str):
+        """One call routed by crewmind.routing: the route, the tier that answered and how."""
+        with self._lock:
+            self.routes.append({'task': task_name or 'unknown', 'route': route, 'model': model, 'tier': tier,
+                                'fired': fired, 'latency_s': round(seconds, 4), 'outcome': outcome})
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            tasks = {name: task.to_dict() for name, task in self.tasks.items()}
+            routes = list(self.routes)
+        started = self.started_at or 0.0
+        return {
+            'run_id': self.run_id,
+            'status': self.status,
+            'error': self.error,
+            'timeline': self.inputs.get('timeline'),
+            'fingerprint': fingerprint(self.inputs) if self.inputs else None,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'queue_s': round(max(0.0, started - (self.submitted_at or started)), 4),
+            'wall_s': round((self.finished_at or started) - started, 4),
+            'llm_calls': sum(task['llm_calls'] for task in tasks.values()),
+            'retries': sum(task['retries'] for task in tasks.values()),
+            'prompt_tokens': sum(task['prompt_tokens'] for task in tasks.values()),
+            'completion_tokens': sum(task['completion_tokens'] for task in tasks.values()),
+            'cost_usd': round(sum(task['cost_usd'] for task in tasks.values()), 6),
+            'tasks': tasks,
+            'routes': routes,
+        }
+
+    @contextmanager
+    def attach(self):
+        """Make this the current run, and record it once the block exits."""
+        _register_listener()
+        register_log_listener()
+        token = _current_run.set(self)
+        self.started_at = time.time()
+        logger.info('run started', extra={'run_id': self.run_id})
+        try:
+            yield self
+            self.status = OK
+        except BaseException as e:
+            self.status = ERROR
+            self.error = str(e) or type(e).__name__
+            raise
+        finally:
+            self.finished_at = time.time()
+            _current_run.reset(token)
+            record = self.to_dict()
+            logger.log(logging.INFO if self.status == OK else logging.ERROR,
+                       'run finished' if self.status == OK else f'run failed: {self.error}',
+                       extra={'run_id': self.run_id, 'data': {key: record[key] for key in RUN_LOG_FIELDS}})
+            get_registry().observe(record)
+            sink = get_metrics_sink()
+            if sink is not None:
+                sink.write(record)
+
+
+def _on_task_started(source, event):
+    run = _current_run.get()
+    if run is not None:
+        run.task_started(event.task.name)
+
+
+def _on_task_completed(source, event):
+    run = _current_run.get()
+    if run is not None:
+        run.task_finished(event.task.name)
+
+
+def _on_task_failed(source, event):
+    run = _current_run.get()
+    if run is not None:
+        run.task_finished(event.task.name, failed=True)
+
+
+def _register_listener():
+    """Subscribe to task events once per process; routing is per run."""
+    global _listener_registered
+    with _listener_lock:
+        if not _listener_registered:
+            crewai_event_bus.on(TaskStartedEvent)(_on_task_started)
+            crewai_event_bus.on(TaskCompletedEvent)(_on_task_completed)
+            crewai_event_bus.on(TaskFailedEvent)(_on_task_failed)
+            _listener_registered = True
+
+
+class MetricsSink:
+    """
+    Appends run records to a JSONL file, rotating it when it grows too big.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                            encoding='utf-8', delay=True)
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        self._handler.handle(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO}))
+
+
+def read_records(path: str) -> list:
+    """Run records from path and its rotated backups, oldest first."""
+    paths = []
+    index = 1
+    while os.path.exists(f'{path}.{index}'):
+        paths.append(f'{path}.{index}')
+        index += 1
+    paths = list(reversed(paths)) + ([path] if os.path.exists(path) else [])
+
+    records = []
+    for name in paths:
+        with open(name, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of values, q in 0..100."""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(records) -> dict:
+    """
+    Per task (and for whole runs, under 'run'): the number of runs and the
+    p50/p95/p99 of wall time, plus mean LLM calls, tokens and cost.
+    """
+    samples = {}
+    for record in records:
+        rows = [('run', record)] + list(record.get('tasks', {}).items())
+        for name, row in rows:
+            samples.setdefault(name, []).append(row)
+
+    summary = {}
+    for name, rows in samples.items():
+        wall = [row.get('wall_s', 0.0) for row in rows]
+        summary[name] = {
+            'count': len(rows),
+            'p50_s': percentile(wall, 50),
+            'p95_s': percentile(wall, 95),
+            'p99_s': percentile(wall, 99),
+            'queue_p95_s': percentile([row.get('queue_s', 0.0) for row in rows], 95),
+            'llm_calls': sum(row.get('llm_calls', 0) for row in rows) / len(rows),
+            'retries': sum(row.get('retries', 0) for row in rows) / len(rows),
+            'prompt_tokens': sum(row.get('prompt_tokens', 0) for row in rows) / len(rows),
+            'completion_tokens': sum(row.get('completion_tokens', 0) for row in rows) / len(rows),
+            'cost_usd': sum(row.get('cost_usd', 0.0) for row in rows) / len(rows),
+        }
+    return summary
+
+
+def summarize_repeats(records) -> dict:
+    """
+    How many runs had the same canonical inputs (fingerprint) as an earlier
+    run: the requests a cache or history lookup could have answered.
+    """
+    seen = set()
+    repeats = 0
+    fingerprinted = [record['fingerprint'] for record in records if record.get('fingerprint')]
+    for key in fingerprinted:
+        repeats += key in seen
+        seen.add(key)
+    return {'runs': len(fingerprinted), 'repeats': repeats, 'distinct': len(seen)}
+
+
+def summarize_routes(records) -> dict:
+    """
+    Per (task, route): the number of routed calls, p50/p95 latency, the share
+    of calls that fired a fallback tier or failed, and calls won per model.
+    """
+    samples = {}
+    for record in records:
+        for call in record.get('routes', []):
+            samples.setdefault((call['task'], call['route']), []).append(call)
+
+    summary = {}
+    for key, calls in sorted(samples.items()):
+        latency = [call['latency_s'] for call in calls]
+        won = {}
+        for call in calls:
+            if call['tier'] is not None:
+                won[call['model']] = won.get(call['model'], 0) + 1
+        summary[key] = {
+            'count': len(calls),
+            'p50_s': percentile(latency, 50),
+            'p95_s': percentile(latency, 95),
+            'fired_rate': sum(1 for call in calls if call['fired'] > 1) / len(calls),
+            'failed_rate': sum(1 for call in calls if call['tier'] is None) / len(calls),
+            'won': won,
+        }
+    return summary
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms over the recorded runs, in Prometheus text format.
+    """
+
+    BUCKETS = (1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def _inc(self, name: str, labels: tuple, value: float = 1):
+        self.counters[(name, labels)] = self.counters.get((name, labels), 0) + value
+
+    def _observe(self, name: str, labels: tuple, value: float):
+        buckets, total, count = self.histograms.get((name, labels), ([0] * len(self.BUCKETS), 0.0, 0))
+        buckets = [n + (value <= bound) for n, bound in zip(buckets, self.BUCKETS)]
+        self.histograms[(name, labels)] = (buckets, total + value, count + 1)
+
+    def observe(self, record: dict):
+        with self._lock:
+            self._inc('crewmind_runs_total', (('status', record.get('status') or ERROR),))
+            self._observe('crewmind_run_queue_seconds', (), record.get('queue_s', 0.0))
+            self._observe('crewmind_run_duration_seconds', (), record.get('wall_s', 0.0))
+            for name, task in record.get('tasks', {}).items():
+                labels = (('task', name),)
+                self._observe('crewmind_task_duration_seconds', labels, task.get('wall_s', 0.0))
+                self._observe('crewmind_task_queue_seconds', labels, task.get('queue_s', 0.0))
+                self._inc('crewmind_task_llm_calls_total', labels, task.get('llm_calls', 0))
+                self._inc('crewmind_task_llm_seconds_total', labels, task.get('llm_s', 0.0))
+                self._inc('crewmind_task_retries_total', labels, task.get('retries', 0))
+                self._inc('crewmind_task_tokens_total', labels + (('kind', 'prompt'),), task.get('prompt_tokens', 0))
+                self._inc('crewmind_task_tokens_total', labels + (('kind', 'completion'),),
+                          task.get('completion_tokens', 0))
+                self._inc('crewmind_task_cost_usd_total', labels, task.get('cost_usd', 0.0))
+
+    def prometheus_text(self) -> str:
+        def fmt(labels):
+            return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}' if labels else ''
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {name} counter')
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{fmt(labels)} {value:g}')
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, labels), (buckets, total, count) in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, n in zip(self.BUCKETS, buckets):
+                        lines.append(f'{name}_bucket{fmt(labels + (("le", f"{bound:g}"),))} {n}')
+                    lines.append(f'{name}_bucket{fmt(labels + (("le", "+Inf"),))} {count}')
+                    lines.append(f'{name}_sum{fmt(labels)} {total:g}')
+                    lines.append(f'{name}_count{fmt(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(registry: MetricsRegistry, port: int) -> ThreadingHTTPServer:
+    """Serve the registry's Prometheus snapshot at /metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+    threading.Thread(target=server.serve_forever, name='crewmind-metrics', daemon=True).start()
+    return server
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Return the process-wide MetricsRegistry, serving it on
+    CREWMIND_METRICS_PORT if that is set.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+            port = os.getenv('CREWMIND_METRICS_PORT')
+            if port:
+                serve_metrics(_registry, int(port))
+        return _registry
+
+
+def metrics_path() -> str:
+    return os.path.expanduser(os.getenv('CREWMIND_METRICS_FILE', DEFAULT_METRICS_FILE))
+
+
+_metrics_sink = None
+_metrics_sink_lock = threading.Lock()
+
+
+def get_metrics_sink():
+    """
+    Return the process-wide MetricsSink, or None if CREWMIND_METRICS is off.
+    """
+    global _metrics_sink
+    if os.getenv('CREWMIND_METRICS', '').lower() in ('off', '0', 'false', 'no'):
+        return None
+    with _metrics_sink_lock:
+        if _metrics_sink is None:
+            _metrics_sink = MetricsSink(
+                metrics_path(),
+                max_bytes=int(float(os.getenv('CREWMIND_METRICS_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+                backups=int(os.getenv('CREWMIND_METRICS_BACKUPS', DEFAULT_BACKUPS)),
+            )
+        return _metrics_sink
@@ -0,0 +1,191 @@
+"""
+Local OpenAI-compatible mock LLM endpoint, for testing the pooled client and
+the rate limiter without a provider.
+
+It answers /v1/chat/completions (plain or streamed) with the same generated
+plans as crewmind.fake_llm, enforces its own requests-per-minute quota with
+429s like a real provider, and counts the TCP connections it was sent
+requests on, so connection reuse and limiter behaviour can be checked from
+its /stats endpoint.
+
+Usage:
+    mock_llm --port 8808 --rpm 30 --latency 0.5
+    CREWMIND_MODEL=openai/mock CREWMIND_LLM_BASE_URL=http://127.0.0.1:8808/v1 \\
+        OPENAI_API_KEY=mock CREWMIND_RPM=25 batch goals.jsonl results.jsonl
+    curl http://127.0.0.1:8808/stats
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crewmind.fake_llm import generate
+
+_CURRENT_TASK = re.compile(r'Current Task:\s*(.*)', re.DOTALL)
+
+# First-sentence keywords of each task's description, checked in order
+TASK_KEYWORDS = (
+    ('daily_planning_task', 'action plan'),
+    ('weekly_schedule_task', 'weekly schedule'),
+    ('goal_setting_task', ''),
+)
+
+
+def task_for_prompt(text: str) -> tuple:
+    """(task name, task description) of a crewAI prompt."""
+    match = _CURRENT_TASK.search(text)
+    description = match.group(1) if match else text
+    first = description.split('.')[0].lower()
+    name = next(name for name, keyword in TASK_KEYWORDS if keyword in first)
+    return name, description
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """
+    The mock endpoint: an HTTP server with a quota and request counters.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 8808, rpm: float = 0, latency: float = 0.0, words: int = 6,
+                 host: str = '127.0.0.1'):
+        super().__init__((host, port), _Handler)
+        self.rpm = rpm
+        self.latency = latency
+        self.words = words
+        self.requests = 0
+        self.rejected = 0
+        self.connections = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def admit(self) -> bool:
+        """Count a request against the quota; False if it is over."""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                self.rejected += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'requests': self.requests, 'rejected': self.rejected, 'connections': self.connections}
+
+    def handle_error(self, request, client_address):
+        # Streaming clients drop the connection after the last event; that's fine
+        pass
+
+    def start(self) -> threading.Thread:
+        """Serve on a daemon thread and return it."""
+        thread = threading.Thread(target=self.serve_forever, name='crewmind-mock-llm', daemon=True)
+        thread.start()
+        return thread
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        if not self.server.admit():
+            self._send_json(429, {'error': {'message': 'Quota exceeded', 'type': 'rate_limit_exceeded',
+                                            'code': 429}})
+            return
+
+        prompt = '\n'.join(str(m.get('content', '')) for m in body.get('messages', []))
+        name, description = task_for_prompt(prompt)
+        answer = generate(name, description, random.Random(len(prompt)), self.server.words)
+        text = f"Thought: I now know the final answer\nFinal Answer: {answer}"
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4,
+                 'total_tokens': (len(prompt) + len(text)) // 4}
+        if not body.get('stream'):
+            self._send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'created': int(time.time()),
+                'model': body.get('model', 'mock'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                             'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        pieces = [text[i:i + 400] for i in range(0, len(text), 400)]
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            chunk = {
+                'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                'model': body.get('model', 'mock'),
+                'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': 'stop' if last else None}],
+            }
+            if last:
+                chunk['usage'] = usage
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, text: str):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a local OpenAI-compatible mock LLM endpoint.")
+    parser.add_argument('--port', type=int, default=8808)
+    parser.add_argument('--rpm', type=float, default=0, help="requests per minute before answering 429 (0: none)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds per response")
+    parser.add_argument('--words', type=int, default=6, help="words per schedule cell")
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(port=args.port, rpm=args.rpm, latency=args.latency, words=args.words)
+    print(f"🧪 Mock LLM on http://127.0.0.1:{args.port}/v1 (quota: {args.rpm or 'none'} rpm)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
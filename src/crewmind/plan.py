@@ -0,0 +1,275 @@
+"""
+Structured view of a generated goal plan.
+
+parse_plan() turns the markdown produced by the crew into a PlanDocument in a
+single pass over its lines: overview, SMART definition, milestones, weekly
+tables, daily steps and tips, plus every section in document order. Results
+are memoized by content hash, so the results tabs and the download all read
+the same parsed object instead of re-scanning the text on every rerun.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from pydantic import BaseModel, Field
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_BOLD_LINE = re.compile(r'^\*\*([^*]+?)\*\*\s*:?\s*$')
+_BULLET = re.compile(r'^(\s*)(?:[-*•+]|\d+[.)])\s+(.*)$')
+_KEY_VALUE = re.compile(r'^\*\*(.+?)\*\*\s*:?\s*(.*)$')
+_SEPARATOR_CELL = re.compile(r'^:?-+:?$')
+_WEEK = re.compile(r'^weeks?\s*(\d+)', re.IGNORECASE)
+_DECORATION = re.compile(r'[^\w\s&/()\-:,.\'"]', re.UNICODE)
+_FENCE = re.compile(r'^\s*```[a-zA-Z]*\s*\n(.*?)\n\s*```\s*$', re.DOTALL)
+
+# Bold-only lines ("**Success Tips:**") act as headings below every markdown level
+BOLD_HEADING_LEVEL = 7
+
+OVERVIEW = 'overview'
+SMART = 'smart'
+MILESTONES = 'milestones'
+SCHEDULE = 'schedule'
+WEEK = 'week'
+DAILY = 'daily'
+TIPS = 'tips'
+
+
+class Section(BaseModel):
+    """A heading and the markdown under it, up to the next heading."""
+    heading: str = ''
+    title: str = ''
+    level: int = 0
+    kind: str | None = None
+    body: str = ''
+
+    def to_markdown(self) -> str:
+        return '\n'.join(part for part in (self.heading, self.body) if part)
+
+
+class Week(BaseModel):
+    """One weekly schedule table: a row per day, a column per time slot."""
+    number: int
+    title: str
+    columns: list[str] = Field(default_factory=list)
+    rows: list[list[str]] = Field(default_factory=list)
+
+    def table_markdown(self) -> str:
+        lines = []
+        if self.columns:
+            lines.append('| ' + ' | '.join(self.columns) + ' |')
+            lines.append('|' + '|'.join('---' for _ in self.columns) + '|')
+        lines.extend('| ' + ' | '.join(row) + ' |' for row in self.rows)
+        return '\n'.join(lines)
+
+    def to_markdown(self) -> str:
+        return f"### {self.title}\n{self.table_markdown()}"
+
+
+class PlanDocument(BaseModel):
+    """Typed tree of a goal plan, built by parse_plan()."""
+    digest: str = ''
+    title: str = ''
+    overview: dict[str, str] = Field(default_factory=dict)
+    smart_goal: str = ''
+    milestones: list[str] = Field(default_factory=list)
+    weeks: list[Week] = Field(default_factory=list)
+    daily_steps: list[str] = Field(default_factory=list)
+    tips: list[str] = Field(default_factory=list)
+    sections: list[Section] = Field(default_factory=list)
+
+    def to_markdown(self) -> str:
+        return '\n\n'.join(section.to_markdown() for section in self.sections if section.heading or section.body)
+
+
+def clean_title(text: str) -> str:
+    """Strip markdown emphasis, emojis and trailing colons from a heading."""
+    text = re.sub(r'\*\*|__|`', '', text)
+    text = _DECORATION.sub('', text)
+    return re.sub(r'\s+', ' ', text).strip(' :')
+
+
+def heading_kind(title: str):
+    """Classify a heading into one of the plan parts, or None."""
+    if _WEEK.match(title):
+        return WEEK
+    lowered = title.lower()
+    if 'overview' in lowered:
+        return OVERVIEW
+    if 'smart' in lowered:
+        return SMART
+    if 'milestone' in lowered or 'roadmap' in lowered:
+        return MILESTONES
+    if 'daily' in lowered or 'action step' in lowered:
+        return DAILY
+    if any(word in lowered for word in ('tip', 'success', 'strateg', 'motivat')):
+        return TIPS
+    if 'weekly' in lowered or 'schedule' in lowered:
+        return SCHEDULE
+    return None
+
+
+def _split_row(line: str) -> list:
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+class _Parser:
+    """Single pass over the plan's lines, building the PlanDocument as it goes."""
+
+    def __init__(self):
+        self.doc = PlanDocument()
+        self.stack = []  # open (level, kind) headings
+        self.section = Section()
+        self.own_kind = None
+        self.body = []
+        self.week = None
+        self.week_title = None
+        self.week_level = None
+        self.table_rows = 0
+        self.bullet_indent = None
+
+    @property
+    def kind(self):
+        for _level, kind in reversed(self.stack):
+            if kind:
+                return kind
+        return None
+
+    def open_section(self, heading: str, title: str, level: int):
+        self.close_section()
+        while self.stack and self.stack[-1][0] >= level:
+            self.stack.pop()
+        parent_kind = self.kind
+        own_kind = heading_kind(title)
+        # Sub-headings belong to their parent part ("Success Criteria" under the
+        # SMART definition is not a tips section), except for week headings
+        if parent_kind and own_kind != WEEK and not (parent_kind == SCHEDULE and own_kind):
+            own_kind = None
+        self.own_kind = own_kind
+        self.stack.append((level, own_kind))
+        self.section = Section(heading=heading, title=title, level=level, kind=self.kind)
+
+        if own_kind == WEEK:
+            self.week, self.week_title, self.week_level = None, title, level
+        elif self.week_level is None or level <= self.week_level:
+            self.week, self.week_title, self.week_level = None, None, None
+        self.table_rows = 0
+        self.bullet_indent = None
+        if level == 1 and not self.doc.title:
+            self.doc.title = title
+
+    def close_section(self):
+        body = '\n'.join(self.body).strip('\n')
+        if self.section.heading or body:
+            self.section.body = body
+            self.doc.sections.append(self.section)
+        if self.section.kind == SMART and body:
+            part = body if self.own_kind == SMART else self.section.to_markdown()
+            self.doc.smart_goal = '\n\n'.join(filter(None, [self.doc.smart_goal, part]))
+        self.body = []
+
+    def table_row(self, cells: list):
+        header = self.table_rows == 0
+        self.table_rows += 1
+        kind = self.kind
+        if kind == OVERVIEW:
+            if not header and len(cells) >= 2 and cells[0]:
+                self.doc.overview.setdefault(clean_title(cells[0]), cells[1])
+        elif kind in (WEEK, SCHEDULE):
+            if header:
+                # Under a "Week N" heading later tables continue the same week;
+                # without one, every table is the next week
+                if self.week is None or self.week_title is None:
+                    number = int(_WEEK.match(self.week_title).group(1)) if self.week_title else len(self.doc.weeks) + 1
+                    self.week = Week(number=number, title=self.week_title or f"Week {number}", columns=cells)
+                    self.doc.weeks.append(self.week)
+            else:
+                self.week.rows.append(cells)
+
+    def bullet(self, indent: int, text: str):
+        if self.bullet_indent is None:
+            self.bullet_indent = indent
+        if indent > self.bullet_indent:
+            return
+        kind = self.kind
+        if kind == OVERVIEW:
+            match = _KEY_VALUE.match(text)
+            if match:
+                self.doc.overview.setdefault(clean_title(match.group(1)), match.group(2).strip())
+        elif kind == MILESTONES:
+            self.doc.milestones.append(text)
+        elif kind == DAILY:
+            self.doc.daily_steps.append(text)
+        elif kind == TIPS:
+            self.doc.tips.append(text)
+
+    def feed(self, line: str):
+        heading = _HEADING.match(line)
+        if heading:
+            self.open_section(line, clean_title(heading.group(2)), len(heading.group(1)))
+            return
+        bold = _BOLD_LINE.match(line)
+        if bold:
+            self.open_section(line, clean_title(bold.group(1)), BOLD_HEADING_LEVEL)
+            return
+
+        self.body.append(line)
+        stripped = line.strip()
+        if stripped.startswith('|'):
+            cells = _split_row(stripped)
+            if not all(_SEPARATOR_CELL.match(cell) for cell in cells):
+                self.table_row(cells)
+            return
+        if not stripped:
+            return
+        # Any other text ends the current table
+        self.table_rows = 0
+        bullet = _BULLET.match(line)
+        if bullet:
+            self.bullet(len(bullet.group(1).expandtabs(4)), bullet.group(2).strip())
+
+    def parse(self, text: str) -> PlanDocument:
+        for line in text.splitlines():
+            self.feed(line.rstrip())
+        self.close_section()
+        return self.doc
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 64
+
+
+def cached_document(digest: str, build) -> PlanDocument:
+    """
+    Return the PlanDocument memoized under digest, calling build() on a miss.
+
+    Documents are shared between callers and must not be mutated.
+    """
+    with _cache_lock:
+        if digest in _cache:
+            _cache.move_to_end(digest)
+            return _cache[digest]
+
+    doc = build()
+    doc.digest = digest
+
+    with _cache_lock:
+        _cache[digest] = doc
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return doc
+
+
+def parse_plan(text: str) -> PlanDocument:
+    """
+    Parse plan markdown into a PlanDocument, memoized by content hash.
+    """
+    text = text or ''
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def build():
+        fenced = _FENCE.match(text)
+        return _Parser().parse(fenced.group(1) if fenced else text)
+
+    return cached_document(digest, build)
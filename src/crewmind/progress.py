@@ -0,0 +1,147 @@
+"""
+Live progress of a crew run, for showing results before the whole crew ends.
+
+RunProgress is fed by the crew's task and step callbacks and, when the LLM
+streams, by crewAI's LLMStreamChunkEvent. Call on_update to redraw the UI.
+
+Usage:
+    progress = RunProgress(task_names, on_update=redraw)
+    crew = build_crew(inputs, stream=True, **progress.crew_callbacks())
+    with progress.attach():
+        result = crew.kickoff()
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+
+_active_progress = ContextVar('crewmind_active_progress', default=None)
+_stream_closed = ContextVar('crewmind_stream_closed', default=None)
+_listener_lock = threading.Lock()
+_listener_registered = False
+
+
+def _on_stream_chunk(source, event):
+    progress = _active_progress.get()
+    closed = _stream_closed.get()
+    if closed is not None and closed.is_set():
+        return
+    if progress is not None and event.chunk and not getattr(event, 'tool_call', None):
+        progress.on_chunk(event.chunk, task_name=event.task_name)
+
+
+def close_stream_when(closed: threading.Event):
+    """
+    Drop the chunks streamed in this context once `closed` is set, as for a
+    hedged call's tier that is still running after another tier won (see
+    crewmind.routing).
+    """
+    _stream_closed.set(closed)
+
+
+def _register_listener():
+    """Subscribe to streamed chunks once per process; routing is per run."""
+    global _listener_registered
+    with _listener_lock:
+        if not _listener_registered:
+            crewai_event_bus.on(LLMStreamChunkEvent)(_on_stream_chunk)
+            _listener_registered = True
+
+
+class RunProgress:
+    """
+    Thread-safe state of each task in a run: status and the text so far.
+    """
+
+    def __init__(self, task_names, on_update=None):
+        self.task_names = list(task_names)
+        self.status = {name: PENDING for name in self.task_names}
+        self.text = {name: '' for name in self.task_names}
+        self.steps = {name: 0 for name in self.task_names}
+        self.on_update = on_update
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        """The task being worked on: the first one that isn't done."""
+        for name in self.task_names:
+            if self.status[name] != DONE:
+                return name
+        return None
+
+    def _notify(self, force: bool):
+        if self.on_update:
+            self.on_update(self, force)
+
+    def start(self):
+        with self._lock:
+            if self.current:
+                self.status[self.current] = RUNNING
+        self._notify(force=True)
+
+    def on_chunk(self, chunk: str, task_name=None):
+        with self._lock:
+            name = task_name if task_name in self.text else self.current
+            # A late chunk of a finished task would undo its final output
+            if name is None or self.status[name] == DONE:
+                return
+            self.status[name] = RUNNING
+            self.text[name] += chunk
+        self._notify(force=False)
+
+    def on_step(self, step):
+        """step_callback: count agent steps on the current task."""
+        with self._lock:
+            name = self.current
+            if name is None:
+                return
+            self.status[name] = RUNNING
+            self.steps[name] += 1
+        self._notify(force=False)
+
+    def on_task_output(self, output):
+        """task_callback: swap streamed text for the final task output."""
+        with self._lock:
+            name = output.name if output.name in self.status else self.current
+            if name is None:
+                return
+            self.status[name] = DONE
+            # Structured outputs are shown rendered, not as JSON
+            model = getattr(output, 'pydantic', None)
+            self.text[name] = model.to_markdown() if hasattr(model, 'to_markdown') else output.raw
+            if self.current:
+                self.status[self.current] = RUNNING
+        self._notify(force=True)
+
+    def visible_text(self, name: str) -> str:
+        """
+        The text worth showing for a task: what follows 'Final Answer:' in a
+        streamed ReAct response, or the final output once the task is done.
+        """
+        text = self.text[name]
+        if self.status[name] == DONE:
+            return text
+        if 'Final Answer:' in text:
+            answer = text.split('Final Answer:', 1)[1].lstrip()
+            # Half-streamed JSON from a structured task isn't worth showing
+            return '' if answer.startswith('{') else answer
+        return ''
+
+    def crew_callbacks(self) -> dict:
+        return {'task_callback': self.on_task_output, 'step_callback': self.on_step}
+
+    @contextmanager
+    def attach(self):
+        """Route streamed chunks from LLM calls made in this context to us."""
+        _register_listener()
+        token = _active_progress.set(self)
+        self.start()
+        try:
+            yield self
+        finally:
+            _active_progress.reset(token)
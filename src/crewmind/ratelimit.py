@@ -0,0 +1,226 @@
+"""
+Client-side rate limiting of LLM calls against the provider's quota.
+
+Every LLM call first takes a slot from the process-wide RateLimiter. The
+limiter keeps two token buckets, one for requests per minute and one for
+tokens per minute, and admits a call only when both have room, so bursts
+from concurrent sessions are smoothed out before they turn into 429s.
+
+Waiting calls are queued per session (one session per run, see
+crewmind.metrics) and admitted round-robin across sessions, so one long
+plan with many schedule chunks can't starve the other users. The queue is
+bounded: a call that finds it full, or waits longer than the allowed time,
+fails with RateLimitExceeded instead of piling up. When the provider does
+answer 429, the limiter pauses all admissions for a while.
+
+The buckets hold CREWMIND_LIMIT_BURST seconds' worth of budget, so no
+60-second window sees more than about (60 + burst) / 60 times the limit.
+Set the limits a little under the provider's quota.
+
+Configuration (environment variables):
+    CREWMIND_RPM            requests per minute; 0 disables the limit (default: 0)
+    CREWMIND_TPM            tokens per minute; 0 disables the limit (default: 0)
+    CREWMIND_LIMIT_QUEUE    calls allowed to wait at once (default: 64)
+    CREWMIND_LIMIT_WAIT     seconds a call may wait for a slot (default: 120)
+    CREWMIND_LIMIT_BURST    seconds of budget that can be spent at once (default: 10)
+    CREWMIND_LIMIT_BACKOFF  seconds to pause after a provider 429 (default: 10)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+DEFAULT_SESSION = 'default'
+
+
+class RateLimitExceeded(RuntimeError):
+    """A call was refused a slot: the queue was full or the wait too long."""
+
+
+class TokenBucket:
+    """
+    A bucket refilled continuously at `per_minute` units per minute, holding
+    at most `capacity` units (one minute's worth by default).
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        # Anything bigger than the bucket is admitted once it is full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def put(self, amount: float):
+        """Return (or, with a negative amount, charge) units after the fact."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception, or one it was raised from, is a provider 429."""
+    while error is not None:
+        if type(error).__name__ == 'RateLimitError' or getattr(error, 'status_code', None) == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class Ticket:
+    """One call's place in the queue and the tokens reserved for it."""
+
+    def __init__(self, session: str, tokens: int):
+        self.session = session
+        self.tokens = tokens
+        self.waited_s = 0.0
+
+
+class RateLimiter:
+    """
+    Admits calls within an RPM and a TPM budget, fairly across sessions.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_queue: int = 64, max_wait: float = 120.0,
+                 burst: float = 10.0, backoff: float = 10.0, clock=time.monotonic):
+        self.requests = TokenBucket(rpm, max(1.0, rpm * burst / 60), clock=clock) if rpm else None
+        self.tokens = TokenBucket(tpm, tpm * burst / 60, clock=clock) if tpm else None
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.backoff = backoff
+        self.clock = clock
+        self.paused_until = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._cond = threading.Condition()
+
+    def _head(self):
+        for queue in self._queues.values():
+            return queue[0]
+        return None
+
+    def _wait_time(self, ticket: Ticket) -> float:
+        waits = [self.paused_until - self.clock()]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(ticket.tokens))
+        return max(waits)
+
+    def _dequeue(self, ticket: Ticket):
+        queue = self._queues[ticket.session]
+        queue.remove(ticket)
+        self._queued -= 1
+        if not queue:
+            del self._queues[ticket.session]
+        else:
+            # Round-robin: the session's next call goes behind the other sessions
+            self._queues.move_to_end(ticket.session)
+        self._cond.notify_all()
+
+    def acquire(self, tokens: int, session: str | None = None) -> Ticket:
+        """
+        Block until a call of about `tokens` tokens may be sent, and reserve
+        them. Raises RateLimitExceeded if the queue is full or the call has
+        waited max_wait seconds.
+        """
+        ticket = Ticket(session or DEFAULT_SESSION, tokens)
+        deadline = self.clock() + self.max_wait
+        with self._cond:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise RateLimitExceeded(f"LLM rate limit queue is full ({self.max_queue} calls waiting)")
+            self._queues.setdefault(ticket.session, deque()).append(ticket)
+            self._queued += 1
+            start = self.clock()
+            waited = False
+            while True:
+                remaining = deadline - self.clock()
+                wait = self._wait_time(ticket) if self._head() is ticket else remaining
+                if self._head() is ticket and wait <= 0:
+                    break
+                if remaining <= 0:
+                    self._dequeue(ticket)
+                    self.rejected += 1
+                    raise RateLimitExceeded(f"Waited over {self.max_wait:.0f}s for an LLM rate limit slot")
+                self._cond.wait(min(wait, remaining))
+                waited = True
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            if waited:
+                ticket.waited_s = self.clock() - start
+                self.throttled += 1
+            self.admitted += 1
+            self._dequeue(ticket)
+        return ticket
+
+    def settle(self, ticket: Ticket, tokens_used: int):
+        """Correct the tokens reserved for a call once its real size is known."""
+        if self.tokens is None:
+            return
+        with self._cond:
+            self.tokens.put(ticket.tokens - tokens_used)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float | None = None):
+        """Stop admitting calls for a while, e.g. after the provider answered 429."""
+        with self._cond:
+            seconds = self.backoff if seconds is None else seconds
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'queued': self._queued,
+                'sessions_waiting': len(self._queues),
+                'admitted': self.admitted,
+                'throttled': self.throttled,
+                'rejected': self.rejected,
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Return the process-wide RateLimiter, or None when neither CREWMIND_RPM
+    nor CREWMIND_TPM is set.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            rpm = float(os.getenv('CREWMIND_RPM', 0))
+            tpm = float(os.getenv('CREWMIND_TPM', 0))
+            if not rpm and not tpm:
+                return None
+            _limiter = RateLimiter(
+                rpm=rpm,
+                tpm=tpm,
+                max_queue=int(os.getenv('CREWMIND_LIMIT_QUEUE', 64)),
+                max_wait=float(os.getenv('CREWMIND_LIMIT_WAIT', 120)),
+                burst=float(os.getenv('CREWMIND_LIMIT_BURST', 10)),
+                backoff=float(os.getenv('CREWMIND_LIMIT_BACKOFF', 10)),
+            )
+        return _limiter
@@ -0,0 +1,265 @@
+"""
+Per-task model routing with latency-aware fallback tiers.
+
+config/routing.yaml chooses the model that answers each task, by the size
+of the call: the input tokens of the rendered prompt (context included) and
+the output tokens expected for the weeks the call covers. A task's routes
+are tried in order and the first whose limits fit is used. Tasks without
+routes keep their agent's `llm:`.
+
+A route can list fallback tiers. When the primary model streams, a tier
+fires when no tier before it has produced a first token within its `after`
+seconds. A call that doesn't stream (the CLI, batch runs, schedule chunks)
+has no first token to wait for, only the whole answer, which nearly always
+takes longer than `after`; there a tier fires after its `answer_after`
+seconds without an answer, or not at all if it has none. Either way a tier
+also fires when all those before it have failed. Tiers already running are
+not cancelled, and the first tier to finish wins: a hedged call. Only the
+primary model streams to the live progress, and a losing tier's chunks are
+dropped once the call is settled, so fallback text never interleaves with
+it.
+
+Every routed call is recorded on the run (see crewmind.metrics): which
+route and tier answered, how many tiers fired, the latency and the outcome.
+Use `metrics --routes` to tune the rules.
+
+Configuration (environment variables):
+    CREWMIND_ROUTING  routing file to use, or 'off' (default: config/routing.yaml)
+
+Routing is skipped while CREWMIND_MODEL overrides every agent's model.
+"""
+import contextvars
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+
+import yaml
+from crewai.llms.base_llm import BaseLLM
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+from crewmind.llm import LLMWrapper
+from crewmind.metrics import current_run, estimate_tokens
+from crewmind.progress import close_stream_when
+
+DEFAULT_ROUTING_FILE = os.path.join(os.path.dirname(__file__), 'config', 'routing.yaml')
+
+ANSWERED = 'answered'      # the primary answered before any tier fired
+HEDGED = 'hedged'          # tiers fired; the winner is in `tier`
+FAILED = 'failed'          # every tier that fired failed
+
+_first_token = ContextVar('crewmind_first_token', default=None)
+_listener_lock = threading.Lock()
+_listener_registered = False
+
+
+def _on_stream_chunk(source, event):
+    seen = _first_token.get()
+    if seen is not None and event.chunk:
+        seen.set()
+
+
+def _register_listener():
+    """Subscribe to streamed chunks once per process; each tier watches its own."""
+    global _listener_registered
+    with _listener_lock:
+        if not _listener_registered:
+            crewai_event_bus.on(LLMStreamChunkEvent)(_on_stream_chunk)
+            _listener_registered = True
+
+
+class Tier:
+    """
+    A model fired after `after` seconds without a first token from a
+    streamed call, or `answer_after` seconds without the answer to one that
+    isn't streamed (None: only when the tiers before it failed).
+    """
+
+    def __init__(self, model: str, after: float, answer_after: float | None = None):
+        self.model = model
+        self.after = float(after)
+        self.answer_after = float(answer_after) if answer_after is not None else None
+
+    def wait(self, streamed: bool) -> float | None:
+        """Seconds to wait for the tiers before this one, or None to wait for them to fail."""
+        return self.after if streamed else self.answer_after
+
+
+class Route:
+    """
+    One routing rule: a primary model, the call sizes it applies to and its
+    fallback tiers.
+    """
+
+    def __init__(self, model: str, max_input_tokens: int | None = None, max_output_tokens: int | None = None,
+                 tiers=()):
+        self.model = model
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.tiers = [Tier(**tier) for tier in tiers]
+
+    def fits(self, input_tokens: int, output_tokens: int) -> bool:
+        return (self.max_input_tokens is None or input_tokens <= self.max_input_tokens) and \
+               (self.max_output_tokens is None or output_tokens <= self.max_output_tokens)
+
+
+def expected_tokens(size: dict, weeks: int, structured: bool = False) -> int:
+    """Output tokens an `output_tokens` entry expects for a call covering `weeks` weeks."""
+    per_week = size.get('per_week', 0)
+    if structured:
+        per_week = size.get('structured_per_week', per_week)
+    return int(size.get('base', 0) + per_week * weeks)
+
+
+class Routing:
+    """
+    The parsed routing file: each task's expected output size and routes.
+    """
+
+    def __init__(self, config: dict | None = None):
+        self.tasks = {}
+        self.output_tokens = {}
+        for name, entry in (config or {}).items():
+            self.output_tokens[name] = entry.get('output_tokens', {})
+            self.tasks[name] = [Route(**route) for route in entry.get('routes', [])]
+
+    @classmethod
+    def load(cls, path: str) -> 'Routing':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(yaml.safe_load(f))
+
+    def expected_output_tokens(self, task_name: str, weeks: int, structured: bool = False) -> int:
+        return expected_tokens(self.output_tokens.get(task_name, {}), weeks, structured)
+
+    def route(self, task_name: str, input_tokens: int, output_tokens: int):
+        """(index, Route) of the first route of the task that fits the call, or None."""
+        for index, route in enumerate(self.tasks.get(task_name, [])):
+            if route.fits(input_tokens, output_tokens):
+                return index, route
+        return None
+
+
+def routing_path():
+    """The routing file in effect, or None if routing is off."""
+    if os.getenv('CREWMIND_MODEL'):
+        return None
+    path = os.getenv('CREWMIND_ROUTING') or DEFAULT_ROUTING_FILE
+    if path.lower() in ('off', '0', 'false', 'no') or not os.path.exists(path):
+        return None
+    return path
+
+
+class RoutedLLM(LLMWrapper):
+    """
+    An agent's LLM that sends each call to the model its task's route picks,
+    hedging with the route's tiers.
+
+    `resolve(model, primary)` returns the LLM for a model; `task_weeks` maps
+    each task to the weeks it covers in this crew, and `structured` tells
+    whether answers are JSON, to estimate output size. `streamed` tells
+    whether the primary model streams, which picks the tiers' deadlines.
+    """
+
+    def __init__(self, llm: BaseLLM, routing: Routing, resolve, task_weeks: dict, structured: bool = False,
+                 streamed: bool = False):
+        super().__init__(llm)
+        self.routing = routing
+        self.resolve = resolve
+        self.task_weeks = task_weeks
+        self.structured = structured
+        self.streamed = streamed
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        task_name = getattr(from_task, 'name', None)
+        output_tokens = self.routing.expected_output_tokens(task_name, self.task_weeks.get(task_name, 0),
+                                                            self.structured)
+        match = self.routing.route(task_name, estimate_tokens(messages), output_tokens)
+        if match is None:
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        index, route = match
+        start = time.perf_counter()
+        if not route.tiers:
+            try:
+                response = self.resolve(route.model, True).call(messages, tools, callbacks, available_functions,
+                                                                from_task, from_agent)
+            except Exception:
+                self._record(task_name, index, route.model, None, 1, time.perf_counter() - start, FAILED)
+                raise
+            self._record(task_name, index, route.model, 0, 1, time.perf_counter() - start, ANSWERED)
+            return response
+
+        tiers = [Tier(route.model, 0)] + route.tiers
+        results = queue.Queue()
+        started = []
+        settled = threading.Event()
+
+        def deadline_of(tier_index):
+            wait = tiers[tier_index].wait(self.streamed)
+            return time.perf_counter() + wait if wait is not None else None
+
+        def fire(tier_index):
+            llm = self.resolve(tiers[tier_index].model, tier_index == 0)
+            seen = threading.Event()
+            started.append(seen)
+
+            def run():
+                _first_token.set(seen)
+                # A tier that loses keeps running; its chunks must not reach the progress
+                close_stream_when(settled)
+                try:
+                    response = llm.call(messages, tools=tools, callbacks=callbacks,
+                                        available_functions=available_functions,
+                                        from_task=from_task, from_agent=from_agent)
+                    results.put((tier_index, response, None))
+                except Exception as e:
+                    results.put((tier_index, None, e))
+
+            # Each tier runs in a copy of this context, so the run's metrics,
+            # progress and transcript see its calls
+            threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True,
+                             name=f'crewmind-route-{tier_index}').start()
+
+        _register_listener()
+        fire(0)
+        fired = 1
+        deadline = deadline_of(1)
+        errors = []
+        while True:
+            timeout = None
+            if fired < len(tiers) and deadline is not None and not any(seen.is_set() for seen in started):
+                timeout = max(0.0, deadline - time.perf_counter())
+            try:
+                tier_index, response, error = results.get(timeout=timeout)
+            except queue.Empty:
+                fire(fired)
+                fired += 1
+                if fired < len(tiers):
+                    deadline = deadline_of(fired)
+                continue
+
+            if error is None:
+                settled.set()
+                self._record(task_name, index, tiers[tier_index].model, tier_index, fired,
+                             time.perf_counter() - start, ANSWERED if fired == 1 else HEDGED)
+                return response
+            errors.append(error)
+            if fired < len(tiers):
+                # A failed tier hands over at once instead of waiting out the deadline
+                fire(fired)
+                fired += 1
+                if fired < len(tiers):
+                    deadline = deadline_of(fired)
+            elif len(errors) == fired:
+                settled.set()
+                self._record(task_name, index, route.model, None, fired, time.perf_counter() - start, FAILED)
+                raise errors[0]
+
+    @staticmethod
+    def _record(task_name, route_index, model, tier, fired, seconds, outcome):
+        run = current_run()
+        if run is not None:
+            run.route_call(task_name, route_index, model, tier, fired, seconds, outcome)
@@ -0,0 +1,363 @@
+"""
+Running the crew for one set of inputs.
+
+run_crew() is what the CLI, the batch runner and the background jobs call.
+For short timelines it kicks off the whole crew at once. For long ones it can
+generate the weekly schedule in chunks instead of a single LLM call:
+
+1. goal_setting_task runs on its own;
+2. the timeline is split into week ranges at the milestones it set, and
+   weekly_schedule_task runs once per range, in parallel, with an output
+   budget sized to the range's weeks;
+3. the chunks are merged into one schedule in week order, and
+   daily_planning_task runs on top of it.
+
+Latency then grows with the chunk size rather than with the timeline.
+
+A chunk's budget is the output its weeks are expected to need (see
+chunk_output_tokens()), about twice as much with structured output, whose
+JSON has an entry per day and slot. CREWMIND_CHUNK_MAX_TOKENS caps it:
+chunks are made as many weeks shorter as it takes for their expected output
+to fit, rather than cut off mid-answer.
+
+Configuration (environment variables):
+    CREWMIND_CHUNK_WEEKS       weeks per chunk; 0 disables chunking (default: 0)
+    CREWMIND_CHUNK_WORKERS     chunks generated at once (default: 4)
+    CREWMIND_CHUNK_MAX_TOKENS  most output tokens a chunk may use; 0 for no cap (default: 4096)
+"""
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+
+from crewmind.artifacts import get_artifact_store
+from crewmind.blueprint import build_crew, get_blueprint
+from crewmind.history import get_plan_history
+from crewmind.inputs import WEEKS_PER_UNIT, canonical_inputs, timeline_weeks
+from crewmind.knowledge import knowledge_context
+from crewmind.metrics import RunMetrics
+from crewmind.plan import parse_plan
+from crewmind.routing import expected_tokens
+from crewmind.structured import TASK_OUTPUT_MODELS, SmartGoal, WeeklySchedule, plan_document, structured_enabled
+from crewmind.transcript import RECORDING, REPLAYING, Transcript, active_transcript, recording_settings
+
+GOAL_TASK = 'goal_setting_task'
+SCHEDULE_TASK = 'weekly_schedule_task'
+FINAL_TASK = 'daily_planning_task'
+
+# A schedule chunk's expected output when config/routing.yaml isn't in use
+# (as with CREWMIND_MODEL); the same estimate as its weekly_schedule_task entry
+CHUNK_OUTPUT_TOKENS = {'base': 300, 'per_week': 400, 'structured_per_week': 900}
+
+_WEEK_MENTION = re.compile(r'\b(week|month)s?\s+(\d+)(?:\s*(?:-|–|to)\s*(\d+))?', re.IGNORECASE)
+
+
+def milestone_weeks(goal_output: TaskOutput, total: int) -> list:
+    """
+    Weeks by which the goal's milestones are due, within 1..total.
+
+    Uses the milestones' target_week in structured mode, otherwise any
+    "Week N" / "Month N" mentioned in the SMART goal text.
+    """
+    if isinstance(goal_output.pydantic, SmartGoal):
+        weeks = [m.target_week for m in goal_output.pydantic.milestones]
+    else:
+        weeks = []
+        for unit, start, end in _WEEK_MENTION.findall(goal_output.raw or ''):
+            number = int(end or start)
+            weeks.append(round(number * WEEKS_PER_UNIT[unit.lower()]))
+    return sorted({week for week in weeks if 1 <= week <= total})
+
+
+def week_ranges(total: int, boundaries, chunk_weeks: int) -> list:
+    """
+    Split weeks 1..total into (start, end) ranges of at most chunk_weeks.
+
+    Ranges end at milestone boundaries; long ones are split evenly, and
+    neighbours that fit in one chunk together are merged back.
+    """
+    ranges = []
+    start = 1
+    for end in sorted(set(boundaries) | {total}):
+        if end < start or end > total:
+            continue
+        length = end - start + 1
+        parts = -(-length // chunk_weeks)
+        for i in range(parts):
+            ranges.append((start + i * length // parts, start + (i + 1) * length // parts - 1))
+        start = end + 1
+
+    merged = []
+    for start, end in ranges:
+        if merged and end - merged[-1][0] + 1 <= chunk_weeks:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def merge_schedules(chunks) -> TaskOutput:
+    """
+    Merge the weekly_schedule_task output of each (week_range, TaskOutput)
+    chunk into one output, keeping only the weeks each chunk was asked for.
+    """
+    chunks = sorted(chunks, key=lambda chunk: chunk[0])
+    first = chunks[0][1]
+
+    if all(isinstance(output.pydantic, WeeklySchedule) for _, output in chunks):
+        entries = [entry for (start, end), output in chunks
+                   for entry in output.pydantic.entries if start <= entry.week <= end]
+        schedule = WeeklySchedule(entries=sorted(entries, key=lambda entry: entry.week))
+        return TaskOutput(name=SCHEDULE_TASK, description=first.description, agent=first.agent,
+                          raw=schedule.model_dump_json(), pydantic=schedule, output_format=first.output_format)
+
+    parts = []
+    for (start, end), output in chunks:
+        weeks = [week for week in parse_plan(output.raw).weeks if start <= week.number <= end]
+        if weeks:
+            parts.extend(week.to_markdown() for week in weeks)
+        else:
+            # Keep the chunk as written if no week tables could be found in it
+            parts.append(output.raw.strip())
+    return TaskOutput(name=SCHEDULE_TASK, description=first.description, agent=first.agent,
+                      raw='\n\n'.join(parts), output_format=first.output_format)
+
+
+def schedule_output_size() -> dict:
+    """The weekly_schedule_task output estimate: config/routing.yaml's, else CHUNK_OUTPUT_TOKENS."""
+    routing = get_blueprint().routing
+    size = routing.output_tokens.get(SCHEDULE_TASK) if routing is not None else None
+    return size or CHUNK_OUTPUT_TOKENS
+
+
+def chunk_output_tokens(weeks: int, structured: bool, size: dict | None = None) -> int:
+    """Output tokens a weekly_schedule_task chunk of that many weeks is expected to need."""
+    return expected_tokens(size or schedule_output_size(), weeks, structured)
+
+
+def fitting_chunk_weeks(chunk_weeks: int, structured: bool, max_tokens: int, size: dict | None = None) -> int:
+    """The most weeks, up to chunk_weeks, whose expected output fits max_tokens (at least 1)."""
+    size = size or schedule_output_size()
+    while chunk_weeks > 1 and chunk_output_tokens(chunk_weeks, structured, size) > max_tokens:
+        chunk_weeks -= 1
+    return chunk_weeks
+
+
+def _task_output(result, name: str) -> TaskOutput:
+    return next(output for output in result.tasks_output if output.name == name)
+
+
+def _crew_output(tasks_output: list, usage: UsageMetrics) -> CrewOutput:
+    final = tasks_output[-1]
+    return CrewOutput(raw=final.raw, pydantic=final.pydantic, json_dict=final.json_dict,
+                      tasks_output=tasks_output, token_usage=usage)
+
+
+def run_chunked(inputs: dict, chunk_weeks: int, max_workers: int = 4, max_tokens: int | None = 4096,
+                output_size: dict | None = None, outputs: dict | None = None, **crew_kwargs) -> CrewOutput:
+    """
+    Run the crew with the weekly schedule generated in parallel week ranges.
+
+    Takes the same keyword arguments as build_crew(); tasks whose output is
+    given in `outputs` are not run again. The task_callback is called once
+    for the merged schedule rather than once per chunk, and chunks are never
+    streamed, since their text would interleave. Each chunk may use the
+    output its weeks need by output_size (default: schedule_output_size()),
+    at most max_tokens; chunk_weeks is lowered until that fits.
+    """
+    outputs = outputs or {}
+    output_size = output_size or schedule_output_size()
+    usage = UsageMetrics()
+    structured = crew_kwargs.get('structured')
+    if structured is None:
+        structured = structured_enabled()
+
+    goal = outputs.get(GOAL_TASK)
+    if goal is None:
+        goal_result = build_crew(inputs, only=[GOAL_TASK], **crew_kwargs).kickoff()
+        usage.add_usage_metrics(goal_result.token_usage)
+        goal = _task_output(goal_result, GOAL_TASK)
+
+    schedule = outputs.get(SCHEDULE_TASK)
+    if schedule is None:
+        total = timeline_weeks(inputs.get('timeline', '')) or chunk_weeks
+        if max_tokens:
+            chunk_weeks = fitting_chunk_weeks(chunk_weeks, structured, max_tokens, output_size)
+        ranges = week_ranges(total, milestone_weeks(goal, total), chunk_weeks)
+
+        task_callback = crew_kwargs.get('task_callback')
+        chunk_kwargs = {key: value for key, value in crew_kwargs.items() if key != 'task_callback'}
+        chunk_kwargs['stream'] = False
+
+        def run_chunk(week_range):
+            budget = chunk_output_tokens(week_range[1] - week_range[0] + 1, structured, output_size)
+            crew = build_crew(inputs, only=[SCHEDULE_TASK], outputs={GOAL_TASK: goal}, week_range=week_range,
+                              max_tokens=min(budget, max_tokens) if max_tokens else budget, **chunk_kwargs)
+            return crew.kickoff()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ranges))),
+                                thread_name_prefix='crewmind-chunk') as pool:
+            # Each chunk runs in a copy of this context, so callers' context
+            # variables (like the active progress) carry over
+            futures = [pool.submit(contextvars.copy_context().run, run_chunk, week_range)
+                       for week_range in ranges]
+            chunk_results = [future.result() for future in futures]
+        for result in chunk_results:
+            usage.add_usage_metrics(result.token_usage)
+        schedule = merge_schedules((week_range, _task_output(result, SCHEDULE_TASK))
+                                   for week_range, result in zip(ranges, chunk_results))
+        if task_callback:
+            task_callback(schedule)
+
+    final = outputs.get(FINAL_TASK)
+    if final is None:
+        final_result = build_crew(inputs, only=[FINAL_TASK], outputs={GOAL_TASK: goal, SCHEDULE_TASK: schedule},
+                                  **crew_kwargs).kickoff()
+        usage.add_usage_metrics(final_result.token_usage)
+        final = _task_output(final_result, FINAL_TASK)
+
+    return _crew_output([goal, schedule, final], usage)
+
+
+def run_partial(inputs: dict, outputs: dict, **crew_kwargs) -> CrewOutput:
+    """
+    Run the tasks that have no output in `outputs`, using those that do as
+    their context, and return a CrewOutput covering every task.
+    """
+    names = list(get_blueprint().tasks)
+    usage = UsageMetrics()
+    produced = dict(outputs)
+    only = [name for name in names if name not in outputs]
+    if only:
+        result = build_crew(inputs, only=only, outputs=outputs, **crew_kwargs).kickoff()
+        usage.add_usage_metrics(result.token_usage)
+        produced.update({output.name: output for output in result.tasks_output})
+    return _crew_output([produced[name] for name in names], usage)
+
+
+def reusable_outputs(previous_inputs: dict, previous_result, inputs: dict, structured: bool | None = None) -> dict:
+    """
+    The TaskOutputs of a previous run that still hold for new inputs, to pass
+    to run_crew() as `outputs`.
+
+    Only tasks unaffected by the changed inputs are kept (see
+    CrewBlueprint.invalidated_tasks()), and only if they were produced in the
+    same output mode as this run's.
+    """
+    if previous_result is None:
+        return {}
+    if structured is None:
+        structured = structured_enabled()
+    blueprint = get_blueprint()
+    invalid = blueprint.invalidated_tasks(previous_inputs, inputs)
+    previous = {output.name: output for output in previous_result.tasks_output}
+    outputs = {}
+    for name, (static, _) in blueprint.tasks.items():
+        output = previous.get(name)
+        if output is None or name in invalid:
+            continue
+        if name in TASK_OUTPUT_MODELS and (output.pydantic is not None) != structured:
+            continue
+        if all(dep in outputs for dep in static.get('context', [])):
+            outputs[name] = output
+    return outputs
+
+
+def run_crew(inputs: dict, chunk_weeks: int | None = None, outputs: dict | None = None,
+             run_id: str | None = None, submitted_at: float | None = None, chunk_max_tokens: int | None = None,
+             chunk_output_size: dict | None = None, **crew_kwargs) -> CrewOutput:
+    """
+    Generate a plan for inputs and return the CrewOutput.
+
+    inputs are canonicalized first (see crewmind.inputs), so equivalent
+    requests render the same prompts. The knowledge is looked up once for
+    the whole run, unless inputs already has it (see crewmind.knowledge).
+
+    Timelines longer than chunk_weeks (default: CREWMIND_CHUNK_WEEKS) are
+    generated with run_chunked(), with chunk_max_tokens (default:
+    CREWMIND_CHUNK_MAX_TOKENS) and chunk_output_size (default:
+    schedule_output_size()) as its max_tokens and output_size; everything
+    else in one kickoff. Tasks whose
+    TaskOutput is given in `outputs` are reused instead of run. The run is
+    recorded under run_id by crewmind.metrics, with its queue time counted
+    from submitted_at. Its outputs are saved under run_id in the artifact
+    store and the plan history (see crewmind.artifacts and
+    crewmind.history), unless it replays a transcript, and its transcript
+    to CREWMIND_RECORD_DIR if that is set (see crewmind.transcript). Other
+    keyword arguments are passed on to build_crew().
+    """
+    if chunk_weeks is None:
+        chunk_weeks = int(os.getenv('CREWMIND_CHUNK_WEEKS', 0))
+    if chunk_max_tokens is None:
+        chunk_max_tokens = int(os.getenv('CREWMIND_CHUNK_MAX_TOKENS', 4096))
+    chunk_output_size = chunk_output_size or schedule_output_size()
+    chunking = {'chunk_max_tokens': chunk_max_tokens, 'chunk_output_size': chunk_output_size}
+    inputs = canonical_inputs(inputs)
+    outputs = outputs or {}
+    metrics = RunMetrics(run_id=run_id, submitted_at=submitted_at, inputs=inputs)
+
+    # Every crew of the run (each chunk, say) renders this one lookup; only
+    # the prompts get it, not the stored inputs
+    crew_inputs = inputs if 'knowledge' in inputs else {**inputs, 'knowledge': knowledge_context(inputs)}
+
+    record_dir = os.getenv('CREWMIND_RECORD_DIR')
+    active = active_transcript()
+    if not record_dir or active is not None:
+        if active is not None and active.mode == RECORDING:
+            active.record_knowledge(crew_inputs['knowledge'])
+        with metrics.attach():
+            result = _run(crew_inputs, chunk_weeks, outputs, **chunking, **crew_kwargs)
+        # A replay reproduces a run that was stored when it was recorded
+        if active is None or active.mode != REPLAYING:
+            _save_run(metrics.run_id, inputs, result)
+        return result
+
+    structured = crew_kwargs.get('structured')
+    if structured is None:
+        structured = structured_enabled()
+    transcript = Transcript(crew_inputs, recording_settings(chunk_weeks, structured, chunk_max_tokens,
+                                                            chunk_output_size))
+    with metrics.attach(), transcript.recording():
+        result = _run(crew_inputs, chunk_weeks, outputs, **chunking, **crew_kwargs)
+    transcript.add_outputs(result)
+    transcript.save(os.path.join(os.path.expanduser(record_dir), f'{metrics.run_id}.jsonl.gz'))
+    _save_run(metrics.run_id, inputs, result)
+    return result
+
+
+def _save_run(run_id: str, inputs: dict, result):
+    store = get_artifact_store()
+    history = get_plan_history()
+    if store is None and history is None:
+        return
+    plan = plan_document(result, inputs).to_markdown()
+    if store is not None:
+        store.save_run(run_id, inputs, result, plan)
+    if history is not None:
+        history.add(run_id, inputs, result, plan)
+
+
+def _run(inputs: dict, chunk_weeks: int, outputs: dict, chunk_max_tokens: int, chunk_output_size: dict,
+         **crew_kwargs) -> CrewOutput:
+    task_callback = crew_kwargs.get('task_callback')
+    if task_callback:
+        for output in outputs.values():
+            task_callback(output)
+
+    total = timeline_weeks(inputs.get('timeline', ''))
+    if chunk_weeks > 0 and total and total > chunk_weeks:
+        return run_chunked(
+            inputs, chunk_weeks,
+            max_workers=int(os.getenv('CREWMIND_CHUNK_WORKERS', 4)),
+            max_tokens=chunk_max_tokens or None,
+            output_size=chunk_output_size,
+            outputs=outputs,
+            **crew_kwargs,
+        )
+    if outputs:
+        return run_partial(inputs, outputs, **crew_kwargs)
+    return build_crew(inputs, **crew_kwargs).kickoff()
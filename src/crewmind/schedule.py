@@ -0,0 +1,107 @@
+"""
+Columnar model of a plan's weekly schedule.
+
+A one-year plan has 52 week tables. Rather than handing all of them to the
+browser as markdown, the tables are flattened into one DataFrame with a row
+per (week, day, slot), and the UI renders only the weeks on screen.
+
+The frame, each search and each week table are memoized by the document's
+content digest, so redrawing a page (every widget interaction reruns the
+script) pivots nothing it has pivoted before.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+COLUMNS = ['week', 'week_title', 'day', 'day_order', 'slot', 'slot_order', 'activity']
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 256
+
+
+def _memoized(key, build):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    value = build()
+
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def schedule_frame(doc) -> pd.DataFrame:
+    """
+    Flatten a PlanDocument's week tables into one long-format DataFrame.
+
+    Memoized by the document's content digest; treat the frame as read-only.
+    """
+    def build():
+        records = []
+        for week in doc.weeks:
+            slots = week.columns[1:]
+            for day_order, row in enumerate(week.rows):
+                if not row:
+                    continue
+                for slot_order, (slot, activity) in enumerate(zip(slots, row[1:])):
+                    records.append((week.number, week.title, row[0], day_order, slot, slot_order, activity))
+
+        frame = pd.DataFrame.from_records(records, columns=COLUMNS)
+        for column in ('week_title', 'day', 'slot'):
+            frame[column] = frame[column].astype('category')
+        return frame
+
+    return _memoized(doc.digest, build)
+
+
+def search_schedule(doc, keyword: str = '') -> pd.DataFrame:
+    """filter_schedule() of the document's frame, memoized by digest and keyword."""
+    keyword = keyword.strip().lower()
+    return _memoized((doc.digest, 'search', keyword), lambda: filter_schedule(schedule_frame(doc), keyword))
+
+
+def schedule_weeks(doc, keyword: str = '') -> list:
+    """week_numbers() of search_schedule(), memoized."""
+    keyword = keyword.strip().lower()
+    return _memoized((doc.digest, 'weeks', keyword), lambda: week_numbers(search_schedule(doc, keyword)))
+
+
+def schedule_table(doc, week: int, keyword: str = '') -> pd.DataFrame:
+    """week_table() of search_schedule(), memoized; treat it as read-only."""
+    keyword = keyword.strip().lower()
+    return _memoized((doc.digest, 'table', keyword, week), lambda: week_table(search_schedule(doc, keyword), week))
+
+
+def filter_schedule(frame: pd.DataFrame, keyword: str = '') -> pd.DataFrame:
+    """Keep the (week, day) rows where any slot or the day mentions keyword."""
+    keyword = keyword.strip()
+    if not keyword or frame.empty:
+        return frame
+    hits = (frame['activity'].str.contains(keyword, case=False, regex=False)
+            | frame['day'].astype(str).str.contains(keyword, case=False, regex=False))
+    matching_days = frame.loc[hits, ['week', 'day_order']].drop_duplicates()
+    return frame.merge(matching_days, on=['week', 'day_order'])
+
+
+def week_numbers(frame: pd.DataFrame) -> list:
+    """Week numbers present in the frame, in order."""
+    return sorted(frame['week'].unique().tolist())
+
+
+def week_table(frame: pd.DataFrame, week: int) -> pd.DataFrame:
+    """One week as a day-by-slot table, in the order the plan listed them."""
+    rows = frame[frame['week'] == week]
+    table = rows.pivot_table(index=['day_order', 'day'], columns=['slot_order', 'slot'],
+                             values='activity', aggfunc='first', observed=True)
+    table = table.sort_index(axis=0).sort_index(axis=1)
+    table.index = table.index.get_level_values('day')
+    table.columns = table.columns.get_level_values('slot')
+    table.index.name = 'Day'
+    table.columns.name = None
+    return table.fillna('')
@@ -0,0 +1,291 @@
+"""
+Headless HTTP planning service: submit a goal, follow its job, fetch the plan.
+
+Goals run as jobs on a JobManager (see crewmind.jobs) with a fixed number of
+workers and a bounded queue. When every worker is busy and the queue is
+full, a submission is answered 429 with a Retry-After header rather than
+queued. Clients then back off, and the jobs already accepted still finish in
+time. Finished plans are read back from the artifact store, so they stay
+available after their job is forgotten.
+
+Endpoints:
+    POST   /v1/plans                      submit goal inputs (JSON), 202 with the job
+    GET    /v1/plans/<id>                 job status and per-task progress
+    GET    /v1/plans/<id>/events          the same as server-sent events, until the job ends
+    GET    /v1/plans/<id>/plan            the parsed plan (JSON)
+    GET    /v1/plans/<id>/plan?format=md  the plan as markdown, or ics/csv/json events
+    DELETE /v1/plans/<id>                 cancel a job that hasn't started
+    GET    /healthz                       workers, running and queued jobs
+
+Usage:
+    serve --port 8000 --workers 16 --queue 64
+    curl -X POST localhost:8000/v1/plans -d '{"user_goal": "Run a 10k", "timeline": "3 months",
+                                             "available_time": "4 hours per week"}'
+    curl -N localhost:8000/v1/plans/<id>/events
+
+Configuration (environment variables):
+    CREWMIND_SERVER_WORKERS     crew runs executing at once (default: 16)
+    CREWMIND_SERVER_QUEUE       jobs that may wait for a worker (default: 64)
+    CREWMIND_SERVER_RETENTION   seconds a finished job is kept in memory (default: 600)
+"""
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from crewmind.batch import REQUIRED_KEYS
+from crewmind.jobs import DONE, QueueFull, JobManager
+from crewmind.logs import configure_logging
+
+DEFAULT_WORKERS = 16
+DEFAULT_QUEUE = 64
+DEFAULT_RETENTION = 600
+
+MAX_BODY = 64 * 1024
+RETRY_AFTER = 5
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE = 15
+
+_JOB_PATH = re.compile(r'^/v1/plans/([0-9a-f]{32})(/events|/plan)?$')
+
+
+class PlanningServer(ThreadingHTTPServer):
+    """
+    The planning service: an HTTP server in front of a JobManager.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, manager: JobManager, port: int = 8000, host: str = '127.0.0.1'):
+        super().__init__((host, port), _Handler)
+        self.manager = manager
+        self.rejected = 0
+
+    def start(self):
+        """Serve on a daemon thread and return it."""
+        thread = threading.Thread(target=self.serve_forever, name='crewmind-server', daemon=True)
+        thread.start()
+        return thread
+
+
+def job_status(job) -> dict:
+    progress = job.progress
+    payload = {
+        'id': job.id,
+        'status': job.status,
+        'submitted_at': job.submitted_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'tasks': [{'name': name, 'status': progress.status[name], 'steps': progress.steps[name]}
+                  for name in progress.task_names],
+        'links': {'self': f'/v1/plans/{job.id}', 'events': f'/v1/plans/{job.id}/events',
+                  'plan': f'/v1/plans/{job.id}/plan'},
+    }
+    if job.error:
+        payload['error'] = job.error
+    return payload
+
+
+def finished_run(manager: JobManager, job_id: str):
+    """(inputs, CrewOutput) of a finished run, from its job or the artifact store, or None."""
+    job = manager.get(job_id)
+    if job is not None:
+        return (job.inputs, job.result) if job.status == DONE else None
+    from crewmind.artifacts import get_artifact_store
+    store = get_artifact_store()
+    manifest = store.manifest(job_id) if store is not None else None
+    result = store.load_result(job_id) if manifest else None
+    return (manifest['inputs'], result) if result is not None else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: dict | None = None):
+        self._send_json(status, {'error': message}, headers)
+
+    def _write_chunk(self, data: bytes):
+        if data:
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+
+    def _start_chunked(self, content_type: str, headers: dict | None = None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip('/') == '/healthz':
+            self._send_json(200, {**self.server.manager.stats(), 'rejected': self.server.rejected})
+            return
+        match = _JOB_PATH.match(url.path.rstrip('/'))
+        if not match:
+            self._error(404, 'not found')
+            return
+        job_id, view = match.groups()
+        if view == '/plan':
+            self._plan(job_id, parse_qs(url.query).get('format', [''])[0])
+            return
+
+        job = self.server.manager.get(job_id)
+        if job is None:
+            if finished_run(self.server.manager, job_id) is None:
+                self._error(404, f'no job {job_id}')
+            else:
+                # Forgotten by the job manager, but its plan is stored
+                self._send_json(200, {'id': job_id, 'status': DONE,
+                                      'links': {'plan': f'/v1/plans/{job_id}/plan'}})
+            return
+        if view == '/events':
+            self._events(job)
+        else:
+            self._send_json(200, job_status(job))
+
+    def _events(self, job):
+        """Stream the job's status as server-sent events until it finishes."""
+        self._start_chunked('text/event-stream', {'Cache-Control': 'no-cache'})
+        version, sent = -1, None
+        try:
+            while True:
+                payload = job_status(job)
+                snapshot = (payload['status'], [(task['status'], task['steps']) for task in payload['tasks']])
+                if snapshot != sent:
+                    self._write_chunk(f"event: status\ndata: {json.dumps(payload, default=str)}\n\n".encode())
+                    sent = snapshot
+                if job.finished:
+                    break
+                new_version = job.wait(version, EVENT_KEEPALIVE)
+                if new_version == version:
+                    self._write_chunk(b': keep-alive\n\n')
+                version = new_version
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _plan(self, job_id: str, fmt: str):
+        from crewmind.export import FORMATS, export_plan
+        from crewmind.structured import plan_document
+
+        run = finished_run(self.server.manager, job_id)
+        if run is None:
+            job = self.server.manager.get(job_id)
+            if job is None:
+                self._error(404, f'no job {job_id}')
+            else:
+                self._error(409, f'job {job_id} is {job.status}')
+            return
+        inputs, result = run
+        doc = plan_document(result, inputs)
+        if not fmt:
+            self._send_json(200, {'id': job_id, 'inputs': inputs, 'plan': doc.model_dump()})
+        elif fmt == 'md':
+            body = doc.to_markdown().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/markdown; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif fmt in FORMATS:
+            mime, extension = FORMATS[fmt]
+            self._start_chunked(f'{mime}; charset=utf-8', {
+                'Content-Disposition': f'attachment; filename="crewmind-plan-{job_id[:8]}.{extension}"'})
+            for chunk in export_plan(doc, inputs, fmt):
+                self._write_chunk(chunk)
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self._error(400, f"unknown format '{fmt}'; use md, {', '.join(FORMATS)}")
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip('/') != '/v1/plans':
+            self._error(404, 'not found')
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._error(413, f'request body over {MAX_BODY} bytes')
+            return
+        try:
+            inputs = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._error(400, 'request body is not JSON')
+            return
+        if not isinstance(inputs, dict) or not all(isinstance(value, str) for value in inputs.values()):
+            self._error(400, 'goal inputs must be a JSON object of strings')
+            return
+        missing = [key for key in REQUIRED_KEYS if not inputs.get(key, '').strip()]
+        if missing:
+            self._error(400, f"missing required input(s): {', '.join(missing)}")
+            return
+
+        try:
+            job_id = self.server.manager.submit(inputs)
+        except QueueFull:
+            self.server.rejected += 1
+            self._error(429, 'too many plans in progress, retry later', {'Retry-After': str(RETRY_AFTER)})
+            return
+        job = self.server.manager.get(job_id)
+        self._send_json(202, job_status(job), {'Location': f'/v1/plans/{job_id}'})
+
+    def do_DELETE(self):
+        match = _JOB_PATH.match(urlsplit(self.path).path.rstrip('/'))
+        if not match or match.group(2):
+            self._error(404, 'not found')
+            return
+        job_id = match.group(1)
+        job = self.server.manager.get(job_id)
+        if job is None:
+            self._error(404, f'no job {job_id}')
+        elif self.server.manager.cancel(job_id):
+            self._send_json(200, job_status(job))
+        else:
+            self._error(409, f'job {job_id} is {job.status}')
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve goal planning over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=int(os.getenv('CREWMIND_SERVER_WORKERS', DEFAULT_WORKERS)),
+                        help=f"crew runs executing at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--queue', type=int, default=int(os.getenv('CREWMIND_SERVER_QUEUE', DEFAULT_QUEUE)),
+                        help=f"jobs that may wait for a worker before answering 429 (default: {DEFAULT_QUEUE})")
+    parser.add_argument('--retention', type=float,
+                        default=float(os.getenv('CREWMIND_SERVER_RETENTION', DEFAULT_RETENTION)),
+                        help=f"seconds a finished job is kept in memory (default: {DEFAULT_RETENTION})")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    manager = JobManager(max_workers=args.workers, retention=args.retention, max_queue=args.queue)
+    server = PlanningServer(manager, port=args.port, host=args.host)
+    print(f"🚀 Planning service on http://{args.host}:{args.port}/v1/plans "
+          f"({args.workers} workers, queue of {args.queue})")
+    started = time.time()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{manager.stats()} rejected={server.rejected} up={time.time() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
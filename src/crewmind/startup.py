@@ -0,0 +1,157 @@
+"""
+Cold start: deferred framework imports and an import-time profile.
+
+crewAI, and litellm under it, take several seconds to import, more than
+everything else app.py and crewmind.main load together. The entry points
+therefore import it where a crew is first run, and call prewarm() once the
+first page is drawn (or the first question asked) so the import runs on a
+background thread while the user is still filling in their goal.
+
+Cold-start target: importing app.py or crewmind.main takes under
+STARTUP_TARGET_S seconds and loads none of DEFERRED_PACKAGES. Check it
+with the profile mode, which exits non-zero when the target is missed:
+
+Usage:
+    startup                          # profile app.py
+    startup --target crewmind.main --top 20
+    startup --json
+
+Configuration (environment variables):
+    CREWMIND_PREWARM   set to 0 to skip the background import (default: on)
+"""
+import os
+import subprocess
+import sys
+import threading
+
+STARTUP_TARGET_S = 1.0
+
+# Imported on first use only; none of them may load at startup
+DEFERRED_PACKAGES = ('crewai', 'litellm', 'pandas')
+
+# What prewarm() imports: everything a crew run needs
+PREWARM_MODULES = ('crewmind.jobs',)
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP_PATH = os.path.abspath(os.path.join(SRC_DIR, '..', 'app.py'))
+
+_prewarm_lock = threading.Lock()
+_prewarm_thread = None
+
+
+def prewarm(modules=PREWARM_MODULES):
+    """
+    Import the crew machinery on a daemon thread, once per process.
+
+    A run that starts before the import finishes simply waits for it on the
+    import lock. Returns the thread, or None if there is nothing to do.
+    """
+    global _prewarm_thread
+    if os.getenv('CREWMIND_PREWARM', '1').lower() in ('0', 'off', 'false', 'no'):
+        return None
+    if all(module in sys.modules for module in modules):
+        return None
+    with _prewarm_lock:
+        if _prewarm_thread is None:
+            def run():
+                import importlib
+                for module in modules:
+                    importlib.import_module(module)
+
+            _prewarm_thread = threading.Thread(target=run, name='crewmind-prewarm', daemon=True)
+            _prewarm_thread.start()
+        return _prewarm_thread
+
+
+def _import_code(target: str) -> str:
+    """Python code that imports target (a module name, or 'app' for app.py) and prints the seconds taken."""
+    if target == 'app':
+        load = f"import runpy; runpy.run_path({APP_PATH!r})"
+    else:
+        load = f"import importlib; importlib.import_module({target!r})"
+    return (f"import sys, time; sys.path.insert(0, {SRC_DIR!r}); start = time.perf_counter(); {load}; "
+            f"print('CREWMIND_IMPORT_S', time.perf_counter() - start)")
+
+
+def parse_importtime(lines) -> list:
+    """(module, self µs, cumulative µs) rows from `python -X importtime` output."""
+    rows = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_imports(target: str = 'app', python: str | None = None) -> dict:
+    """
+    Import target in a fresh interpreter with `-X importtime` and report
+    the cost: total import seconds, self time per top-level package and per
+    module, and which deferred packages got loaded.
+    """
+    env = {**os.environ, 'CREWMIND_PREWARM': '0'}
+    proc = subprocess.run([python or sys.executable, '-X', 'importtime', '-c', _import_code(target)],
+                          capture_output=True, text=True, env=env, cwd=os.path.dirname(APP_PATH))
+    marker = [line for line in proc.stdout.splitlines() if line.startswith('CREWMIND_IMPORT_S')]
+    if proc.returncode != 0 or not marker:
+        raise RuntimeError(f"Importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    rows = parse_importtime(proc.stderr.splitlines())
+    packages = {}
+    for module, self_us, _ in rows:
+        top = module.split('.')[0]
+        packages[top] = packages.get(top, 0) + self_us
+    loaded = {module.split('.')[0] for module, _, _ in rows}
+    return {
+        'target': target,
+        'import_s': round(float(marker[0].split()[1]), 4),
+        'modules': len(rows),
+        'packages_ms': {name: round(us / 1000, 2) for name, us in
+                        sorted(packages.items(), key=lambda item: item[1], reverse=True)},
+        'slowest_ms': [(module, round(self_us / 1000, 2)) for module, self_us, _ in
+                       sorted(rows, key=lambda row: row[1], reverse=True)],
+        'deferred_loaded': sorted(loaded.intersection(DEFERRED_PACKAGES)),
+    }
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Profile the import-time cost of an entry point and check it "
+                                                 "against the cold-start target.")
+    parser.add_argument('--target', default='app', help="'app' for app.py, or a module (default: app)")
+    parser.add_argument('--top', type=int, default=15, help="packages and modules to list (default: 15)")
+    parser.add_argument('--budget', type=float, default=STARTUP_TARGET_S,
+                        help=f"import seconds allowed (default: {STARTUP_TARGET_S})")
+    parser.add_argument('--json', action='store_true', help="print the full profile as JSON")
+    args = parser.parse_args(argv)
+
+    profile = profile_imports(args.target)
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    else:
+        print(f"🚀 {args.target}: {profile['import_s']:.3f} s to import {profile['modules']} modules "
+              f"(target {args.budget:.1f} s)\n")
+        print("Self time by package:")
+        for name, ms in list(profile['packages_ms'].items())[:args.top]:
+            print(f"  {name:<48} {ms:>9.1f} ms")
+        print("\nSlowest modules:")
+        for module, ms in profile['slowest_ms'][:args.top]:
+            print(f"  {module:<48} {ms:>9.1f} ms")
+
+    problems = []
+    if profile['import_s'] > args.budget:
+        problems.append(f"import took {profile['import_s']:.3f} s, over the {args.budget:.1f} s target")
+    if profile['deferred_loaded']:
+        problems.append(f"loaded at startup: {', '.join(profile['deferred_loaded'])}")
+    for problem in problems:
+        print(f"⚠️  {problem}")
+    if problems:
+        sys.exit(1)
+    return profile
+
+
+if __name__ == "__main__":
+    main()
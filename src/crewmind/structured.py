@@ -0,0 +1,192 @@
+"""
+Structured (Pydantic) outputs for the three Crewmind tasks.
+
+In structured mode each task returns JSON for one of the models below
+instead of free-form markdown. The UI and the download build the
+PlanDocument straight from those objects and render the markdown locally,
+so nothing has to be reverse-engineered from the LLM's formatting, and the
+LLM no longer spends output tokens on table decoration.
+
+Enable it with CREWMIND_STRUCTURED_OUTPUT=1 or build_crew(..., structured=True).
+"""
+import hashlib
+import json
+import os
+
+from pydantic import BaseModel, Field
+
+from crewmind.plan import (
+    DAILY, MILESTONES, OVERVIEW, SCHEDULE, SMART, TIPS, WEEK,
+    PlanDocument, Section, Week, cached_document, clean_title, parse_plan,
+)
+
+DEFAULT_SLOTS = ('Morning', 'Afternoon', 'Evening', 'Key Tasks')
+
+
+class Milestone(BaseModel):
+    title: str = Field(description="Short name of the milestone")
+    target_week: int = Field(description="Week of the timeline the milestone should be reached by")
+    description: str = Field(description="What reaching the milestone means")
+    actions: list[str] = Field(default_factory=list, description="Initial action steps towards it")
+
+
+class SmartGoal(BaseModel):
+    """Output of goal_setting_task."""
+    statement: str = Field(description="The refined, specific goal statement")
+    success_criteria: list[str] = Field(default_factory=list, description="Measurable success criteria")
+    milestones: list[Milestone] = Field(default_factory=list, description="3-5 major milestones in order")
+    obstacles: list[str] = Field(default_factory=list, description="Likely obstacles and how to handle them")
+    motivation: str = Field(default='', description="Why this goal matters to the user")
+
+    def to_markdown(self) -> str:
+        parts = [self.statement]
+        if self.success_criteria:
+            parts.append("**Success Criteria:**\n" + _bullets(self.success_criteria))
+        if self.milestones:
+            parts.append("**Milestones:**\n" + _numbered(_milestone_line(m) for m in self.milestones))
+        if self.obstacles:
+            parts.append("**Obstacles & Solutions:**\n" + _bullets(self.obstacles))
+        if self.motivation:
+            parts.append(f"**Why it matters:** {self.motivation}")
+        return '\n\n'.join(parts)
+
+
+class ScheduleEntry(BaseModel):
+    week: int = Field(description="Week number, starting at 1")
+    day: str = Field(description="Day of the week, e.g. Monday")
+    slot: str = Field(description="Morning, Afternoon, Evening or Key Tasks")
+    activity: str = Field(description="Specific activity for that slot")
+
+
+class WeeklySchedule(BaseModel):
+    """Output of weekly_schedule_task: one record per week, day and slot."""
+    entries: list[ScheduleEntry] = Field(default_factory=list)
+
+    def to_weeks(self) -> list:
+        """Group the records into Week tables: a row per day, a column per slot."""
+        slots = list(DEFAULT_SLOTS)
+        for entry in self.entries:
+            if entry.slot not in slots:
+                slots.append(entry.slot)
+
+        grouped = {}
+        for entry in self.entries:
+            days = grouped.setdefault(entry.week, {})
+            days.setdefault(entry.day, {})[entry.slot] = entry.activity
+
+        weeks = []
+        for number in sorted(grouped):
+            used = [slot for slot in slots if any(slot in cells for cells in grouped[number].values())]
+            rows = [[day] + [cells.get(slot, '') for slot in used] for day, cells in grouped[number].items()]
+            weeks.append(Week(number=number, title=f"Week {number}", columns=['Day'] + used, rows=rows))
+        return weeks
+
+    def to_markdown(self) -> str:
+        return '\n\n'.join(week.to_markdown() for week in self.to_weeks())
+
+
+class FinalPlan(BaseModel):
+    """Output of daily_planning_task; the overview, SMART goal and schedule come from earlier tasks."""
+    summary: str = Field(description="One-paragraph, motivating summary of the plan")
+    daily_steps: list[str] = Field(default_factory=list, description="Day-by-day tasks, priorities and routines")
+    success_strategies: list[str] = Field(default_factory=list, description="Tips and strategies to stay on track")
+    accountability: list[str] = Field(default_factory=list, description="Accountability methods")
+
+    def to_markdown(self) -> str:
+        parts = [self.summary]
+        if self.daily_steps:
+            parts.append("**Daily Action Steps:**\n" + _bullets(self.daily_steps))
+        if self.success_strategies or self.accountability:
+            parts.append("**Success Strategies:**\n" + _bullets(self.success_strategies + self.accountability))
+        return '\n\n'.join(parts)
+
+
+TASK_OUTPUT_MODELS = {
+    'goal_setting_task': SmartGoal,
+    'weekly_schedule_task': WeeklySchedule,
+    'daily_planning_task': FinalPlan,
+}
+
+
+def structured_enabled() -> bool:
+    return os.getenv('CREWMIND_STRUCTURED_OUTPUT', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def _bullets(items) -> str:
+    return '\n'.join(f"- {item}" for item in items)
+
+
+def _numbered(items) -> str:
+    return '\n'.join(f"{i}. {item}" for i, item in enumerate(items, start=1))
+
+
+def _milestone_line(milestone: Milestone) -> str:
+    return f"**{milestone.title}** (by week {milestone.target_week}): {milestone.description}"
+
+
+def build_document(goal: SmartGoal, schedule: WeeklySchedule, final: FinalPlan, inputs: dict) -> PlanDocument:
+    """
+    Assemble the PlanDocument, and its markdown, from the three task outputs.
+    """
+    sections = []
+
+    def add(level, title, body, kind):
+        sections.append(Section(heading=f"{'#' * level} {title}", title=clean_title(title),
+                                level=level, kind=kind, body=body))
+
+    title = f"Goal Achievement Plan for {inputs.get('user_goal', '')}".strip()
+    overview = {
+        'Goal': inputs.get('user_goal', ''),
+        'Timeline': inputs.get('timeline', ''),
+        'Category': inputs.get('goal_type', ''),
+        'Time Commitment': inputs.get('available_time', ''),
+        'Preferred Schedule': inputs.get('preferred_schedule', ''),
+    }
+    overview = {key: value for key, value in overview.items() if value}
+    weeks = schedule.to_weeks()
+    milestones = [_milestone_line(m) for m in goal.milestones]
+    smart_goal = goal.statement
+    if goal.success_criteria:
+        smart_goal += "\n\n**Success Criteria:**\n" + _bullets(goal.success_criteria)
+    tips = final.success_strategies + final.accountability
+
+    add(1, title, final.summary, None)
+    add(2, "📋 Goal Overview", _bullets(f"**{key}**: {value}" for key, value in overview.items()), OVERVIEW)
+    add(2, "🎯 SMART Goal Definition", smart_goal, SMART)
+    add(2, "🗺️ Milestone Roadmap", _numbered(milestones), MILESTONES)
+    add(2, "📅 Weekly Schedule", '', SCHEDULE)
+    for week in weeks:
+        add(3, week.title, week.table_markdown(), WEEK)
+    add(2, "✅ Daily Action Steps", _bullets(final.daily_steps), DAILY)
+    add(2, "💡 Success Strategies", _bullets(tips), TIPS)
+    if goal.obstacles:
+        add(3, "Obstacles & Solutions", _bullets(goal.obstacles), TIPS)
+
+    return PlanDocument(
+        title=title,
+        overview=overview,
+        smart_goal=smart_goal,
+        milestones=milestones,
+        weeks=weeks,
+        daily_steps=final.daily_steps,
+        tips=tips,
+        sections=sections,
+    )
+
+
+def plan_document(result, inputs: dict) -> PlanDocument:
+    """
+    The PlanDocument for a crew result, in either output mode.
+
+    Structured results are assembled from the task models; markdown results
+    fall back to parse_plan(). Both are memoized by content hash.
+    """
+    outputs = {output.name: output.pydantic for output in getattr(result, 'tasks_output', None) or []}
+    models = [outputs.get(name) for name in TASK_OUTPUT_MODELS]
+    if all(isinstance(model, cls) for model, cls in zip(models, TASK_OUTPUT_MODELS.values())):
+        payload = json.dumps([model.model_dump() for model in models] + [inputs], sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return cached_document(digest, lambda: build_document(*models, inputs))
+
+    content = result.raw if hasattr(result, 'raw') else str(result)
+    return parse_plan(content)
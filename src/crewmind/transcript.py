@@ -0,0 +1,244 @@
+"""
+Record-and-replay transcripts of crew runs.
+
+A transcript holds every LLM request and response of one run, plus the
+inputs, the settings that shape the prompts and each task's final output.
+The inputs include the knowledge chunks looked up for the run (see
+crewmind.knowledge), so a replay renders the same prompts even if the
+knowledge files have changed, and doesn't load the embedder.
+It is a gzipped JSON-lines file: a header line, one line per LLM call (the
+SHA-256 of the request and the response text) and one line per task output.
+
+Replaying re-executes the whole pipeline (crew construction, agents,
+parsing, chunk merging) with every LLM call answered from the transcript,
+so it makes no network calls and produces the same plan bit for bit. A
+replay can also start at a given task, reusing the recorded outputs of the
+tasks before it.
+
+Usage:
+    with Transcript(inputs).recording() as transcript:
+        result = run_crew(inputs)
+    transcript.add_outputs(result)
+    transcript.save('run.jsonl.gz')
+
+    result = replay_transcript('run.jsonl.gz', start_task='weekly_schedule_task')
+
+Set CREWMIND_RECORD_DIR to record every run_crew() to <dir>/<run_id>.jsonl.gz.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from crewai.tasks.task_output import TaskOutput
+
+from crewmind.structured import TASK_OUTPUT_MODELS
+
+VERSION = 1
+
+RECORDING = 'recording'
+REPLAYING = 'replaying'
+
+_active_transcript = ContextVar('crewmind_active_transcript', default=None)
+
+
+class TranscriptMiss(LookupError):
+    """A replayed run sent a request that isn't in the transcript."""
+
+
+def active_transcript():
+    """The Transcript recording or replaying in this context, or None."""
+    return _active_transcript.get()
+
+
+def request_key(messages) -> str:
+    payload = json.dumps(messages, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class Transcript:
+    """
+    The LLM calls and task outputs of one run.
+    """
+
+    def __init__(self, inputs: dict | None = None, settings: dict | None = None):
+        self.inputs = dict(inputs or {})
+        self.settings = settings or {}
+        self.created = time.time()
+        self.calls = []
+        self.outputs = {}
+        self.mode = None
+        self.realtime = False
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    # --- recording ---
+
+    def record_call(self, task_name, model: str, messages, response: str, elapsed: float):
+        with self._lock:
+            self.calls.append({
+                'task': task_name,
+                'model': model,
+                'key': request_key(messages),
+                'response': response,
+                'elapsed_s': round(elapsed, 4),
+            })
+
+    def record_knowledge(self, knowledge: str):
+        """Keep the knowledge context the run's prompts were rendered with."""
+        with self._lock:
+            self.inputs.setdefault('knowledge', knowledge)
+
+    def add_outputs(self, result):
+        """Keep the final output of every task of a CrewOutput."""
+        for output in result.tasks_output:
+            model = output.pydantic
+            self.outputs[output.name] = {
+                'raw': output.raw,
+                'pydantic': model.model_dump() if model is not None else None,
+                'description': output.description,
+                'agent': output.agent,
+            }
+
+    @contextmanager
+    def recording(self):
+        """Record the LLM calls made in this context."""
+        self.mode = RECORDING
+        token = _active_transcript.set(self)
+        try:
+            yield self
+        finally:
+            _active_transcript.reset(token)
+
+    # --- replaying ---
+
+    def respond(self, task_name, messages) -> str:
+        """The recorded response to a request, in recording order for repeats."""
+        key = request_key(messages)
+        with self._lock:
+            queue = self._pending.get(key)
+            if not queue:
+                raise TranscriptMiss(
+                    f"No recorded response for a {task_name or 'crew'} request; the prompts differ from "
+                    f"the ones in the transcript (were the inputs or the YAML config changed?)"
+                )
+            call = queue.popleft()
+        if self.realtime:
+            time.sleep(call.get('elapsed_s', 0))
+        return call['response']
+
+    @contextmanager
+    def replaying(self, realtime: bool = False):
+        """
+        Answer the LLM calls made in this context from the transcript.
+        With realtime=True each answer takes as long as it did when recorded.
+        """
+        self._pending = {}
+        for call in self.calls:
+            self._pending.setdefault(call['key'], deque()).append(call)
+        self.mode = REPLAYING
+        self.realtime = realtime
+        token = _active_transcript.set(self)
+        try:
+            yield self
+        finally:
+            _active_transcript.reset(token)
+
+    def task_outputs(self, names) -> dict:
+        """The recorded TaskOutputs of the given tasks."""
+        outputs = {}
+        for name in names:
+            if name not in self.outputs:
+                raise KeyError(f"The transcript has no output for task '{name}'")
+            entry = self.outputs[name]
+            model = TASK_OUTPUT_MODELS.get(name)
+            pydantic = model.model_validate(entry['pydantic']) if model and entry.get('pydantic') else None
+            outputs[name] = TaskOutput(name=name, description=entry.get('description') or name,
+                                       agent=entry.get('agent') or '', raw=entry['raw'], pydantic=pydantic)
+        return outputs
+
+    # --- storage ---
+
+    def save(self, path: str):
+        """Write the transcript atomically as gzipped JSON lines."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        header = {'version': VERSION, 'created': self.created, 'inputs': self.inputs, 'settings': self.settings}
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                lines = [header] + [{'call': call} for call in self.calls] + \
+                        [{'output': name, **entry} for name, entry in self.outputs.items()]
+                for line in lines:
+                    f.write((json.dumps(line, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'Transcript':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get('version') != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} crewmind transcript")
+        header = lines[0]
+        transcript = cls(header.get('inputs'), header.get('settings'))
+        transcript.created = header.get('created', transcript.created)
+        for line in lines[1:]:
+            if 'call' in line:
+                transcript.calls.append(line['call'])
+            elif 'output' in line:
+                name = line.pop('output')
+                transcript.outputs[name] = line
+        return transcript
+
+
+def recording_settings(chunk_weeks: int, structured: bool, chunk_max_tokens: int | None = None,
+                       chunk_output_size: dict | None = None) -> dict:
+    """
+    The settings a replay needs to send the same prompts. The chunk token
+    cap and output estimate decide the schedule chunks' week ranges (see
+    crewmind.runner), so they are kept along with the chunk size.
+    """
+    return {'chunk_weeks': chunk_weeks, 'structured': structured, 'chunk_max_tokens': chunk_max_tokens,
+            'chunk_output_size': chunk_output_size}
+
+
+def replay_transcript(transcript, start_task: str | None = None, realtime: bool = False, **crew_kwargs):
+    """
+    Re-run the pipeline recorded in a transcript (a Transcript or its path)
+    without calling any LLM.
+
+    With start_task, the recorded outputs of the tasks before it are reused
+    and the run starts there. Returns the CrewOutput.
+    """
+    from crewmind.blueprint import get_blueprint
+    from crewmind.runner import run_crew
+
+    if isinstance(transcript, str):
+        transcript = Transcript.load(transcript)
+    names = list(get_blueprint().tasks)
+    if start_task is not None and start_task not in names:
+        raise ValueError(f"Unknown task '{start_task}'; expected one of: {', '.join(names)}")
+    before = names[:names.index(start_task)] if start_task else []
+
+    settings = transcript.settings
+    crew_kwargs.setdefault('verbose', False)
+    with transcript.replaying(realtime=realtime):
+        return run_crew(
+            transcript.inputs,
+            chunk_weeks=settings.get('chunk_weeks', 0),
+            outputs=transcript.task_outputs(before),
+            structured=settings.get('structured', False),
+            chunk_max_tokens=settings.get('chunk_max_tokens'),
+            chunk_output_size=settings.get('chunk_output_size'),
+            **crew_kwargs,
+        )
@@ -0,0 +1,23 @@
+from crewmind.inputs import canonical_inputs, fingerprint, timeline_weeks
+
+BASE = {'user_goal': 'Learn Python', 'available_time': '10 hours per week'}
+
+
+def test_equivalent_timelines_fingerprint_the_same():
+    assert fingerprint({**BASE, 'timeline': '12 months'}) == fingerprint({**BASE, 'timeline': '1 year'})
+    assert fingerprint({**BASE, 'timeline': '6 Months'}) == fingerprint({**BASE, 'timeline': 'half a year'})
+
+
+def test_fingerprint_matches_the_schedule_length():
+    assert timeline_weeks('12 months') == timeline_weeks('1 year') == 52
+    assert fingerprint({**BASE, 'timeline': '3 months'}) == fingerprint({**BASE, 'timeline': '13 weeks'})
+    assert fingerprint({**BASE, 'timeline': '3 months'}) != fingerprint({**BASE, 'timeline': '12 weeks'})
+
+
+def test_fingerprint_ignores_goal_case_and_trailing_punctuation():
+    assert fingerprint({**BASE, 'timeline': '1 year', 'user_goal': 'Learn Python.'}) == \
+        fingerprint({**BASE, 'timeline': '1 year', 'user_goal': 'learn  python'})
+
+
+def test_canonical_inputs_keep_the_goal_casing():
+    assert canonical_inputs({**BASE, 'user_goal': 'Learn  AWS and SQL'})['user_goal'] == 'Learn AWS and SQL'